@@ -1,5 +1,21 @@
+import time
+_script_started = time.perf_counter()
+
+import importlib
+import sys
 import streamlit as st
-from apps import farm_planner, management_tracker, revenue_planner
+from utils.export import show_export
+from utils.farms import activate_session_farm, show_farm_selector
+from utils.instrumentation import instrument_module, start_run, finish_run, show_performance_panel, timed
+from utils.report_jobs import cancel_abandoned_reports
+from utils.snapshots import get_snapshot_scheduler
+
+# App modules (and pandas with them) are imported on first navigation, not at startup
+APP_MODULES = {
+    'farm_planner': 'apps.farm_planner',
+    'management_tracker': 'apps.management_tracker',
+    'revenue_planner': 'apps.revenue_planner'
+}
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +29,39 @@ st.set_page_config(
 if 'current_app' not in st.session_state:
     st.session_state.current_app = 'dashboard'
 
+@st.cache_resource
+def get_startup_report():
+    """Process-wide startup timings shared by all sessions"""
+    return {
+        'first_render': None,
+        'app_imports': {}
+    }
+
+def load_app(app_name: str):
+    """Import an app module on first use and record how long the import took"""
+    module_name = APP_MODULES[app_name]
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    
+    started = time.perf_counter()
+    module = instrument_module(importlib.import_module(module_name))
+    get_startup_report()['app_imports'][app_name] = time.perf_counter() - started
+    return module
+
+def show_startup_report(render_time: float):
+    """Sidebar panel with cold start and lazy import timings"""
+    report = get_startup_report()
+    with st.expander("⏱️ Startup Report"):
+        st.write(f"**First render:** {report['first_render'] * 1000:.0f} ms")
+        st.write(f"**This rerun:** {render_time * 1000:.0f} ms")
+        if report['app_imports']:
+            st.markdown("**App imports:**")
+            for app_name, seconds in report['app_imports'].items():
+                st.write(f"{app_name.replace('_', ' ').title()}: {seconds * 1000:.0f} ms")
+        else:
+            st.caption("No apps loaded yet.")
+
+@timed
 def show_dashboard():
     """Main dashboard with app selection"""
     st.title("🌾 Unified Farm Management Platform")
@@ -74,10 +123,16 @@ def show_dashboard():
 
 def main():
     """Main application controller"""
+    # Every data access in this run goes to the session's farm
+    activate_session_farm()
+    run = start_run()
+    # Refreshes report snapshots after data changes and on a timer (started once per server)
+    get_snapshot_scheduler()
     
     # Sidebar navigation
     with st.sidebar:
         st.title("Navigation")
+        show_farm_selector()
         
         if st.button("🏠 Dashboard", use_container_width=True):
             st.session_state.current_app = 'dashboard'
@@ -102,15 +157,23 @@ def main():
         st.markdown("### Current App")
         st.info(f"**{st.session_state.current_app.replace('_', ' ').title()}**")
     
-    # Route to appropriate app
+    # Route to appropriate app, importing it only when first visited
     if st.session_state.current_app == 'dashboard':
         show_dashboard()
-    elif st.session_state.current_app == 'farm_planner':
-        farm_planner.show()
-    elif st.session_state.current_app == 'management_tracker':
-        management_tracker.show()
-    elif st.session_state.current_app == 'revenue_planner':
-        revenue_planner.show()
+    elif st.session_state.current_app in APP_MODULES:
+        load_app(st.session_state.current_app).show()
+    cancel_abandoned_reports()
+    
+    render_time = time.perf_counter() - _script_started
+    summary = finish_run(run, st.session_state.current_app)
+    report = get_startup_report()
+    if report['first_render'] is None:
+        report['first_render'] = render_time
+    
+    with st.sidebar:
+        show_export()
+        show_startup_report(render_time)
+        show_performance_panel(summary)
 
 if __name__ == "__main__":
     main()
@@ -1,40 +1,38 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-from utils.database import save_data, load_data
+from datetime import datetime, date, timedelta
+from utils.records import add_record, update_record, remove_records
+from utils.counters import get_sum
 from utils.common import validate_input
+from utils.pagination import show_paginated_list
+from utils.bulk_import import show_bulk_import
+from utils.calendar_index import get_calendar_index
+from utils.occupancy import get_occupancy_index
+from utils.allocation import crop_economics, optimize_allocation
+from utils.navigation import show_active_view
+from utils.compact import records_frame
+from utils.categorical import group_counts
 
 def show():
     """Farm Planner Application"""
     st.title("📋 Offline Farm Planner")
     st.markdown("Plan your crops, field layouts, and seasonal activities")
     
-    # Initialize session state for farm planner
-    if 'farm_plans' not in st.session_state:
-        st.session_state.farm_plans = load_data('farm_plans', [])
-    
-    if 'fields' not in st.session_state:
-        st.session_state.fields = load_data('fields', [])
-    
-    # Tab navigation within the app
-    tab1, tab2, tab3, tab4 = st.tabs(["Field Management", "Crop Planning", "Seasonal Calendar", "Reports"])
-    
-    with tab1:
-        show_field_management()
-    
-    with tab2:
-        show_crop_planning()
-    
-    with tab3:
-        show_seasonal_calendar()
-    
-    with tab4:
-        show_planning_reports()
+    # Only the selected view runs; its datasets are loaded on first use
+    show_active_view("farm_planner", {
+        "Field Management": (show_field_management, ['fields']),
+        "Crop Planning": (show_crop_planning, ['fields', 'farm_plans']),
+        "Seasonal Calendar": (show_seasonal_calendar, ['farm_plans']),
+        "Reports": (show_planning_reports, ['fields', 'farm_plans']),
+        "Optimizer": (show_allocation_optimizer, ['fields', 'farm_plans', 'revenue_plans', 'profit_analysis'])
+    })
 
 def show_field_management():
     """Field Management Interface"""
     st.header("Field Management")
     
+    show_bulk_import('fields')
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -58,8 +56,7 @@ def show_field_management():
                     'notes': notes,
                     'created_date': datetime.now().isoformat()
                 }
-                st.session_state.fields.append(new_field)
-                save_data('fields', st.session_state.fields)
+                add_record('fields', new_field)
                 st.success(f"Field '{field_name}' added successfully!")
                 st.rerun()
     
@@ -72,8 +69,7 @@ def show_field_management():
             # Field actions
             field_to_remove = st.selectbox("Remove Field", ["Select..."] + [f['name'] for f in st.session_state.fields])
             if st.button("Remove Selected Field") and field_to_remove != "Select...":
-                st.session_state.fields = [f for f in st.session_state.fields if f['name'] != field_to_remove]
-                save_data('fields', st.session_state.fields)
+                remove_records('fields', lambda f: f['name'] == field_to_remove)
                 st.success(f"Field '{field_to_remove}' removed!")
                 st.rerun()
         else:
@@ -101,6 +97,7 @@ def show_crop_planning():
             plant_date = st.date_input("Planned Planting Date")
             harvest_date = st.date_input("Expected Harvest Date")
             area_planned = st.number_input("Area to Plant (acres)", min_value=0.1, step=0.1)
+            allow_over_allocation = st.checkbox("Save even if the field would be over-allocated")
             
             submitted = st.form_submit_button("Create Plan")
             
@@ -116,15 +113,35 @@ def show_crop_planning():
                     'status': 'Planned',
                     'created_date': datetime.now().isoformat()
                 }
-                st.session_state.farm_plans.append(new_plan)
-                save_data('farm_plans', st.session_state.farm_plans)
-                st.success(f"Crop plan '{plan_name}' created successfully!")
-                st.rerun()
+                field = next(f for f in st.session_state.fields if f['name'] == field_id)
+                check = get_occupancy_index().check_plan(new_plan, float(field['size']))
+                overlapping = ', '.join(p['name'] for p in check['overlapping'])
+                conflict = (f"{field_id} would have {check['peak_area']:.1f} of {field['size']:.1f} acres "
+                            f"planted during this window (overlaps: {overlapping or 'none'}).")
+                if check['over_allocated'] and not allow_over_allocation:
+                    # Checked before saving, so an over-allocating plan needs explicit confirmation
+                    st.error(f"❌ {conflict} Reduce the area or change the dates, or tick the box to save anyway.")
+                else:
+                    add_record('farm_plans', new_plan)
+                    st.success(f"Crop plan '{plan_name}' created successfully!")
+                    if check['over_allocated']:
+                        # Keep the warning on screen instead of rerunning
+                        st.warning(f"⚠️ {conflict}")
+                    else:
+                        st.rerun()
     
     with col2:
         st.subheader("Current Crop Plans")
         if st.session_state.farm_plans:
-            for plan in st.session_state.farm_plans:
+            page_plans = show_paginated_list(
+                st.session_state.farm_plans, "farm_plans",
+                filter_options={'status': ["Planned", "Planted", "Growing", "Harvested"]},
+                search_fields=['name', 'crop_type', 'field'],
+                page_sizes=[5, 10, 25, 50],
+                data_type='farm_plans'
+            )
+            
+            for plan in page_plans:
                 with st.expander(f"{plan['name']} - {plan['crop_type']}"):
                     st.write(f"**Field:** {plan['field']}")
                     st.write(f"**Plant Date:** {plan['plant_date']}")
@@ -141,8 +158,7 @@ def show_crop_planning():
                     )
                     
                     if st.button(f"Update Status", key=f"update_{plan['id']}"):
-                        plan['status'] = new_status
-                        save_data('farm_plans', st.session_state.farm_plans)
+                        update_record('farm_plans', plan, {'status': new_status})
                         st.success("Status updated!")
                         st.rerun()
         else:
@@ -156,10 +172,23 @@ def show_seasonal_calendar():
         st.warning("No crop plans available. Create plans in the Crop Planning tab.")
         return
     
-    # Generate calendar view
+    calendar_index = get_calendar_index()
+    
+    # Multi-year navigation over the years that have activity
     current_year = datetime.now().year
+    years = sorted(set(calendar_index.years()) | {current_year})
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        selected_year = st.selectbox("Year", years, index=years.index(current_year))
+    with col2:
+        calendar_view = st.radio("Calendar View", ["Month", "Whole Season"], horizontal=True)
     
-    st.subheader(f"Farming Calendar - {current_year}")
+    if calendar_view == "Whole Season":
+        show_season_gantt(calendar_index, selected_year)
+        return
+    
+    st.subheader(f"Farming Calendar - {selected_year}")
     
     # Create monthly view
     months = [
@@ -170,39 +199,51 @@ def show_seasonal_calendar():
     selected_month = st.selectbox("Select Month", months, index=datetime.now().month - 1)
     month_num = months.index(selected_month) + 1
     
-    st.subheader(f"Activities for {selected_month} {current_year}")
+    st.subheader(f"Activities for {selected_month} {selected_year}")
     
-    # Filter plans for selected month
-    month_activities = []
-    for plan in st.session_state.farm_plans:
-        plant_date = datetime.fromisoformat(plan['plant_date'])
-        harvest_date = datetime.fromisoformat(plan['harvest_date'])
-        
-        if plant_date.month == month_num:
-            month_activities.append({
-                'date': plant_date.day,
-                'activity': f"Plant {plan['crop_type']} in {plan['field']}",
-                'type': 'Planting'
-            })
-        
-        if harvest_date.month == month_num:
-            month_activities.append({
-                'date': harvest_date.day,
-                'activity': f"Harvest {plan['crop_type']} from {plan['field']}",
-                'type': 'Harvesting'
-            })
+    # Activities come pre-bucketed by (year, month) and sorted by day
+    month_activities = calendar_index.activities(selected_year, month_num)
     
     if month_activities:
-        # Sort by date
-        month_activities.sort(key=lambda x: x['date'])
-        
         for activity in month_activities:
             if activity['type'] == 'Planting':
-                st.success(f"📅 {selected_month} {activity['date']}: {activity['activity']}")
+                st.success(f"📅 {selected_month} {activity['day']}: {activity['activity']}")
+            elif activity['type'] == 'Harvesting':
+                st.info(f"📅 {selected_month} {activity['day']}: {activity['activity']}")
             else:
-                st.info(f"📅 {selected_month} {activity['date']}: {activity['activity']}")
+                st.write(f"🌱 {activity['activity']} ({activity['plan']})")
     else:
-        st.info(f"No scheduled activities for {selected_month}")
+        st.info(f"No scheduled activities for {selected_month} {selected_year}")
+
+def show_season_gantt(calendar_index, year: int):
+    """Gantt-style view of every plan active during a year"""
+    import altair as alt
+    
+    st.subheader(f"Season Overview - {year}")
+    spans = calendar_index.season_spans(year)
+    
+    if not spans:
+        st.info(f"No crop plans active in {year}")
+        return
+    
+    gantt_df = pd.DataFrame([{
+        'Plan': f"{span['plan']} ({span['field']})",
+        'Crop': span['crop'],
+        'Start': max(span['start'], date(year, 1, 1)),
+        'End': min(span['end'], date(year, 12, 31)),
+        'Status': span['status']
+    } for span in spans])
+    gantt_df['Start'] = pd.to_datetime(gantt_df['Start'])
+    gantt_df['End'] = pd.to_datetime(gantt_df['End'])
+    
+    chart = alt.Chart(gantt_df).mark_bar().encode(
+        x=alt.X('Start:T', title=None),
+        x2='End:T',
+        y=alt.Y('Plan:N', sort=None, title=None),
+        color='Crop:N',
+        tooltip=['Plan', 'Crop', 'Status', 'Start', 'End']
+    ).properties(height=max(120, 28 * len(gantt_df)))
+    st.altair_chart(chart, use_container_width=True)
 
 def show_planning_reports():
     """Planning Reports Interface"""
@@ -217,8 +258,8 @@ def show_planning_reports():
     
     total_fields = len(st.session_state.fields)
     total_plans = len(st.session_state.farm_plans)
-    total_area = sum([f['size'] for f in st.session_state.fields])
-    planned_area = sum([p['area_planned'] for p in st.session_state.farm_plans])
+    total_area = get_sum('fields', 'size')
+    planned_area = get_sum('farm_plans', 'area_planned')
     
     with col1:
         st.metric("Total Fields", total_fields)
@@ -229,6 +270,29 @@ def show_planning_reports():
     with col4:
         st.metric("Planned Area", f"{planned_area:.1f} acres")
     
+    # Fields planted beyond their acreage at the same time
+    st.subheader("Field Occupancy")
+    occupancy = get_occupancy_index()
+    conflicts = occupancy.over_allocated_fields(st.session_state.fields)
+    if conflicts:
+        st.error(f"⚠️ {len(conflicts)} over-allocated period(s) found")
+        st.dataframe(pd.DataFrame(conflicts), use_container_width=True)
+    else:
+        st.success("✅ No field is planted beyond its acreage")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        occupancy_field = st.selectbox("Field", [f['name'] for f in st.session_state.fields], key="occupancy_field")
+    with col2:
+        occupancy_date = st.date_input("On Date", key="occupancy_date")
+    on_field = occupancy.plans_on(occupancy_field, occupancy_date)
+    if on_field:
+        for plan in on_field:
+            st.write(f"🌱 **{plan['name']}** - {plan['crop_type']}, {plan['area_planned']} acres "
+                     f"({plan['plant_date']} to {plan['harvest_date']})")
+    else:
+        st.info(f"Nothing planted on {occupancy_field} on {occupancy_date}")
+    
     # Detailed reports
     st.subheader("Field Utilization")
     if st.session_state.fields:
@@ -237,10 +301,87 @@ def show_planning_reports():
     
     st.subheader("Crop Plan Summary")
     if st.session_state.farm_plans:
-        plans_df = pd.DataFrame(st.session_state.farm_plans)
+        plans_df = records_frame(st.session_state.farm_plans)
         st.dataframe(plans_df, use_container_width=True)
         
         # Crop type distribution
-        crop_counts = plans_df['crop_type'].value_counts()
+        crop_counts = pd.Series(group_counts('farm_plans', st.session_state.farm_plans, 'crop_type'))
         st.subheader("Crop Distribution")
         st.bar_chart(crop_counts)
+
+def show_allocation_optimizer():
+    """Crop-to-Field Allocation Optimizer Interface"""
+    st.header("Allocation Optimizer")
+    st.markdown("Find the most profitable crop for each field from your revenue plans and cost analyses")
+    
+    if not st.session_state.fields:
+        st.warning("Please add fields first in the Field Management tab.")
+        return
+    
+    economics = crop_economics(st.session_state.revenue_plans, st.session_state.profit_analysis)
+    if economics.empty:
+        st.warning("Optimization needs crops with both a revenue plan and a cost analysis in the Revenue Planner.")
+        return
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        whole_fields = st.checkbox("One crop per field", help="Plant each field with a single crop")
+        use_rotation = st.checkbox("Enforce crop rotation", value=True,
+                                   help="Don't repeat a field's most recently planted crop")
+    with col2:
+        solver = st.selectbox("Solver", ["auto", "greedy"],
+                              format_func=lambda s: "Best available (LP)" if s == "auto" else "Greedy (fast)")
+    
+    st.subheader("Crop Share Limits (% of farm area)")
+    shares = st.data_editor(
+        pd.DataFrame({
+            'Crop': economics.index,
+            'Profit/Acre': (economics['revenue_per_acre'] - economics['cost_per_acre']).round(2),
+            'Min %': 0.0,
+            'Max %': 100.0
+        }),
+        disabled=['Crop', 'Profit/Acre'], hide_index=True, use_container_width=True,
+        key="allocation_shares"
+    )
+    
+    if st.button("Optimize Allocation", type="primary"):
+        result = optimize_allocation(
+            st.session_state.fields, economics,
+            farm_plans=st.session_state.farm_plans if use_rotation else None,
+            min_share=dict(zip(shares['Crop'], shares['Min %'] / 100)),
+            max_share=dict(zip(shares['Crop'], shares['Max %'] / 100)),
+            whole_fields=whole_fields, solver=solver
+        )
+        st.session_state.allocation_results = result
+    
+    result = st.session_state.get('allocation_results')
+    if not result:
+        return
+    
+    if result['status'] == 'infeasible':
+        st.error("❌ No allocation satisfies the minimum crop shares. Lower them and try again.")
+        return
+    if result['status'] == 'heuristic_shortfall':
+        missed = ", ".join(f"{crop} ({acres:,.1f} acres short)" for crop, acres in result['shortfall'].items())
+        st.warning(f"⚠️ The greedy solver could not meet every minimum crop share: {missed}. "
+                   "The best available (LP) solver may find an allocation that does, or lower the minimums.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Expected Profit", f"${result['total_profit']:,.2f}")
+    with col2:
+        st.metric("Planted Area", f"{result['planted_acres']:,.1f} / {result['total_acres']:,.1f} acres")
+    with col3:
+        st.metric("Solve Time", f"{result['solve_time'] * 1000:.0f} ms")
+    st.caption(f"Solver: {result['solver']} ({result['status']})")
+    
+    allocation = result['allocation']
+    if allocation.empty:
+        st.info("No crop is profitable on any field with the current figures.")
+        return
+    
+    st.subheader("Recommended Allocation")
+    st.dataframe(allocation.round(2), use_container_width=True, hide_index=True)
+    
+    st.subheader("Acres by Crop")
+    st.bar_chart(allocation.groupby('crop')['acres'].sum())
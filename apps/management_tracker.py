@@ -1,49 +1,38 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
-from utils.database import save_data, load_data
-from utils.common import validate_input
+from datetime import datetime, date, timedelta
+from utils.records import add_record, update_record
+from utils.counters import get_counters, get_sum, get_group_count
+from utils.common import validate_input, filter_data_by_date_range
+from utils.pagination import show_paginated_list
+from utils.bulk_import import show_bulk_import
+from utils.navigation import show_active_view
+from utils.task_scheduler import get_task_scheduler
+from utils.reports import monthly_expenses, operations_by_type, recent_activity, expense_breakdown, operation_breakdown
+from utils.rollups import RollupCube, get_rollup, stored_rollup, install_rollup, rollup_state
+from utils.report_jobs import ReportTask, report_results
+from utils.categorical import group_sums
 
 def show():
     """Farm Management Tracker Application"""
     st.title("📊 Farm Management Tracker")
     st.markdown("Track farm operations, expenses, equipment, and daily tasks")
     
-    # Initialize session state for management tracker
-    if 'expenses' not in st.session_state:
-        st.session_state.expenses = load_data('expenses', [])
-    
-    if 'equipment' not in st.session_state:
-        st.session_state.equipment = load_data('equipment', [])
-    
-    if 'tasks' not in st.session_state:
-        st.session_state.tasks = load_data('tasks', [])
-    
-    if 'operations' not in st.session_state:
-        st.session_state.operations = load_data('operations', [])
-    
-    # Tab navigation within the app
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Daily Operations", "Task Management", "Expense Tracking", "Equipment", "Analytics"])
-    
-    with tab1:
-        show_daily_operations()
-    
-    with tab2:
-        show_task_management()
-    
-    with tab3:
-        show_expense_tracking()
-    
-    with tab4:
-        show_equipment_management()
-    
-    with tab5:
-        show_analytics()
+    # Only the selected view runs; its datasets are loaded on first use
+    show_active_view("management_tracker", {
+        "Daily Operations": (show_daily_operations, ['operations']),
+        "Task Management": (show_task_management, ['tasks']),
+        "Expense Tracking": (show_expense_tracking, ['expenses']),
+        "Equipment": (show_equipment_management, ['equipment']),
+        "Analytics": (show_analytics, ['expenses', 'equipment', 'tasks', 'operations'])
+    })
 
 def show_daily_operations():
     """Daily Operations Interface"""
     st.header("Daily Farm Operations")
     
+    show_bulk_import('operations')
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -74,8 +63,7 @@ def show_daily_operations():
                     'cost': cost,
                     'recorded_date': datetime.now().isoformat()
                 }
-                st.session_state.operations.append(new_operation)
-                save_data('operations', st.session_state.operations)
+                add_record('operations', new_operation)
                 st.success("Operation recorded successfully!")
                 st.rerun()
     
@@ -143,8 +131,7 @@ def show_task_management():
                     'description': task_description,
                     'created_date': datetime.now().isoformat()
                 }
-                st.session_state.tasks.append(new_task)
-                save_data('tasks', st.session_state.tasks)
+                add_record('tasks', new_task)
                 st.success(f"Task '{task_name}' added successfully!")
                 st.rerun()
     
@@ -152,9 +139,9 @@ def show_task_management():
         st.subheader("Task Overview")
         if st.session_state.tasks:
             # Task status summary
-            pending_tasks = len([t for t in st.session_state.tasks if t['status'] == 'Pending'])
-            in_progress_tasks = len([t for t in st.session_state.tasks if t['status'] == 'In Progress'])
-            completed_tasks = len([t for t in st.session_state.tasks if t['status'] == 'Completed'])
+            pending_tasks = get_group_count('tasks', 'status', 'Pending')
+            in_progress_tasks = get_group_count('tasks', 'status', 'In Progress')
+            completed_tasks = get_group_count('tasks', 'status', 'Completed')
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -163,13 +150,42 @@ def show_task_management():
                 st.metric("In Progress", in_progress_tasks, delta=None, delta_color="normal")
             with col3:
                 st.metric("Completed", completed_tasks, delta=None, delta_color="normal")
+            
+            scheduler = get_task_scheduler()
+            assignee = st.selectbox("Show tasks for", ["Everyone"] + scheduler.assignees(), key="task_assignee")
+            assignee = None if assignee == "Everyone" else assignee
+            
+            overdue = scheduler.overdue(assignee=assignee)
+            if overdue:
+                st.error(f"⏰ {len(overdue)} overdue task(s)")
+                for task in overdue[:5]:
+                    st.write(f"**{task['name']}** - due {task['due_date']} ({task['priority']})")
+            
+            st.markdown("**Next Up**")
+            next_tasks = scheduler.next_up(5, assignee)
+            if next_tasks:
+                for task in next_tasks:
+                    st.write(f"➡️ **{task['name']}** - {task['priority']}, due {task['due_date']}")
+            else:
+                st.write("Nothing open 🎉")
         else:
             st.info("No tasks created yet.")
     
     # Task list
     st.subheader("All Tasks")
     if st.session_state.tasks:
-        for task in st.session_state.tasks:
+        # Listed by priority, then due date
+        page_tasks = show_paginated_list(
+            list(get_task_scheduler().ordered()), "tasks",
+            filter_options={
+                'status': ["Pending", "In Progress", "Completed"],
+                'priority': ["High", "Medium", "Low"]
+            },
+            search_fields=['name', 'assigned_to', 'description'],
+            data_type='tasks'
+        )
+        
+        for task in page_tasks:
             # Color coding based on priority
             if task['priority'] == 'High':
                 container = st.container()
@@ -196,8 +212,7 @@ def show_task_management():
                 )
                 
                 if st.button(f"Update", key=f"update_task_{task['id']}"):
-                    task['status'] = new_status
-                    save_data('tasks', st.session_state.tasks)
+                    update_record('tasks', task, {'status': new_status})
                     st.success("Task status updated!")
                     st.rerun()
 
@@ -205,6 +220,8 @@ def show_expense_tracking():
     """Expense Tracking Interface"""
     st.header("Expense Tracking")
     
+    show_bulk_import('expenses')
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -233,8 +250,7 @@ def show_expense_tracking():
                     'payment_method': payment_method,
                     'recorded_date': datetime.now().isoformat()
                 }
-                st.session_state.expenses.append(new_expense)
-                save_data('expenses', st.session_state.expenses)
+                add_record('expenses', new_expense)
                 st.success("Expense recorded successfully!")
                 st.rerun()
     
@@ -242,17 +258,12 @@ def show_expense_tracking():
         st.subheader("Expense Summary")
         if st.session_state.expenses:
             # This month's expenses
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            
-            monthly_expenses = [
-                exp for exp in st.session_state.expenses 
-                if datetime.fromisoformat(exp['date']).month == current_month 
-                and datetime.fromisoformat(exp['date']).year == current_year
-            ]
+            month_start = date.today().replace(day=1)
+            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            monthly_expenses = filter_data_by_date_range(st.session_state.expenses, 'date', month_start, month_end)
             
             monthly_total = sum([exp['amount'] for exp in monthly_expenses])
-            total_expenses = sum([exp['amount'] for exp in st.session_state.expenses])
+            total_expenses = get_sum('expenses', 'amount')
             
             st.metric("This Month", f"${monthly_total:.2f}")
             st.metric("Total Expenses", f"${total_expenses:.2f}")
@@ -260,11 +271,7 @@ def show_expense_tracking():
             # Category breakdown for this month
             if monthly_expenses:
                 st.subheader("This Month by Category")
-                category_totals = {}
-                for exp in monthly_expenses:
-                    if exp['category'] not in category_totals:
-                        category_totals[exp['category']] = 0
-                    category_totals[exp['category']] += exp['amount']
+                category_totals = group_sums('expenses', monthly_expenses, 'category', 'amount')
                 
                 for category, total in category_totals.items():
                     st.write(f"**{category}:** ${total:.2f}")
@@ -317,24 +324,19 @@ def show_equipment_management():
                     'total_hours': 0,
                     'added_date': datetime.now().isoformat()
                 }
-                st.session_state.equipment.append(new_equipment)
-                save_data('equipment', st.session_state.equipment)
+                add_record('equipment', new_equipment)
                 st.success(f"Equipment '{equipment_name}' added successfully!")
                 st.rerun()
     
     with col2:
         st.subheader("Equipment Overview")
         if st.session_state.equipment:
-            total_value = sum([eq['purchase_cost'] for eq in st.session_state.equipment])
+            total_value = get_sum('equipment', 'purchase_cost')
             st.metric("Total Equipment", len(st.session_state.equipment))
             st.metric("Total Value", f"${total_value:.2f}")
             
             # Condition breakdown
-            conditions = {}
-            for eq in st.session_state.equipment:
-                if eq['condition'] not in conditions:
-                    conditions[eq['condition']] = 0
-                conditions[eq['condition']] += 1
+            conditions = get_counters('equipment')['groups']['condition']
             
             st.subheader("Equipment Condition")
             for condition, count in conditions.items():
@@ -345,7 +347,18 @@ def show_equipment_management():
     # Equipment list
     st.subheader("Equipment Inventory")
     if st.session_state.equipment:
-        for equipment in st.session_state.equipment:
+        page_equipment = show_paginated_list(
+            st.session_state.equipment, "equipment",
+            filter_options={
+                'type': ["Tractor", "Harvester", "Planter", "Cultivator",
+                         "Sprayer", "Irrigation System", "Hand Tools", "Other"],
+                'condition': ["Excellent", "Good", "Fair", "Poor"]
+            },
+            search_fields=['name', 'manufacturer', 'serial_number'],
+            data_type='equipment'
+        )
+        
+        for equipment in page_equipment:
             with st.expander(f"{equipment['name']} ({equipment['type']})"):
                 col1, col2 = st.columns(2)
                 
@@ -375,9 +388,10 @@ def show_equipment_management():
                     )
                     
                     if st.button(f"Update", key=f"update_eq_{equipment['id']}"):
-                        equipment['condition'] = new_condition
-                        equipment['total_hours'] = new_hours
-                        save_data('equipment', st.session_state.equipment)
+                        update_record('equipment', equipment, {
+                            'condition': new_condition,
+                            'total_hours': new_hours
+                        })
                         st.success("Equipment updated!")
                         st.rerun()
 
@@ -399,50 +413,64 @@ def show_analytics():
         st.metric("Total Operations", total_operations)
     
     with col2:
-        total_expenses = sum([exp['amount'] for exp in st.session_state.expenses])
+        total_expenses = get_sum('expenses', 'amount')
         st.metric("Total Expenses", f"${total_expenses:.2f}")
     
     with col3:
-        completed_tasks = len([t for t in st.session_state.tasks if t['status'] == 'Completed'])
+        completed_tasks = get_group_count('tasks', 'status', 'Completed')
         st.metric("Completed Tasks", completed_tasks)
     
     with col4:
         total_equipment = len(st.session_state.equipment)
         st.metric("Equipment Items", total_equipment)
     
+    # Rebuilding a rollup reads the whole dataset, so out-of-date ones are rebuilt in the background
+    stale = [data_type for data_type in ('expenses', 'operations')
+             if st.session_state[data_type] and stored_rollup(data_type) is None]
+    if stale:
+        states = report_results('analytics_rollups', [
+            ReportTask(rollup_state, (data_type,), (data_type,)) for data_type in stale
+        ], "Building analytics")
+        if states is None:
+            return
+        for data_type, state in zip(stale, states):
+            install_rollup(data_type, RollupCube.from_state(data_type, state))
+    
     # Charts and visualizations
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Monthly Expenses")
         if st.session_state.expenses:
-            # Group expenses by month
-            monthly_data = {}
-            for exp in st.session_state.expenses:
-                exp_date = datetime.fromisoformat(exp['date'])
-                month_key = f"{exp_date.year}-{exp_date.month:02d}"
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = 0
-                monthly_data[month_key] += exp['amount']
-            
-            if monthly_data:
-                df = pd.DataFrame(list(monthly_data.items()), columns=['Month', 'Amount'])
-                st.bar_chart(df.set_index('Month'))
+            expense_rollup = get_rollup('expenses')
+            months_df = monthly_expenses(st.session_state.expenses, expense_rollup)
+            if not months_df.empty:
+                st.bar_chart(months_df.set_index('Month'))
+                
+                # Drill down into one month
+                selected_month = st.selectbox("Drill into Month", list(reversed(months_df['Month'])),
+                                              key="analytics_drill_month")
+                breakdown_by = st.radio("Break Down By", ["Category", "Vendor"], horizontal=True,
+                                        key="analytics_drill_expense_by")
+                year, month = (int(part) for part in selected_month.split('-'))
+                st.dataframe(expense_breakdown(expense_rollup, year, month, breakdown_by.lower()),
+                             hide_index=True, use_container_width=True)
         else:
             st.info("No expense data available")
     
     with col2:
         st.subheader("Operations by Type")
         if st.session_state.operations:
-            op_types = {}
-            for op in st.session_state.operations:
-                if op['type'] not in op_types:
-                    op_types[op['type']] = 0
-                op_types[op['type']] += 1
-            
-            if op_types:
-                df = pd.DataFrame(list(op_types.items()), columns=['Operation Type', 'Count'])
-                st.bar_chart(df.set_index('Operation Type'))
+            operation_rollup = get_rollup('operations')
+            types_df = operations_by_type(st.session_state.operations, operation_rollup)
+            if not types_df.empty:
+                st.bar_chart(types_df.set_index('Operation Type'))
+                
+                # Drill down into one operation type
+                selected_type = st.selectbox("Drill into Operation Type", list(types_df['Operation Type']),
+                                             key="analytics_drill_operation_type")
+                st.dataframe(operation_breakdown(operation_rollup, selected_type),
+                             hide_index=True, use_container_width=True)
         else:
             st.info("No operations data available")
     
@@ -450,26 +478,7 @@ def show_analytics():
     st.subheader("Recent Activity Summary")
     
     # Combine recent activities from all modules
-    recent_activities = []
-    
-    # Recent operations
-    for op in sorted(st.session_state.operations, key=lambda x: x['date'], reverse=True)[:3]:
-        recent_activities.append({
-            'date': op['date'],
-            'type': 'Operation',
-            'description': f"{op['type']} - {op['description']}"
-        })
-    
-    # Recent expenses
-    for exp in sorted(st.session_state.expenses, key=lambda x: x['date'], reverse=True)[:3]:
-        recent_activities.append({
-            'date': exp['date'],
-            'type': 'Expense',
-            'description': f"{exp['category']} - ${exp['amount']:.2f}"
-        })
-    
-    # Sort all activities by date
-    recent_activities.sort(key=lambda x: x['date'], reverse=True)
+    recent_activities = recent_activity(st.session_state.operations, st.session_state.expenses)
     
     for activity in recent_activities[:10]:  # Show top 10 recent activities
         st.write(f"**{activity['date']}** - {activity['type']}: {activity['description']}")
@@ -1,41 +1,45 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, date
-from utils.database import save_data, load_data
+from utils.database import get_data_version
 from utils.common import validate_input
+from utils.navigation import show_active_view, ensure_session_data
+from utils.records import add_record, update_record
+from utils.bulk_import import show_bulk_import
+from utils.counters import get_sum
+from utils.profitability import PROFITABILITY_COLUMNS, compute_profitability
+from utils.simulation import simulate_revenue_plans
+from utils.price_series import get_price_store
+from utils.forecasting import get_price_models, fit_price_models, forecast_for_year, forecast_units, forecast_table, crop_forecast
+from utils.sensitivity import crop_baselines, evaluate_grid, break_even_by_plan
+from utils.cost_view import get_cost_view, cost_table
+from utils.reports import (
+    REVENUE_SUMMARY_COLUMNS, COST_REPORT_COLUMNS, revenue_summary, cost_report, cost_by_crop, profitability_totals
+)
+from utils.rollups import get_rollup
+from utils.report_jobs import ReportTask, report_results
+from utils.snapshots import get_report_snapshot
+from utils.compact import records_frame
+from utils.categorical import group_sums
 
 def show():
     """Crop Revenue Planner Application"""
     st.title("💰 Crop Revenue Planner")
     st.markdown("Plan crop revenue, analyze profitability, and make data-driven financial decisions")
     
-    # Initialize session state for revenue planner
-    if 'revenue_plans' not in st.session_state:
-        st.session_state.revenue_plans = load_data('revenue_plans', [])
-    
-    if 'crop_prices' not in st.session_state:
-        st.session_state.crop_prices = load_data('crop_prices', [])
-    
-    if 'profit_analysis' not in st.session_state:
-        st.session_state.profit_analysis = load_data('profit_analysis', [])
-    
-    # Tab navigation within the app
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Revenue Planning", "Crop Prices", "Cost Analysis", "Profitability", "Financial Reports"])
-    
-    with tab1:
-        show_revenue_planning()
-    
-    with tab2:
-        show_crop_prices()
-    
-    with tab3:
-        show_cost_analysis()
-    
-    with tab4:
-        show_profitability_analysis()
-    
-    with tab5:
-        show_financial_reports()
+    # Only the selected view runs; its datasets are loaded on first use
+    show_active_view("revenue_planner", {
+        "Revenue Planning": (show_revenue_planning, ['revenue_plans']),
+        "Crop Prices": (show_crop_prices, ['crop_prices']),
+        "Cost Analysis": (show_cost_analysis, ['profit_analysis']),
+        "Profitability": (show_profitability_analysis, ['revenue_plans', 'profit_analysis']),
+        "Sensitivity": (show_sensitivity_analysis, ['revenue_plans', 'profit_analysis']),
+        "Planned vs Actual": (show_planned_vs_actual, [
+            'fields', 'farm_plans', 'operations', 'expenses', 'revenue_plans', 'profit_analysis'
+        ]),
+        "Financial Reports": (show_financial_reports, ['revenue_plans', 'profit_analysis', 'crop_prices'])
+    })
 
 def show_revenue_planning():
     """Revenue Planning Interface"""
@@ -45,6 +49,9 @@ def show_revenue_planning():
     
     with col1:
         st.subheader("Create Revenue Plan")
+        # Messages from the last submission, kept across the rerun that shows the new plan
+        for level, message in st.session_state.pop('revenue_plan_messages', []):
+            getattr(st, level)(message)
         with st.form("add_revenue_plan"):
             plan_name = st.text_input("Plan Name")
             crop_type = st.selectbox("Crop Type", [
@@ -55,12 +62,29 @@ def show_revenue_planning():
             expected_yield = st.number_input("Expected Yield (per acre)", min_value=0.0, step=0.1)
             yield_unit = st.selectbox("Yield Unit", ["bushels", "tons", "pounds", "boxes", "bags"])
             expected_price = st.number_input(f"Expected Price ($ per {yield_unit})", min_value=0.0, step=0.01)
+            use_forecast_price = st.checkbox("Use forecast price for the planning year when available")
             planning_year = st.number_input("Planning Year", min_value=2020, max_value=2030, value=datetime.now().year)
             notes = st.text_area("Notes")
             
             submitted = st.form_submit_button("Create Plan")
             
             if submitted and validate_input([plan_name]):
+                messages = []
+                price_source = 'manual'
+                if use_forecast_price:
+                    ensure_session_data(['crop_prices'])
+                    price_models = get_price_models()
+                    forecast_price = forecast_for_year(price_models, crop_type, yield_unit, int(planning_year))
+                    other_units = [unit for unit in forecast_units(price_models, crop_type) if unit != yield_unit]
+                    if forecast_price is not None:
+                        expected_price = round(forecast_price, 2)
+                        price_source = 'forecast'
+                    elif other_units:
+                        messages.append(('warning', f"{crop_type} prices are forecast per {', '.join(other_units)}, not per "
+                                                    f"{yield_unit}; using the entered price."))
+                    else:
+                        messages.append(('warning', f"No price forecast available for {crop_type} in {planning_year}; using the entered price."))
+                
                 total_yield = planned_area * expected_yield
                 total_revenue = total_yield * expected_price
                 
@@ -72,6 +96,7 @@ def show_revenue_planning():
                     'expected_yield_per_acre': expected_yield,
                     'yield_unit': yield_unit,
                     'expected_price': expected_price,
+                    'price_source': price_source,
                     'total_expected_yield': total_yield,
                     'total_expected_revenue': total_revenue,
                     'planning_year': planning_year,
@@ -79,28 +104,25 @@ def show_revenue_planning():
                     'status': 'Planned',
                     'created_date': datetime.now().isoformat()
                 }
-                st.session_state.revenue_plans.append(new_plan)
-                save_data('revenue_plans', st.session_state.revenue_plans)
-                st.success(f"Revenue plan '{plan_name}' created successfully!")
-                st.success(f"Expected total revenue: ${total_revenue:.2f}")
+                add_record('revenue_plans', new_plan)
+                messages.append(('success', f"Revenue plan '{plan_name}' created successfully!"))
+                messages.append(('success', f"Expected total revenue: ${total_revenue:.2f}"))
+                st.session_state.revenue_plan_messages = messages
                 st.rerun()
     
     with col2:
         st.subheader("Revenue Plan Summary")
         if st.session_state.revenue_plans:
-            total_planned_revenue = sum([plan['total_expected_revenue'] for plan in st.session_state.revenue_plans])
-            total_planned_area = sum([plan['planned_area'] for plan in st.session_state.revenue_plans])
+            total_planned_revenue = get_sum('revenue_plans', 'total_expected_revenue')
+            total_planned_area = get_sum('revenue_plans', 'planned_area')
             
             st.metric("Total Planned Revenue", f"${total_planned_revenue:,.2f}")
             st.metric("Total Planned Area", f"{total_planned_area:.1f} acres")
             st.metric("Active Plans", len(st.session_state.revenue_plans))
             
             # Revenue by crop type
-            crop_revenue = {}
-            for plan in st.session_state.revenue_plans:
-                if plan['crop_type'] not in crop_revenue:
-                    crop_revenue[plan['crop_type']] = 0
-                crop_revenue[plan['crop_type']] += plan['total_expected_revenue']
+            crop_revenue = group_sums('revenue_plans', st.session_state.revenue_plans, 'crop_type',
+                                      'total_expected_revenue')
             
             st.subheader("Revenue by Crop Type")
             for crop, revenue in sorted(crop_revenue.items(), key=lambda x: x[1], reverse=True):
@@ -120,6 +142,8 @@ def show_revenue_planning():
                     st.write(f"**Area:** {plan['planned_area']} acres")
                     st.write(f"**Expected Yield:** {plan['expected_yield_per_acre']} {plan['yield_unit']}/acre")
                     st.write(f"**Price:** ${plan['expected_price']:.2f} per {plan['yield_unit']}")
+                    if plan.get('price_source') == 'forecast':
+                        st.caption("Price taken from the crop price forecast")
                 
                 with col2:
                     st.write(f"**Total Yield:** {plan['total_expected_yield']} {plan['yield_unit']}")
@@ -139,15 +163,83 @@ def show_revenue_planning():
                 )
                 
                 if st.button(f"Update Status", key=f"update_revenue_{plan['id']}"):
-                    plan['status'] = new_status
-                    save_data('revenue_plans', st.session_state.revenue_plans)
+                    update_record('revenue_plans', plan, {'status': new_status})
                     st.success("Status updated!")
                     st.rerun()
+        
+        show_revenue_simulation()
+
+def show_revenue_simulation():
+    """Monte Carlo revenue and profit distributions for all revenue plans"""
+    st.subheader("Revenue Risk Simulation")
+    
+    with st.form("revenue_simulation"):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            n_scenarios = st.select_slider("Scenarios", [5000, 10000, 20000, 50000], value=20000)
+            yield_cv = st.slider("Yield Variability (%)", 0, 60, 15)
+        
+        with col2:
+            price_cv = st.slider("Price Variability (%)", 0, 60, 20)
+            correlation = st.slider("Yield/Price Correlation", -0.9, 0.9, -0.3, step=0.1)
+        
+        with col3:
+            use_price_history = st.checkbox("Use recorded price history for price variability")
+        
+        submitted = st.form_submit_button("Run Simulation")
+    
+    plans_version = (get_data_version('revenue_plans'), len(st.session_state.revenue_plans))
+    
+    if submitted:
+        ensure_session_data(['profit_analysis', 'crop_prices'])
+        st.session_state.revenue_simulation_results = {
+            'plans_version': plans_version,
+            'results': simulate_revenue_plans(
+                st.session_state.revenue_plans,
+                st.session_state.profit_analysis,
+                st.session_state.crop_prices,
+                yield_cv=yield_cv / 100,
+                price_cv=price_cv / 100,
+                use_price_history=use_price_history,
+                n_scenarios=n_scenarios,
+                correlation=correlation
+            )
+        }
+    
+    simulation = st.session_state.get('revenue_simulation_results')
+    if not simulation:
+        st.info("Run a simulation to see revenue and profit ranges for your plans.")
+        return
+    
+    if simulation['plans_version'] != plans_version:
+        st.warning("Revenue plans changed since this simulation was run. Run it again to refresh.")
+    
+    farm = simulation['results']['farm']
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Revenue P5 / P95", f"${farm['revenue_p5']:,.0f} / ${farm['revenue_p95']:,.0f}")
+    with col2:
+        st.metric("Median Revenue", f"${farm['revenue_p50']:,.2f}")
+    with col3:
+        st.metric("Median Profit", f"${farm['profit_p50']:,.2f}",
+                  delta=f"P5 ${farm['profit_p5']:,.0f}", delta_color="off")
+    with col4:
+        st.metric("Probability of Loss", f"{farm['loss_probability'] * 100:.1f}%")
+    
+    plan_results = simulation['results']['plans']
+    st.dataframe(plan_results.round(2), use_container_width=True)
+    
+    if not plan_results['has_cost_data'].all():
+        st.caption("Plans without a cost analysis for their crop are simulated with zero cost.")
 
 def show_crop_prices():
     """Crop Prices Interface"""
     st.header("Crop Price Management")
     
+    show_bulk_import('crop_prices')
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -176,20 +268,15 @@ def show_crop_prices():
                     'notes': notes,
                     'recorded_date': datetime.now().isoformat()
                 }
-                st.session_state.crop_prices.append(new_price)
-                save_data('crop_prices', st.session_state.crop_prices)
+                add_record('crop_prices', new_price)
                 st.success(f"Price for {crop_name} added: ${current_price:.2f} per {price_unit}")
                 st.rerun()
     
     with col2:
         st.subheader("Current Market Prices")
         if st.session_state.crop_prices:
-            # Get latest price for each crop
-            latest_prices = {}
-            for price in st.session_state.crop_prices:
-                crop = price['crop']
-                if crop not in latest_prices or price['price_date'] > latest_prices[crop]['price_date']:
-                    latest_prices[crop] = price
+            # Latest price for each crop is the tail of its series
+            latest_prices = get_price_store().latest_prices()
             
             for crop, price_info in latest_prices.items():
                 st.write(f"**{crop}:** ${price_info['price']:.2f} per {price_info['unit']}")
@@ -200,23 +287,29 @@ def show_crop_prices():
     # Price history
     st.subheader("Price History")
     if st.session_state.crop_prices:
-        selected_crop = st.selectbox("Select Crop for History", 
-                                   list(set([p['crop'] for p in st.session_state.crop_prices])))
+        price_store = get_price_store()
+        selected_crop = st.selectbox("Select Crop for History", price_store.crops())
         
         if selected_crop:
-            crop_prices = [p for p in st.session_state.crop_prices if p['crop'] == selected_crop]
-            crop_prices.sort(key=lambda x: x['price_date'], reverse=True)
+            crop_prices = price_store.get(selected_crop).records
             
             if crop_prices:
-                df = pd.DataFrame(crop_prices)
+                df = records_frame(crop_prices[::-1])
                 st.dataframe(df[['price_date', 'price', 'unit', 'market_source']], use_container_width=True)
                 
-                # Price trend chart
+                # Price trend chart (series is already sorted by date)
                 if len(crop_prices) > 1:
-                    chart_df = df[['price_date', 'price']].copy()
+                    chart_df = pd.DataFrame(crop_prices, columns=['price_date', 'price'])
                     chart_df['price_date'] = pd.to_datetime(chart_df['price_date'])
-                    chart_df = chart_df.sort_values('price_date')
                     st.line_chart(chart_df.set_index('price_date'))
+        
+        # Forecasts for all crops, refit only when new prices are recorded
+        st.subheader("Price Forecasts")
+        price_models = get_price_models()
+        if price_models:
+            st.dataframe(forecast_table(price_models).round(2), use_container_width=True)
+            st.caption("Monthly forecasts per crop and recorded price unit. The model with the lowest "
+                       "one-step error is chosen per crop and unit.")
 
 def show_cost_analysis():
     """Cost Analysis Interface"""
@@ -266,16 +359,15 @@ def show_cost_analysis():
                     'year': cost_year,
                     'created_date': datetime.now().isoformat()
                 }
-                st.session_state.profit_analysis.append(new_cost_analysis)
-                save_data('profit_analysis', st.session_state.profit_analysis)
+                add_record('profit_analysis', new_cost_analysis)
                 st.success(f"Cost analysis added: ${total_cost:.2f} total (${cost_per_acre:.2f}/acre)")
                 st.rerun()
     
     with col2:
         st.subheader("Cost Summary")
         if st.session_state.profit_analysis:
-            total_costs = sum([analysis['total_cost'] for analysis in st.session_state.profit_analysis])
-            total_area_analyzed = sum([analysis['area'] for analysis in st.session_state.profit_analysis])
+            total_costs = get_sum('profit_analysis', 'total_cost')
+            total_area_analyzed = get_sum('profit_analysis', 'area')
             avg_cost_per_acre = total_costs / total_area_analyzed if total_area_analyzed > 0 else 0
             
             st.metric("Total Costs Analyzed", f"${total_costs:,.2f}")
@@ -284,13 +376,13 @@ def show_cost_analysis():
             # Cost breakdown by category
             st.subheader("Cost Breakdown")
             total_by_category = {
-                'Seeds': sum([a['seed_cost'] for a in st.session_state.profit_analysis]),
-                'Fertilizers': sum([a['fertilizer_cost'] for a in st.session_state.profit_analysis]),
-                'Pesticides': sum([a['pesticide_cost'] for a in st.session_state.profit_analysis]),
-                'Fuel': sum([a['fuel_cost'] for a in st.session_state.profit_analysis]),
-                'Labor': sum([a['labor_cost'] for a in st.session_state.profit_analysis]),
-                'Equipment': sum([a['equipment_cost'] for a in st.session_state.profit_analysis]),
-                'Other': sum([a['other_cost'] for a in st.session_state.profit_analysis])
+                'Seeds': get_sum('profit_analysis', 'seed_cost'),
+                'Fertilizers': get_sum('profit_analysis', 'fertilizer_cost'),
+                'Pesticides': get_sum('profit_analysis', 'pesticide_cost'),
+                'Fuel': get_sum('profit_analysis', 'fuel_cost'),
+                'Labor': get_sum('profit_analysis', 'labor_cost'),
+                'Equipment': get_sum('profit_analysis', 'equipment_cost'),
+                'Other': get_sum('profit_analysis', 'other_cost')
             }
             
             for category, cost in total_by_category.items():
@@ -310,43 +402,23 @@ def show_profitability_analysis():
     # Profitability calculation
     st.subheader("Crop Profitability Comparison")
     
-    profitability_data = []
+    match_year = st.checkbox("Match costs to each plan's planning year", key="profitability_match_year")
+    snapshot = get_report_snapshot()
+    if snapshot is not None:
+        df = pd.DataFrame(snapshot['profitability']['match_year' if match_year else 'latest_cost'],
+                          columns=PROFITABILITY_COLUMNS)
+    else:
+        # Both variants are computed in the background, so toggling the checkbox is instant
+        results = report_results('profitability', [
+            ReportTask(compute_profitability, ('revenue_plans', 'profit_analysis'), (False,)),
+            ReportTask(compute_profitability, ('revenue_plans', 'profit_analysis'), (True,))
+        ], "Profitability")
+        if results is None:
+            return
+        df = results[int(match_year)]
     
-    for revenue_plan in st.session_state.revenue_plans:
-        # Find matching cost analysis
-        matching_costs = [
-            cost for cost in st.session_state.profit_analysis
-            if cost['crop'] == revenue_plan['crop_type']
-        ]
-        
-        if matching_costs:
-            # Use the most recent cost analysis
-            cost_analysis = max(matching_costs, key=lambda x: x['created_date'])
-            
-            # Calculate profitability
-            revenue_per_acre = revenue_plan['total_expected_revenue'] / revenue_plan['planned_area']
-            cost_per_acre = cost_analysis['cost_per_acre']
-            profit_per_acre = revenue_per_acre - cost_per_acre
-            profit_margin = (profit_per_acre / revenue_per_acre * 100) if revenue_per_acre > 0 else 0
-            total_profit = profit_per_acre * revenue_plan['planned_area']
-            
-            profitability_data.append({
-                'crop': revenue_plan['crop_type'],
-                'area': revenue_plan['planned_area'],
-                'revenue_per_acre': revenue_per_acre,
-                'cost_per_acre': cost_per_acre,
-                'profit_per_acre': profit_per_acre,
-                'profit_margin': profit_margin,
-                'total_profit': total_profit,
-                'plan_name': revenue_plan['name']
-            })
-    
-    if profitability_data:
-        # Sort by profit per acre
-        profitability_data.sort(key=lambda x: x['profit_per_acre'], reverse=True)
-        
-        # Display profitability table
-        df = pd.DataFrame(profitability_data)
+    if not df.empty:
+        # Display profitability table (already sorted by profit per acre)
         st.dataframe(df[[
             'crop', 'area', 'revenue_per_acre', 'cost_per_acre', 
             'profit_per_acre', 'profit_margin', 'total_profit'
@@ -355,21 +427,19 @@ def show_profitability_analysis():
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
         
+        totals = profitability_totals(df)
+        
         with col1:
-            total_revenue = sum([p['revenue_per_acre'] * p['area'] for p in profitability_data])
-            st.metric("Total Expected Revenue", f"${total_revenue:,.2f}")
+            st.metric("Total Expected Revenue", f"${totals['total_revenue']:,.2f}")
         
         with col2:
-            total_costs = sum([p['cost_per_acre'] * p['area'] for p in profitability_data])
-            st.metric("Total Costs", f"${total_costs:,.2f}")
+            st.metric("Total Costs", f"${totals['total_costs']:,.2f}")
         
         with col3:
-            total_profit = sum([p['total_profit'] for p in profitability_data])
-            st.metric("Total Expected Profit", f"${total_profit:,.2f}")
+            st.metric("Total Expected Profit", f"${totals['total_profit']:,.2f}")
         
         with col4:
-            overall_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-            st.metric("Overall Profit Margin", f"{overall_margin:.1f}%")
+            st.metric("Overall Profit Margin", f"{totals['margin']:.1f}%")
         
         # Profit visualization
         st.subheader("Profit by Crop")
@@ -381,14 +451,14 @@ def show_profitability_analysis():
         
         with col1:
             st.subheader("Most Profitable")
-            most_profitable = profitability_data[0]
+            most_profitable = df.iloc[0]
             st.success(f"**{most_profitable['crop']}**")
             st.write(f"Profit per acre: ${most_profitable['profit_per_acre']:.2f}")
             st.write(f"Profit margin: {most_profitable['profit_margin']:.1f}%")
         
         with col2:
             st.subheader("Needs Attention")
-            least_profitable = profitability_data[-1]
+            least_profitable = df.iloc[-1]
             if least_profitable['profit_per_acre'] < 0:
                 st.error(f"**{least_profitable['crop']}** (Loss)")
             else:
@@ -399,6 +469,116 @@ def show_profitability_analysis():
     else:
         st.info("No matching revenue plans and cost analyses found. Make sure you have both for the same crops.")
 
+def show_sensitivity_analysis():
+    """Price x Yield x Cost Sensitivity Interface"""
+    st.header("Sensitivity Analysis")
+    
+    if not st.session_state.revenue_plans or not st.session_state.profit_analysis:
+        st.warning("Please create revenue plans and cost analyses to run a sensitivity analysis.")
+        return
+    
+    # Baselines only change with the data; the grid itself is cached by input hash
+    data_version = (
+        get_data_version('revenue_plans'), len(st.session_state.revenue_plans),
+        get_data_version('profit_analysis'), len(st.session_state.profit_analysis)
+    )
+    cached = st.session_state.get('_sensitivity_baselines')
+    if cached is None or cached['data_version'] != data_version:
+        cached = {
+            'data_version': data_version,
+            'baselines': crop_baselines(st.session_state.revenue_plans, st.session_state.profit_analysis),
+            'break_even': break_even_by_plan(st.session_state.revenue_plans, st.session_state.profit_analysis)
+        }
+        st.session_state['_sensitivity_baselines'] = cached
+    
+    baselines = cached['baselines']
+    if baselines.empty:
+        st.info("No matching revenue plans and cost analyses found. Make sure you have both for the same crops.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        grid_range = st.slider("Grid Range (±%)", 10, 50, 30, step=10)
+    with col2:
+        grid_steps = st.select_slider("Grid Steps", [5, 7, 9, 11, 13], value=7)
+    
+    multipliers = np.linspace(1 - grid_range / 100, 1 + grid_range / 100, grid_steps)
+    profit = evaluate_grid(baselines, multipliers, multipliers, multipliers)
+    percent_labels = [f"{(m - 1) * 100:+.0f}%" for m in multipliers]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        price_change = st.select_slider("Price Change", percent_labels, value=percent_labels[grid_steps // 2])
+    with col2:
+        yield_change = st.select_slider("Yield Change", percent_labels, value=percent_labels[grid_steps // 2])
+    with col3:
+        cost_change = st.select_slider("Cost Change", percent_labels, value=percent_labels[grid_steps // 2])
+    
+    p, y, c = (percent_labels.index(label) for label in (price_change, yield_change, cost_change))
+    
+    # Every crop at the selected scenario
+    st.subheader("Profit by Crop at Selected Scenario")
+    scenario_df = pd.DataFrame({
+        'baseline_profit': profit[:, grid_steps // 2, grid_steps // 2, grid_steps // 2],
+        'scenario_profit': profit[:, p, y, c]
+    }, index=baselines.index)
+    scenario_df['change'] = scenario_df['scenario_profit'] - scenario_df['baseline_profit']
+    st.dataframe(scenario_df.round(2), use_container_width=True)
+    st.metric("Total Scenario Profit", f"${scenario_df['scenario_profit'].sum():,.2f}",
+              delta=f"${scenario_df['change'].sum():,.2f}")
+    
+    # Price x yield grid for one crop at the selected cost change
+    st.subheader("Price × Yield Grid")
+    selected_crop = st.selectbox("Crop", list(baselines.index), key="sensitivity_crop")
+    crop_idx = list(baselines.index).index(selected_crop)
+    grid_df = pd.DataFrame(
+        profit[crop_idx, :, :, c],
+        index=[f"Price {label}" for label in percent_labels],
+        columns=[f"Yield {label}" for label in percent_labels]
+    )
+    st.dataframe(grid_df.round(0), use_container_width=True)
+    
+    # Break-even points
+    st.subheader("Break-even by Plan")
+    st.dataframe(cached['break_even'].round(2), use_container_width=True)
+
+def show_planned_vs_actual():
+    """Planned vs. Actual Cost Interface"""
+    st.header("Planned vs. Actual Costs")
+    st.markdown("Recorded operations and expenses attributed to crop plans, compared with your cost analyses")
+    
+    if not st.session_state.farm_plans:
+        st.warning("Create crop plans in the Farm Planner to compare planned and actual costs.")
+        return
+    
+    # Operations are charged to the plans on their field that day, expenses to
+    # every plan active on their date, both in proportion to planted area
+    view = get_cost_view()
+    table = cost_table(view, st.session_state.fields, st.session_state.farm_plans,
+                       st.session_state.revenue_plans, st.session_state.profit_analysis)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Actual Costs (attributed)", f"${table['actual_cost'].sum():,.2f}")
+    with col2:
+        st.metric("Unattributed Operations", f"${view['unmatched']['operations']:,.2f}")
+    with col3:
+        st.metric("Unattributed Expenses", f"${view['unmatched']['expenses']:,.2f}")
+    
+    st.subheader("By Crop Plan")
+    st.dataframe(table.round(2), use_container_width=True, hide_index=True)
+    
+    st.subheader("By Crop")
+    by_crop = table.groupby('crop')[['area', 'actual_cost']].sum()
+    by_crop['actual_cost_per_acre'] = by_crop['actual_cost'] / by_crop['area'].where(by_crop['area'] > 0)
+    by_crop['planned_cost_per_acre'] = (
+        (table['planned_cost_per_acre'] * table['area']).groupby(table['crop']).sum(min_count=1) / by_crop['area']
+    )
+    st.bar_chart(by_crop[['planned_cost_per_acre', 'actual_cost_per_acre']])
+    
+    if view['unknown_fields']:
+        st.caption(f"Operations on unknown fields: {', '.join(sorted(view['unknown_fields'])[:20])}")
+
 def show_financial_reports():
     """Financial Reports Interface"""
     st.header("Financial Reports")
@@ -412,31 +592,35 @@ def show_financial_reports():
         "Revenue Summary", "Cost Analysis Report", "Profitability Report", "Price Trend Report"
     ])
     
+    # Reports render from the precomputed snapshot unless the data changed since it was taken
+    snapshot = get_report_snapshot()
+    if snapshot is not None:
+        st.caption(f"📸 Computed at {snapshot['computed_at']}")
+    else:
+        st.caption("⏳ Computed live; a fresh snapshot is being prepared")
+    
     if report_type == "Revenue Summary":
         st.subheader("Revenue Summary Report")
         
         if st.session_state.revenue_plans:
             # Filter by year
-            available_years = list(set([plan['planning_year'] for plan in st.session_state.revenue_plans]))
-            selected_year = st.selectbox("Select Year", sorted(available_years))
-            
-            year_plans = [plan for plan in st.session_state.revenue_plans if plan['planning_year'] == selected_year]
+            if snapshot is not None:
+                selected_year = st.selectbox("Select Year", snapshot['revenue_summary']['years'])
+                summary = snapshot['revenue_summary']['by_year'][str(selected_year)]
+            else:
+                revenue_rollup = get_rollup('revenue_plans')
+                selected_year = st.selectbox("Select Year", revenue_rollup.values('year'))
+                summary = revenue_summary(st.session_state.revenue_plans, selected_year, revenue_rollup)
             
-            if year_plans:
+            if summary['plans']:
                 st.write(f"### Revenue Plans for {selected_year}")
                 
-                total_revenue = sum([plan['total_expected_revenue'] for plan in year_plans])
-                total_area = sum([plan['planned_area'] for plan in year_plans])
-                
-                st.metric("Total Expected Revenue", f"${total_revenue:,.2f}")
-                st.metric("Total Planned Area", f"{total_area:.1f} acres")
+                st.metric("Total Expected Revenue", f"${summary['total_revenue']:,.2f}")
+                st.metric("Total Planned Area", f"{summary['total_area']:.1f} acres")
                 
                 # Detailed breakdown
-                revenue_df = pd.DataFrame(year_plans)
-                st.dataframe(revenue_df[[
-                    'name', 'crop_type', 'planned_area', 'expected_yield_per_acre', 
-                    'expected_price', 'total_expected_revenue'
-                ]], use_container_width=True)
+                revenue_df = pd.DataFrame(summary['plans'])
+                st.dataframe(revenue_df[REVENUE_SUMMARY_COLUMNS], use_container_width=True)
         else:
             st.info("No revenue plans available.")
     
@@ -445,39 +629,33 @@ def show_financial_reports():
         
         if st.session_state.profit_analysis:
             # Filter by year
-            available_years = list(set([analysis['year'] for analysis in st.session_state.profit_analysis]))
-            selected_year = st.selectbox("Select Year", sorted(available_years))
-            
-            year_costs = [analysis for analysis in st.session_state.profit_analysis if analysis['year'] == selected_year]
+            if snapshot is not None:
+                selected_year = st.selectbox("Select Year", snapshot['cost_report']['years'])
+                report = snapshot['cost_report']['by_year'][str(selected_year)]
+                crops_df = pd.DataFrame(**report['by_crop'])
+            else:
+                cost_rollup = get_rollup('profit_analysis')
+                selected_year = st.selectbox("Select Year", cost_rollup.values('year'))
+                report = cost_report(st.session_state.profit_analysis, selected_year, cost_rollup)
+                crops_df = cost_by_crop(cost_rollup, selected_year)
             
-            if year_costs:
+            if report['analyses']:
                 st.write(f"### Cost Analysis for {selected_year}")
                 
-                total_cost = sum([analysis['total_cost'] for analysis in year_costs])
-                total_area = sum([analysis['area'] for analysis in year_costs])
-                avg_cost_per_acre = total_cost / total_area if total_area > 0 else 0
-                
-                st.metric("Total Costs", f"${total_cost:,.2f}")
-                st.metric("Average Cost per Acre", f"${avg_cost_per_acre:.2f}")
+                st.metric("Total Costs", f"${report['total_cost']:,.2f}")
+                st.metric("Average Cost per Acre", f"${report['avg_cost_per_acre']:.2f}")
                 
                 # Cost breakdown chart
-                cost_categories = ['seed_cost', 'fertilizer_cost', 'pesticide_cost', 
-                                 'fuel_cost', 'labor_cost', 'equipment_cost', 'other_cost']
-                
-                category_totals = {}
-                for category in cost_categories:
-                    total = sum([analysis[category] for analysis in year_costs])
-                    category_name = category.replace('_cost', '').title()
-                    category_totals[category_name] = total
-                
-                chart_df = pd.DataFrame(list(category_totals.items()), columns=['Category', 'Cost'])
+                chart_df = pd.DataFrame(list(report['category_totals'].items()), columns=['Category', 'Cost'])
                 st.bar_chart(chart_df.set_index('Category'))
                 
+                # Drill down: each crop's costs by category
+                st.write("#### Costs by Crop")
+                st.dataframe(crops_df.round(2), use_container_width=True)
+                
                 # Detailed breakdown
-                costs_df = pd.DataFrame(year_costs)
-                st.dataframe(costs_df[[
-                    'crop', 'area', 'total_cost', 'cost_per_acre'
-                ]], use_container_width=True)
+                costs_df = pd.DataFrame(report['analyses'])
+                st.dataframe(costs_df[COST_REPORT_COLUMNS], use_container_width=True)
         else:
             st.info("No cost analysis data available.")
     
@@ -489,32 +667,35 @@ def show_financial_reports():
         
         if st.session_state.crop_prices:
             # Select crop for trend analysis
-            available_crops = list(set([price['crop'] for price in st.session_state.crop_prices]))
-            selected_crop = st.selectbox("Select Crop", available_crops)
-            
-            crop_prices = [p for p in st.session_state.crop_prices if p['crop'] == selected_crop]
-            crop_prices.sort(key=lambda x: x['price_date'])
+            if snapshot is not None:
+                selected_crop = st.selectbox("Select Crop", list(snapshot['price_trends']))
+                trend = snapshot['price_trends'][selected_crop]
+            else:
+                price_store = get_price_store()
+                selected_crop = st.selectbox("Select Crop", price_store.crops())
+                trend = price_store.get(selected_crop).summary()
             
-            if len(crop_prices) > 1:
+            if len(trend['prices']) > 1:
                 st.write(f"### Price Trend for {selected_crop}")
                 
                 # Create trend chart
-                df = pd.DataFrame(crop_prices)
+                df = pd.DataFrame(trend['prices'], columns=['price_date', 'price'])
                 df['price_date'] = pd.to_datetime(df['price_date'])
                 
                 st.line_chart(df.set_index('price_date')['price'])
                 
-                # Price statistics
-                prices = [p['price'] for p in crop_prices]
-                st.write(f"**Current Price:** ${prices[-1]:.2f}")
-                st.write(f"**Highest Price:** ${max(prices):.2f}")
-                st.write(f"**Lowest Price:** ${min(prices):.2f}")
-                st.write(f"**Average Price:** ${sum(prices)/len(prices):.2f}")
+                # Price statistics (maintained incrementally by the price store)
+                st.write(f"**Current Price:** ${trend['latest_price']:.2f}")
+                st.write(f"**Highest Price:** ${trend['max_price']:.2f}")
+                st.write(f"**Lowest Price:** ${trend['min_price']:.2f}")
+                st.write(f"**Average Price:** ${trend['average']:.2f}")
+                st.write(f"**{trend['window']}-Period Moving Average:** ${trend['moving_average']:.2f}")
+                st.write(f"**Volatility:** {trend['volatility']:.1f}% per period")
                 
                 # Price change
-                if len(prices) > 1:
-                    price_change = prices[-1] - prices[-2]
-                    change_percent = (price_change / prices[-2] * 100) if prices[-2] > 0 else 0
+                if trend['has_previous']:
+                    price_change = trend['change']
+                    change_percent = trend['change_percent']
                     
                     if price_change > 0:
                         st.success(f"**Recent Change:** +${price_change:.2f} ({change_percent:+.1f}%)")
@@ -522,6 +703,19 @@ def show_financial_reports():
                         st.error(f"**Recent Change:** ${price_change:.2f} ({change_percent:+.1f}%)")
                     else:
                         st.info("**Recent Change:** No change")
+                
+                # Forward-looking prices from the fitted model, fitted in the background when live
+                if snapshot is not None:
+                    forecast = trend['forecast']
+                else:
+                    fitted = report_results('price_models', [ReportTask(fit_price_models, ('crop_prices',))],
+                                            "Price forecast")
+                    forecast = crop_forecast(fitted[0], selected_crop) if fitted else None
+                if forecast:
+                    st.write(f"**Forecast Model:** {forecast['model'].replace('_', ' ').title()}")
+                    # Snapshots written before forecasts were split by unit carry no unit
+                    price_label = f"Forecast Price ($ per {forecast['unit']})" if forecast.get('unit') else "Forecast Price"
+                    st.line_chart(pd.Series(forecast['prices'], name=price_label))
             else:
                 st.info(f"Not enough price data for {selected_crop} to show trends.")
         else:
@@ -0,0 +1,276 @@
+import argparse
+import math
+import os
+import time
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List
+from utils.database import save_data, save_data_streaming, set_active_farm, get_data_file_path
+from utils.schema import (
+    CROP_TYPES, PRICE_UNITS, EXPENSE_CATEGORIES, PAYMENT_METHODS, OPERATION_TYPES, SOIL_TYPES
+)
+
+# Record counts per data type; prices are daily for every crop over price_years
+SCALES: Dict[str, Dict[str, int]] = {
+    'small': {'fields': 50, 'farm_plans': 2000, 'expenses': 20000, 'operations': 20000,
+              'price_years': 2, 'tasks': 500, 'equipment': 50},
+    'medium': {'fields': 250, 'farm_plans': 20000, 'expenses': 200000, 'operations': 200000,
+               'price_years': 5, 'tasks': 5000, 'equipment': 200},
+    'large': {'fields': 1000, 'farm_plans': 100000, 'expenses': 1000000, 'operations': 1000000,
+              'price_years': 10, 'tasks': 20000, 'equipment': 1000}
+}
+CHUNK_SIZE = 50000
+# Scratch farm written by default, so a bare run never touches real farm data
+BENCHMARK_FARM = "benchmark"
+GENERATED_TYPES = ['fields', 'farm_plans', 'revenue_plans', 'profit_analysis', 'tasks', 'equipment',
+                   'expenses', 'operations', 'crop_prices']
+
+# Rough yield per acre, price and cost per acre per crop, so plans and costs look plausible
+CROP_PROFILES = {
+    'Corn': (180, 4.5, 600), 'Wheat': (60, 6.0, 300), 'Soybeans': (50, 11.0, 400), 'Rice': (75, 14.0, 800),
+    'Barley': (70, 5.0, 280), 'Oats': (65, 3.5, 250), 'Cotton': (900, 0.8, 550), 'Potatoes': (400, 9.0, 2500),
+    'Tomatoes': (30, 220.0, 4000), 'Carrots': (300, 12.0, 2000), 'Onions': (450, 8.0, 2200),
+    'Lettuce': (800, 6.0, 3000), 'Apples': (900, 12.0, 5000), 'Strawberries': (2000, 3.0, 4500)
+}
+PLANTED_CROPS = CROP_TYPES[:12]
+
+def _date_range(years: int):
+    end = date.today()
+    return date(end.year - years + 1, 1, 1), end
+
+def _chunks(total: int) -> Iterator[int]:
+    for start in range(0, total, CHUNK_SIZE):
+        yield min(CHUNK_SIZE, total - start)
+
+def generate_fields(rng: np.random.Generator, n: int) -> List[Dict[str, Any]]:
+    sizes = np.round(rng.lognormal(math.log(60), 0.8, n).clip(1, 2000), 1)
+    return [{
+        'id': i + 1,
+        'name': f"Field {i + 1:04d}",
+        'size': float(sizes[i]),
+        'soil_type': SOIL_TYPES[rng.integers(len(SOIL_TYPES))],
+        'irrigation': 'Yes' if rng.random() < 0.4 else 'No',
+        'notes': '',
+        'created_date': datetime(2015, 1, 1).isoformat()
+    } for i in range(n)]
+
+def generate_farm_plans(rng: np.random.Generator, fields: List[Dict[str, Any]], n: int,
+                        years: int) -> List[Dict[str, Any]]:
+    """Seasonal plans spread over fields and years, rotating crops on each field"""
+    start, _ = _date_range(years)
+    field_index = rng.integers(len(fields), size=n)
+    year = start.year + rng.integers(years, size=n)
+    plant_offset = rng.integers(60, 150, size=n)
+    duration = rng.integers(70, 200, size=n)
+    plans = []
+    for i in range(n):
+        field = fields[field_index[i]]
+        plant_date = date(int(year[i]), 1, 1) + timedelta(days=int(plant_offset[i]))
+        crop = PLANTED_CROPS[(field_index[i] + year[i]) % len(PLANTED_CROPS)]
+        plans.append({
+            'id': i + 1,
+            'name': f"{crop} {year[i]} #{i + 1}",
+            'field': field['name'],
+            'crop_type': crop,
+            'plant_date': plant_date.isoformat(),
+            'harvest_date': (plant_date + timedelta(days=int(duration[i]))).isoformat(),
+            'area_planned': round(field['size'] * float(rng.uniform(0.1, 0.5)), 1),
+            'status': ['Planned', 'Planted', 'Growing', 'Harvested'][int(rng.integers(4))],
+            'created_date': datetime(int(year[i]) - 1, 12, 1).isoformat()
+        })
+    return plans
+
+def generate_expenses(rng: np.random.Generator, n: int, years: int) -> Iterator[Dict[str, Any]]:
+    start, end = _date_range(years)
+    span = (end - start).days + 1
+    next_id = 1
+    for size in _chunks(n):
+        days = np.sort(rng.integers(span, size=size))
+        amounts = np.round(rng.lognormal(math.log(250), 1.0, size), 2) + 0.01
+        categories = rng.integers(len(EXPENSE_CATEGORIES), size=size)
+        methods = rng.integers(len(PAYMENT_METHODS), size=size)
+        for i in range(size):
+            day = (start + timedelta(days=int(days[i]))).isoformat()
+            yield {
+                'id': next_id, 'date': day, 'category': EXPENSE_CATEGORIES[categories[i]],
+                'description': f"{EXPENSE_CATEGORIES[categories[i]]} purchase", 'amount': float(amounts[i]),
+                'vendor': f"Vendor {categories[i] * 7 + methods[i]}", 'payment_method': PAYMENT_METHODS[methods[i]],
+                'recorded_date': f"{day}T12:00:00"
+            }
+            next_id += 1
+
+def generate_operations(rng: np.random.Generator, fields: List[Dict[str, Any]], n: int,
+                        years: int) -> Iterator[Dict[str, Any]]:
+    """Operations on fields, with some field names typed in a different case or spacing"""
+    start, end = _date_range(years)
+    span = (end - start).days + 1
+    next_id = 1
+    for size in _chunks(n):
+        days = np.sort(rng.integers(span, size=size))
+        field_index = rng.integers(len(fields), size=size)
+        types = rng.integers(len(OPERATION_TYPES), size=size)
+        hours = np.round(rng.uniform(0.5, 10, size), 1)
+        workers = rng.integers(1, 6, size=size)
+        variants = rng.random(size)
+        for i in range(size):
+            name = fields[field_index[i]]['name']
+            if variants[i] < 0.05:
+                name = name.lower()
+            elif variants[i] < 0.08:
+                name = f" {name} "
+            day = (start + timedelta(days=int(days[i]))).isoformat()
+            yield {
+                'id': next_id, 'date': day, 'type': OPERATION_TYPES[types[i]], 'field': name,
+                'description': f"{OPERATION_TYPES[types[i]]} on {name.strip()}",
+                'hours': float(hours[i]), 'workers': int(workers[i]),
+                'cost': round(float(hours[i]) * int(workers[i]) * 22.5, 2),
+                'recorded_date': f"{day}T18:00:00"
+            }
+            next_id += 1
+
+def generate_crop_prices(rng: np.random.Generator, years: int) -> Iterator[Dict[str, Any]]:
+    """Daily prices per crop: a seasonal random walk around each crop's typical price"""
+    start, end = _date_range(years)
+    days = (end - start).days + 1
+    day_of_year = np.array([(start + timedelta(days=d)).timetuple().tm_yday for d in range(days)])
+    next_id = 1
+    for crop in CROP_TYPES:
+        base = CROP_PROFILES[crop][1]
+        walk = np.cumsum(rng.normal(0, 0.01, days))
+        season = 0.08 * np.sin(2 * np.pi * day_of_year / 365.25)
+        prices = np.round(base * np.exp(walk - walk.mean() + season), 2).clip(0.01)
+        unit = PRICE_UNITS[CROP_TYPES.index(crop) % len(PRICE_UNITS)]
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            yield {
+                'id': next_id, 'crop': crop, 'price_date': day, 'price': float(prices[d]), 'unit': unit,
+                'market_source': 'Synthetic Exchange', 'notes': '', 'recorded_date': f"{day}T09:00:00"
+            }
+            next_id += 1
+
+def generate_revenue_plans(rng: np.random.Generator, years: int) -> List[Dict[str, Any]]:
+    start, _ = _date_range(years)
+    plans = []
+    for year in range(start.year, start.year + years):
+        for crop in PLANTED_CROPS:
+            yield_per_acre, price, _ = CROP_PROFILES[crop]
+            area = float(round(rng.uniform(20, 500), 1))
+            expected_yield = round(yield_per_acre * float(rng.uniform(0.85, 1.15)), 1)
+            expected_price = round(price * float(rng.uniform(0.85, 1.15)), 2)
+            plans.append({
+                'id': len(plans) + 1, 'name': f"{crop} {year}", 'crop_type': crop, 'planned_area': area,
+                'expected_yield_per_acre': expected_yield, 'yield_unit': 'bushels',
+                'expected_price': expected_price, 'price_source': 'manual',
+                'total_expected_yield': expected_yield * area,
+                'total_expected_revenue': expected_yield * area * expected_price,
+                'planning_year': year, 'notes': '', 'status': 'Planned',
+                'created_date': datetime(year - 1, 11, 1).isoformat()
+            })
+    return plans
+
+def generate_profit_analysis(rng: np.random.Generator, years: int) -> List[Dict[str, Any]]:
+    start, _ = _date_range(years)
+    shares = {'seed_cost': 0.15, 'fertilizer_cost': 0.2, 'pesticide_cost': 0.1, 'fuel_cost': 0.1,
+              'labor_cost': 0.25, 'equipment_cost': 0.15, 'other_cost': 0.05}
+    analyses = []
+    for year in range(start.year, start.year + years):
+        for crop in PLANTED_CROPS:
+            area = float(round(rng.uniform(20, 500), 1))
+            cost_per_acre = CROP_PROFILES[crop][2] * float(rng.uniform(0.8, 1.2))
+            costs = {key: round(share * cost_per_acre * area, 2) for key, share in shares.items()}
+            total_cost = sum(costs.values())
+            analyses.append({
+                'id': len(analyses) + 1, 'crop': crop, 'area': area, **costs,
+                'total_cost': total_cost, 'cost_per_acre': total_cost / area, 'year': year,
+                'created_date': datetime(year, 3, 1).isoformat()
+            })
+    return analyses
+
+def generate_tasks(rng: np.random.Generator, n: int, years: int) -> List[Dict[str, Any]]:
+    start, end = _date_range(years)
+    span = (end - start).days + 60
+    people = ['', 'Alex', 'Sam', 'Jordan', 'Casey', 'Riley']
+    return [{
+        'id': i + 1, 'name': f"Task {i + 1}", 'priority': ['High', 'Medium', 'Low'][int(rng.integers(3))],
+        'status': ['Pending', 'In Progress', 'Completed', 'Completed'][int(rng.integers(4))],
+        'due_date': (start + timedelta(days=int(rng.integers(span)))).isoformat(),
+        'assigned_to': people[int(rng.integers(len(people)))], 'description': '',
+        'created_date': start.isoformat()
+    } for i in range(n)]
+
+def generate_equipment(rng: np.random.Generator, n: int) -> List[Dict[str, Any]]:
+    types = ['Tractor', 'Harvester', 'Planter', 'Cultivator', 'Sprayer', 'Irrigation System', 'Hand Tools', 'Other']
+    return [{
+        'id': i + 1, 'name': f"{types[i % len(types)]} {i + 1}", 'type': types[i % len(types)],
+        'purchase_date': date(2010 + int(rng.integers(15)), 1 + int(rng.integers(12)), 1).isoformat(),
+        'purchase_cost': float(round(rng.uniform(1000, 250000), 2)),
+        'serial_number': f"SN{i + 1:06d}", 'manufacturer': f"Maker {i % 9}",
+        'condition': ['Excellent', 'Good', 'Fair', 'Poor'][int(rng.integers(4))],
+        'last_maintenance': None, 'total_hours': int(rng.integers(5000)),
+        'added_date': datetime(2015, 1, 1).isoformat()
+    } for i in range(n)]
+
+def existing_datasets(farm_id: str) -> List[str]:
+    """Data types the generator would overwrite in a farm"""
+    set_active_farm(farm_id)
+    return [data_type for data_type in GENERATED_TYPES if os.path.exists(get_data_file_path(data_type))]
+
+def write_synthetic_farm(scale: Dict[str, int], seed: int = 0, farm_id: str = BENCHMARK_FARM,
+                         force: bool = False) -> Dict[str, Any]:
+    """Write every dataset of a synthetic farm and return record counts and write times.
+
+    Refuses to replace a farm's existing data unless force is set.
+    """
+    existing = existing_datasets(farm_id)
+    if existing and not force:
+        raise FileExistsError(f"Farm {farm_id!r} already has data ({', '.join(existing)})")
+    rng = np.random.default_rng(seed)
+    years = scale['price_years']
+    summary = {}
+
+    def timed(data_type, write):
+        started = time.perf_counter()
+        count = write()
+        summary[data_type] = {'records': count, 'seconds': round(time.perf_counter() - started, 3)}
+
+    fields = generate_fields(rng, scale['fields'])
+    plans = generate_farm_plans(rng, fields, scale['farm_plans'], years)
+    for data_type, records in [
+        ('fields', fields), ('farm_plans', plans),
+        ('revenue_plans', generate_revenue_plans(rng, years)),
+        ('profit_analysis', generate_profit_analysis(rng, years)),
+        ('tasks', generate_tasks(rng, scale['tasks'], years)),
+        ('equipment', generate_equipment(rng, scale['equipment']))
+    ]:
+        timed(data_type, lambda: len(records) if save_data(data_type, records) else 0)
+
+    # Large datasets are streamed to disk without being held in memory
+    timed('expenses', lambda: save_data_streaming('expenses', generate_expenses(rng, scale['expenses'], years)))
+    timed('operations', lambda: save_data_streaming(
+        'operations', generate_operations(rng, fields, scale['operations'], years)))
+    timed('crop_prices', lambda: save_data_streaming('crop_prices', generate_crop_prices(rng, years)))
+    return summary
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Write a synthetic farm at a given scale")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    for key in SCALES['small']:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, help=f"Override the number of {key}")
+    parser.add_argument('--farm', default=BENCHMARK_FARM, help="Farm to write into")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help="Overwrite a farm that already has data")
+    args = parser.parse_args(argv)
+
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    try:
+        summary = write_synthetic_farm(scale, args.seed, args.farm, args.force)
+    except FileExistsError as e:
+        parser.error(f"{e}; pass --force to overwrite it")
+    for data_type, stats in summary.items():
+        print(f"{data_type:<16} {stats['records']:>10,} records  {stats['seconds']:>8.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.generate import SCALES, write_synthetic_farm
+from utils.database import get_data_file_path, load_data, save_data, iter_data
+from utils import reports
+from utils.common import filter_data_by_date_range
+from utils.dates import parse_iso_dates
+from utils.allocation import crop_economics, optimize_allocation
+from utils.calendar_index import CalendarIndex
+from utils.cost_view import refresh_view
+from utils.counters import build_counters
+from utils.forecasting import fit_price_models
+from utils.occupancy import OccupancyIndex
+from utils.price_series import PriceStore
+from utils.profitability import compute_profitability
+from utils.rollups import RollupCube
+from utils.task_scheduler import TaskScheduler
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DATA_TYPES = [
+    'fields', 'farm_plans', 'expenses', 'operations', 'crop_prices',
+    'revenue_plans', 'profit_analysis', 'tasks', 'equipment'
+]
+# A benchmark this much slower than the baseline, and by more than timer noise, is a regression
+REGRESSION_THRESHOLD = 1.2
+REGRESSION_MIN_SECONDS = 0.005
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Wall-clock seconds of repeated calls: best, median and mean"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return {'min': min(times), 'median': statistics.median(times), 'mean': statistics.fmean(times),
+            'repeat': repeat}
+
+def data_path_benchmarks(repeat: int) -> Dict[str, Dict[str, Any]]:
+    """load_data, save_data and streaming reads of every dataset"""
+    results = {}
+    for data_type in DATA_TYPES:
+        records = load_data(data_type, [])
+        size = os.path.getsize(get_data_file_path(data_type))
+        results[f"load_data.{data_type}"] = {**measure(lambda: load_data(data_type, []), repeat), 'bytes': size,
+                                             'records': len(records)}
+        results[f"save_data.{data_type}"] = {**measure(lambda: save_data(data_type, records), repeat),
+                                             'bytes': size, 'records': len(records)}
+    results["iter_data.expenses"] = measure(lambda: sum(1 for _ in iter_data('expenses')), repeat)
+    return results
+
+def analytics_benchmarks(repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Report computations behind the analytics, profitability and financial report views"""
+    data = {data_type: load_data(data_type, []) for data_type in DATA_TYPES}
+    years = sorted({plan['planning_year'] for plan in data['revenue_plans']})
+    profitability = compute_profitability(data['revenue_plans'], data['profit_analysis'])
+    expense_dates = parse_iso_dates(expense['date'] for expense in data['expenses'])
+    dated = expense_dates[~np.isnat(expense_dates)]
+    month_start = (dated.min().astype(object) if len(dated) else datetime.now().date()).replace(day=1)
+    cubes = {data_type: RollupCube(data_type, data[data_type])
+             for data_type in ('expenses', 'operations', 'revenue_plans', 'profit_analysis')}
+    benchmarks = {
+        # Management Tracker analytics
+        'analytics.monthly_expenses': lambda: reports.monthly_expenses(data['expenses']),
+        'analytics.operations_by_type': lambda: reports.operations_by_type(data['operations']),
+        'analytics.recent_activity': lambda: reports.recent_activity(data['operations'], data['expenses']),
+        'analytics.expense_counters': lambda: build_counters('expenses', data['expenses']),
+        'analytics.task_scheduler': lambda: TaskScheduler(data['tasks']).overdue(),
+        'analytics.monthly_expenses_rollup': lambda: reports.monthly_expenses(data['expenses'], cubes['expenses']),
+        'analytics.operations_by_type_rollup': lambda: reports.operations_by_type(
+            data['operations'], cubes['operations']),
+        'analytics.expenses_in_month': lambda: filter_data_by_date_range(
+            data['expenses'], 'date', month_start, month_start + timedelta(days=30)),
+        # Date parsing
+        'dates.parse_iso_dates': lambda: parse_iso_dates(expense['date'] for expense in data['expenses']),
+        # Revenue Planner profitability and financial reports
+        'profitability.latest_cost': lambda: compute_profitability(data['revenue_plans'], data['profit_analysis']),
+        'profitability.match_year': lambda: compute_profitability(
+            data['revenue_plans'], data['profit_analysis'], match_year=True),
+        'profitability.totals': lambda: reports.profitability_totals(profitability),
+        'reports.revenue_summary': lambda: [reports.revenue_summary(data['revenue_plans'], y) for y in years],
+        'reports.cost_report': lambda: [reports.cost_report(data['profit_analysis'], y) for y in years],
+        'reports.cost_report_rollup': lambda: [
+            reports.cost_report(data['profit_analysis'], y, cubes['profit_analysis']) for y in years],
+        'reports.rollup_build': lambda: RollupCube('expenses', data['expenses']),
+        'reports.price_store': lambda: PriceStore(data['crop_prices']),
+        'reports.price_models': lambda: fit_price_models(data['crop_prices']),
+        'reports.cost_view': lambda: refresh_view(None, data['fields'], data['farm_plans'], {
+            'operations': data['operations'], 'expenses': data['expenses']}),
+        # Farm Planner indexes and optimizer
+        'planner.calendar_index': lambda: CalendarIndex(data['farm_plans']),
+        'planner.occupancy_index': lambda: OccupancyIndex(data['farm_plans']).over_allocated_fields(data['fields']),
+        'planner.allocation_greedy': lambda: optimize_allocation(
+            data['fields'], crop_economics(data['revenue_plans'], data['profit_analysis']),
+            data['farm_plans'], solver='greedy')
+    }
+    return {name: measure(fn, repeat) for name, fn in benchmarks.items()}
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(scale_name: str, scale: Dict[str, int], repeat: int, seed: int = 0) -> Dict[str, Any]:
+    """Generate a synthetic farm in a scratch directory and time the data path and reports on it"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="farm-bench-") as scratch:
+        os.chdir(scratch)
+        try:
+            generated = write_synthetic_farm(scale, seed)
+            results = {**data_path_benchmarks(repeat), **analytics_benchmarks(repeat)}
+        finally:
+            os.chdir(cwd)
+    return {
+        'meta': {
+            'scale': scale_name, 'counts': scale, 'seed': seed, 'repeat': repeat,
+            'revision': git_revision(), 'python': sys.version.split()[0], 'platform': platform.platform(),
+            'run_at': datetime.now().isoformat(timespec='seconds')
+        },
+        'generated': generated,
+        'results': results
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Median time of every benchmark relative to a baseline run"""
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before and before['median'] > 0:
+            ratio = result['median'] / before['median']
+            slower = result['median'] - before['median'] > REGRESSION_MIN_SECONDS
+            rows.append({'benchmark': name, 'before': before['median'], 'after': result['median'], 'ratio': ratio,
+                         'regression': ratio > REGRESSION_THRESHOLD and slower})
+    return rows
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Time the data path and report computations on a synthetic farm")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help=f"Result file (default: {RESULTS_DIR}/<scale>-<timestamp>.json)")
+    parser.add_argument('--compare', help="Baseline result file to compare against")
+    args = parser.parse_args(argv)
+
+    run = run_suite(args.scale, SCALES[args.scale], args.repeat, args.seed)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{args.scale}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+
+    for name, result in run['results'].items():
+        print(f"{name:<32} {result['median'] * 1000:>10.1f} ms")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            rows = compare(run, json.load(f))
+        regressions = [row for row in rows if row['regression']]
+        for row in rows:
+            flag = "  REGRESSION" if row['regression'] else ""
+            print(f"{row['benchmark']:<32} {row['before'] * 1000:>10.1f} -> {row['after'] * 1000:>10.1f} ms"
+                  f"  x{row['ratio']:.2f}{flag}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
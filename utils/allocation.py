@@ -0,0 +1,284 @@
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from utils.schema import CROP_TYPES, SOIL_TYPES
+from utils.sensitivity import crop_baselines
+
+class YieldModel(NamedTuple):
+    """How soil and irrigation scale a crop's planned yield per acre on a field.
+
+    soil: yield relative to loam for each soil type (unlisted soils count as 1.0).
+    crop_soil: per-crop overrides of soil for crops with strong soil preferences.
+    irrigation_required: crops that cannot be grown on unirrigated fields.
+    irrigation_factor: yield multiplier on irrigated fields for every crop.
+    """
+    soil: Dict[str, float]
+    crop_soil: Dict[str, Dict[str, float]]
+    irrigation_required: Set[str]
+    irrigation_factor: float
+
+# Rough rules of thumb, not agronomic data: revenue plans state yields for
+# typical (loam) ground, so these only rank fields against each other. Pass a
+# YieldModel built from local yield records to optimize_allocation to override.
+DEFAULT_YIELD_MODEL = YieldModel(
+    soil={'Loam': 1.0, 'Silty': 0.95, 'Clay': 0.85, 'Sandy': 0.8, 'Rocky': 0.6},
+    crop_soil={
+        'Rice': {'Clay': 1.05, 'Silty': 1.0, 'Loam': 0.9, 'Sandy': 0.5},
+        'Potatoes': {'Sandy': 1.0, 'Clay': 0.7},
+        'Carrots': {'Sandy': 1.05, 'Clay': 0.65},
+        'Onions': {'Sandy': 0.95},
+        'Cotton': {'Clay': 0.95}
+    },
+    irrigation_required={'Rice'},
+    irrigation_factor=1.1
+)
+
+def crop_economics(revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Revenue and cost per acre for every crop that has both a revenue plan and a cost analysis"""
+    baselines = crop_baselines(revenue_plans, profit_analysis)
+    return pd.DataFrame({
+        'revenue_per_acre': baselines['yield_per_acre'] * baselines['price'],
+        'cost_per_acre': baselines['cost_per_acre']
+    })
+
+def last_crops(farm_plans: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Most recently planted crop on each field"""
+    latest = {}
+    for plan in farm_plans:
+        key = str(plan.get('plant_date') or '')
+        if plan['field'] not in latest or key >= latest[plan['field']][0]:
+            latest[plan['field']] = (key, plan['crop_type'])
+    return {field: crop for field, (_, crop) in latest.items()}
+
+def margin_matrix(fields: List[Dict[str, Any]], economics: pd.DataFrame,
+                  farm_plans: Optional[List[Dict[str, Any]]] = None,
+                  yield_model: YieldModel = DEFAULT_YIELD_MODEL):
+    """Profit per acre of each crop on each field, and which (field, crop) pairs are allowed.
+
+    Revenue per acre is scaled by the yield model's soil and irrigation
+    factors. A crop is not allowed on a field that needs irrigation it lacks,
+    or (with farm_plans) on a field whose last crop it was.
+    """
+    crops = list(economics.index)
+    soil = [f.get('soil_type', 'Loam') for f in fields]
+    irrigated = np.array([f.get('irrigation') == 'Yes' for f in fields])
+
+    factors = np.empty((len(fields), len(crops)))
+    for j, crop in enumerate(crops):
+        overrides = yield_model.crop_soil.get(crop, {})
+        factors[:, j] = [overrides.get(s, yield_model.soil.get(s, 1.0)) for s in soil]
+    factors[irrigated] *= yield_model.irrigation_factor
+
+    revenue = economics['revenue_per_acre'].to_numpy(dtype=float)
+    cost = economics['cost_per_acre'].to_numpy(dtype=float)
+    margins = factors * revenue[None, :] - cost[None, :]
+
+    allowed = np.ones_like(margins, dtype=bool)
+    needs_water = np.array([crop in yield_model.irrigation_required for crop in crops])
+    allowed[np.ix_(~irrigated, needs_water)] = False
+    if farm_plans:
+        previous = last_crops(farm_plans)
+        column = {crop: j for j, crop in enumerate(crops)}
+        for i, field in enumerate(fields):
+            if previous.get(field['name']) in column:
+                allowed[i, column[previous[field['name']]]] = False
+    return margins, allowed
+
+def _share_bounds(crops: List[str], total_area: float, min_share: Optional[Dict[str, float]],
+                  max_share: Optional[Dict[str, float]]):
+    low = np.array([(min_share or {}).get(c, 0.0) for c in crops]) * total_area
+    high = np.array([(max_share or {}).get(c, 1.0) for c in crops]) * total_area
+    return low, high
+
+def solve_lp(sizes: np.ndarray, margins: np.ndarray, allowed: np.ndarray, low: np.ndarray,
+             high: np.ndarray, whole_fields: bool = False, time_limit: float = 60.0):
+    """Solve the allocation with HiGHS; returns (fractions of each field, status) or None without scipy.
+
+    Each variable is the fraction of a field given to a crop. With whole_fields
+    the fractions are integral, i.e. every field gets a single crop or none. A
+    MIP stopped by time_limit returns its best solution with status 'time_limit'.
+    """
+    try:
+        from scipy.optimize import linprog
+        from scipy.sparse import coo_matrix, vstack
+    except ImportError:
+        return None
+
+    n_fields, n_crops = margins.shape
+    field_index, crop_index = np.nonzero(allowed)
+    n_vars = len(field_index)
+    if n_vars == 0:
+        return np.zeros_like(margins), 'optimal'
+    acres = sizes[field_index]
+    columns = np.arange(n_vars)
+
+    # Each field is used at most once; crop acreage stays within its share bounds
+    field_rows = coo_matrix((np.ones(n_vars), (field_index, columns)), shape=(n_fields, n_vars))
+    crop_rows = coo_matrix((acres, (crop_index, columns)), shape=(n_crops, n_vars))
+    a_ub = vstack([field_rows, crop_rows, -crop_rows]).tocsr()
+    b_ub = np.concatenate([np.ones(n_fields), high, -low])
+
+    result = linprog(-margins[field_index, crop_index] * acres, A_ub=a_ub, b_ub=b_ub, bounds=(0, 1),
+                     method='highs', integrality=np.ones(n_vars) if whole_fields else None,
+                     options={'time_limit': time_limit})
+    if result.x is None:
+        return np.zeros_like(margins), 'infeasible' if result.status == 2 else 'failed'
+
+    fractions = np.zeros_like(margins)
+    fractions[field_index, crop_index] = np.clip(result.x, 0, 1)
+    return fractions, 'optimal' if result.status == 0 else 'time_limit'
+
+def solve_greedy(sizes: np.ndarray, margins: np.ndarray, allowed: np.ndarray, low: np.ndarray,
+                 high: np.ndarray, whole_fields: bool = False):
+    """Pure-Python fallback: meet minimum shares first, then fill by margin per acre.
+
+    Pairs are taken best margin first, so the result is optimal when no share
+    bound binds and a good heuristic otherwise. Status 'heuristic_shortfall'
+    means some minimum share was not met; a feasible allocation may still
+    exist, which the LP solver would find.
+    """
+    fractions = np.zeros_like(margins)
+    remaining = np.ones(len(sizes))
+    planted = np.zeros(margins.shape[1])
+    status = 'heuristic'
+
+    def assign(i, j, acres_cap):
+        take = min(remaining[i], acres_cap / sizes[i])
+        if whole_fields and take < remaining[i]:
+            return 0.0
+        fractions[i, j] += take
+        remaining[i] -= take
+        planted[j] += take * sizes[i]
+        return take
+
+    candidates = np.argwhere(allowed)
+    order = candidates[np.argsort(-margins[candidates[:, 0], candidates[:, 1]], kind='stable')]
+
+    # Minimum shares, crops with the fewest usable acres first
+    for j in np.argsort(allowed.T @ sizes):
+        for i in order[order[:, 1] == j][:, 0]:
+            if planted[j] >= low[j] - 1e-9:
+                break
+            if remaining[i] > 0:
+                # Whole-field mode may overshoot the minimum, but not the maximum
+                cap = high[j] - planted[j] if whole_fields else min(low[j], high[j]) - planted[j]
+                assign(i, j, cap)
+        if planted[j] < low[j] - 1e-9:
+            status = 'heuristic_shortfall'
+
+    for i, j in order:
+        if margins[i, j] <= 0:
+            break
+        if remaining[i] > 1e-12 and planted[j] < high[j] - 1e-9:
+            assign(i, j, high[j] - planted[j])
+    return fractions, status
+
+def optimize_allocation(fields: List[Dict[str, Any]], economics: pd.DataFrame,
+                        farm_plans: Optional[List[Dict[str, Any]]] = None,
+                        min_share: Optional[Dict[str, float]] = None,
+                        max_share: Optional[Dict[str, float]] = None,
+                        whole_fields: bool = False, solver: str = 'auto',
+                        yield_model: YieldModel = DEFAULT_YIELD_MODEL) -> Dict[str, Any]:
+    """Profit-maximizing allocation of crops to fields.
+
+    Constraints: a field's planted acres never exceed its size, rotation and
+    irrigation rules from margin_matrix, and each crop's acreage stays within
+    [min_share, max_share] of the total farm area. Uses the scipy HiGHS LP/MIP
+    solver when available ('auto' or 'lp'), otherwise the greedy fallback.
+    'shortfall' lists the acres each crop is below its minimum share.
+    """
+    crops = list(economics.index)
+    sizes = np.array([float(f['size']) for f in fields])
+    margins, allowed = margin_matrix(fields, economics, farm_plans, yield_model)
+    low, high = _share_bounds(crops, sizes.sum(), min_share, max_share)
+
+    started = time.perf_counter()
+    solved = solve_lp(sizes, margins, allowed, low, high, whole_fields) if solver in ('auto', 'lp') else None
+    solver_used = 'highs'
+    if solved is None:
+        if solver == 'lp':
+            raise ImportError("The LP solver requires the 'scipy' package")
+        solved = solve_greedy(sizes, margins, allowed, low, high, whole_fields)
+        solver_used = 'greedy'
+    fractions, status = solved
+    solve_time = time.perf_counter() - started
+
+    field_index, crop_index = np.nonzero(fractions > 1e-9)
+    acres = fractions[field_index, crop_index] * sizes[field_index]
+    allocation = pd.DataFrame({
+        'field': [fields[i]['name'] for i in field_index],
+        'crop': [crops[j] for j in crop_index],
+        'acres': acres,
+        'profit_per_acre': margins[field_index, crop_index],
+        'expected_profit': acres * margins[field_index, crop_index]
+    })
+    short = low - fractions.T @ sizes
+    return {
+        'allocation': allocation,
+        'total_profit': float(allocation['expected_profit'].sum()),
+        'planted_acres': float(acres.sum()),
+        'total_acres': float(sizes.sum()),
+        'status': status,
+        'shortfall': {crops[j]: float(short[j]) for j in np.nonzero(short > 1e-6)[0]},
+        'solver': solver_used,
+        'solve_time': solve_time
+    }
+
+def synthetic_farm(n_fields: int, seed: int = 0):
+    """Random fields, previous plans and crop economics for benchmarking"""
+    rng = np.random.default_rng(seed)
+    fields = [{
+        'name': f"Field {i + 1}",
+        'size': float(round(rng.uniform(5, 400), 1)),
+        'soil_type': SOIL_TYPES[rng.integers(len(SOIL_TYPES))],
+        'irrigation': 'Yes' if rng.random() < 0.4 else 'No'
+    } for i in range(n_fields)]
+    farm_plans = [{'field': f['name'], 'crop_type': CROP_TYPES[rng.integers(len(CROP_TYPES))],
+                   'plant_date': '2024-04-01'} for f in fields]
+    economics = pd.DataFrame({
+        'revenue_per_acre': rng.uniform(300, 2500, len(CROP_TYPES)),
+        'cost_per_acre': rng.uniform(200, 1500, len(CROP_TYPES))
+    }, index=pd.Index(CROP_TYPES, name='crop'))
+    return fields, farm_plans, economics
+
+def benchmark(sizes: List[int], whole_fields: bool = False, max_share: float = 0.25,
+              seed: int = 0) -> List[Dict[str, Any]]:
+    """Solve time of each available solver on synthetic farms of the given sizes"""
+    results = []
+    for n_fields in sizes:
+        fields, farm_plans, economics = synthetic_farm(n_fields, seed)
+        shares = {crop: max_share for crop in economics.index}
+        for solver in ('lp', 'greedy'):
+            try:
+                result = optimize_allocation(fields, economics, farm_plans, max_share=shares,
+                                             whole_fields=whole_fields, solver=solver)
+            except ImportError:
+                continue
+            results.append({
+                'fields': n_fields, 'solver': result['solver'], 'status': result['status'],
+                'solve_time': round(result['solve_time'], 4), 'total_profit': round(result['total_profit'], 2)
+            })
+    return results
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the crop-to-field allocation solvers")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--whole-fields', action='store_true', help="One crop per field (MIP)")
+    parser.add_argument('--max-share', type=float, default=0.25, help="Largest share of farm area per crop")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.sizes, args.whole_fields, args.max_share, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for row in results:
+        print(f"{row['fields']:>6} fields  {row['solver']:<7} {row['status']:<11} "
+              f"{row['solve_time']:>8.3f}s  profit {row['total_profit']:>16,.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import streamlit as st
+from datetime import date, datetime
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from utils.common import validate_input, validate_numeric_input
+from utils.database import iter_data, save_data_streaming, set_active_farm, DEFAULT_FARM
+from utils.farms import get_farm_store, load_farm_dataset
+from utils.schema import DATASET_SCHEMAS
+
+IMPORTABLE_TYPES = list(DATASET_SCHEMAS)
+DEFAULT_CHUNK_SIZE = 10000
+MAX_REPORTED_ERRORS = 1000
+
+# Case-insensitive lookup of each choice column's canonical values
+_CHOICE_LOOKUPS = {
+    data_type: {column: {option.lower(): option for option in options}
+                for column, options in schema['choices'].items()}
+    for data_type, schema in DATASET_SCHEMAS.items()
+}
+
+def iter_rows(stream: IO[str], file_format: str = 'csv') -> Iterator[Dict[str, Any]]:
+    """Yield rows one at a time from a CSV (with header) or NDJSON text stream"""
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif file_format == 'ndjson':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield {'__error__': f"Invalid JSON: {e}"}
+                continue
+            yield row if isinstance(row, dict) else {'__error__': "Expected a JSON object"}
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+def iter_chunks(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group rows into lists of at most chunk_size"""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _clean(value: Any) -> Any:
+    return value.strip() if isinstance(value, str) else value
+
+def validate_row(data_type: str, row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validate and normalize one row; returns (record, None) or (None, error message)"""
+    if '__error__' in row:
+        return None, row['__error__']
+
+    schema = DATASET_SCHEMAS[data_type]
+    defaults = schema['defaults']
+    row = {key: _clean(value) for key, value in row.items() if key is not None}
+
+    def value_of(column):
+        value = row.get(column)
+        return defaults.get(column) if value in (None, '') else value
+
+    if not validate_input([value_of(column) for column in schema['required']]):
+        missing = [column for column in schema['required'] if not validate_input([value_of(column)])]
+        return None, f"Missing required value: {', '.join(missing)}"
+
+    record = {column: row.get(column) or '' for column in schema['fields']
+              if column not in ('id', schema['timestamp'])}
+
+    for column, (min_value, max_value, number_type) in schema['numeric'].items():
+        value = value_of(column)
+        if value is None or not validate_numeric_input(value, min_value, max_value):
+            return None, f"Invalid {column}: {row.get(column)!r}"
+        record[column] = number_type(float(value))
+
+    for column in schema['dates']:
+        try:
+            record[column] = date.fromisoformat(str(value_of(column))[:10]).isoformat()
+        except (TypeError, ValueError):
+            return None, f"Invalid {column}: {row.get(column)!r} (expected YYYY-MM-DD)"
+
+    for column, lookup in _CHOICE_LOOKUPS[data_type].items():
+        match = lookup.get(str(value_of(column)).lower())
+        if match is None:
+            return None, f"Invalid {column}: {row.get(column)!r}"
+        record[column] = match
+
+    for column, default in defaults.items():
+        if record.get(column) in (None, ''):
+            record[column] = default
+
+    return record, None
+
+def validate_chunk(data_type: str, rows: List[Dict[str, Any]], first_row_number: int):
+    """Validate a batch of rows; returns (records, [(row number, error), ...])"""
+    records, errors = [], []
+    for offset, row in enumerate(rows):
+        record, error = validate_row(data_type, row)
+        if error:
+            errors.append((first_row_number + offset, error))
+        else:
+            records.append(record)
+    return records, errors
+
+def import_records(data_type: str, stream: IO[str], file_format: str = 'csv',
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """Stream rows from a CSV/NDJSON source into a dataset with a single batched write.
+
+    Rows are read and validated chunk by chunk and written straight through to
+    the dataset file after the existing records, so memory use does not grow
+    with the size of the import. Invalid rows are skipped and reported by row
+    number (data rows are numbered from 1) without aborting the import.
+    """
+    if data_type not in DATASET_SCHEMAS:
+        raise ValueError(f"Bulk import is not supported for {data_type}")
+
+    schema = DATASET_SCHEMAS[data_type]
+    # Existing records are streamed twice (id scan, then copy) rather than held in memory
+    next_id = max((r['id'] for r in iter_data(data_type) if isinstance(r.get('id'), int)), default=0) + 1
+    result = {'imported': 0, 'rejected': 0, 'errors': []}
+    imported_at = datetime.now().isoformat()
+
+    def new_records():
+        nonlocal next_id
+        row_number = 1
+        for chunk in iter_chunks(iter_rows(stream, file_format), chunk_size):
+            records, errors = validate_chunk(data_type, chunk, row_number)
+            row_number += len(chunk)
+
+            result['rejected'] += len(errors)
+            room = MAX_REPORTED_ERRORS - len(result['errors'])
+            result['errors'].extend(errors[:max(room, 0)])
+
+            for record in records:
+                record['id'] = next_id
+                record[schema['timestamp']] = record.get(schema['timestamp']) or imported_at
+                next_id += 1
+                result['imported'] += 1
+                yield record
+
+    save_data_streaming(data_type, itertools.chain(iter_data(data_type), new_records()))
+    return result
+
+def show_bulk_import(data_type: str):
+    """Streamlit uploader that bulk-imports a CSV or NDJSON file into a dataset"""
+    schema = DATASET_SCHEMAS[data_type]
+    with st.expander("📥 Bulk Import"):
+        columns = [c for c in schema['fields'] if c not in ('id', schema['timestamp'])]
+        st.caption(f"CSV with a header row or NDJSON with these columns: {', '.join(columns)}")
+        uploaded = st.file_uploader("Import File", type=['csv', 'ndjson', 'jsonl'], key=f"{data_type}_import_file")
+
+        if uploaded is not None and st.button("Import Records", key=f"{data_type}_import"):
+            file_format = 'csv' if uploaded.name.lower().endswith('.csv') else 'ndjson'
+            stream = io.TextIOWrapper(uploaded, encoding='utf-8-sig', newline='')
+            try:
+                # Serialized with the other writers of this farm's datasets
+                with get_farm_store().lock:
+                    result = import_records(data_type, stream, file_format)
+            except Exception as e:
+                st.error(f"❌ Import failed: {e}")
+                return
+
+            # Derived data (counters, indexes) rebuilds when it sees the new record count
+            st.session_state[data_type] = load_farm_dataset(data_type)
+            st.success(f"✅ Imported {result['imported']:,} records.")
+            if result['rejected']:
+                st.warning(f"⚠️ {result['rejected']:,} rows were rejected.")
+                st.dataframe(
+                    [{'row': row, 'error': error} for row, error in result['errors']],
+                    use_container_width=True
+                )
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Bulk import CSV or NDJSON records into a farm dataset")
+    parser.add_argument('data_type', choices=IMPORTABLE_TYPES)
+    parser.add_argument('path', help="CSV or NDJSON file")
+    parser.add_argument('--format', choices=['csv', 'ndjson'],
+                        help="Input format (default: from the file extension)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--farm', default=DEFAULT_FARM, help="Farm to import into")
+    args = parser.parse_args(argv)
+
+    set_active_farm(args.farm)
+    file_format = args.format or ('csv' if args.path.lower().endswith('.csv') else 'ndjson')
+    with open(args.path, 'r', encoding='utf-8-sig', newline='') as stream:
+        result = import_records(args.data_type, stream, file_format, args.chunk_size)
+
+    print(f"Imported {result['imported']} records, rejected {result['rejected']}")
+    for row, error in result['errors']:
+        print(f"  row {row}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import streamlit as st
+from datetime import date
+from typing import Any, Dict, List, Set, Tuple
+from utils.common import parse_iso_date
+from utils.session_index import get_session_index, update_session_index
+
+ACTIVITY_ORDER = {'Planting': 0, 'Harvesting': 1, 'Growing': 2}
+
+def _months_between(start: date, end: date) -> List[Tuple[int, int]]:
+    """(year, month) pairs strictly after start's month and strictly before end's month"""
+    months = []
+    year, month = start.year, start.month
+    while True:
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+        if (year, month) >= (end.year, end.month):
+            return months
+        months.append((year, month))
+
+class CalendarIndex:
+    """Crop plan activities bucketed by (year, month).
+
+    Each plan is parsed once when added; looking up a month's activities or a
+    year's plans is a dictionary access instead of a scan over all plans.
+    """
+
+    def __init__(self, farm_plans: List[Dict[str, Any]] = None):
+        self.buckets: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        self.plan_months: Dict[Any, Set[Tuple[int, int]]] = {}
+        self.plan_spans: Dict[Any, Dict[str, Any]] = {}
+        self.year_plans: Dict[int, Set[Any]] = {}
+        self.count = 0
+        for plan in farm_plans or []:
+            self.add_plan(plan)
+
+    def _add_activity(self, plan_id: Any, key: Tuple[int, int], activity: Dict[str, Any]):
+        self.buckets.setdefault(key, []).append(activity)
+        self.plan_months[plan_id].add(key)
+
+    def add_plan(self, plan: Dict[str, Any]):
+        plan_id = plan['id']
+        if plan_id in self.plan_months:
+            self.remove_plan(plan_id)
+        self.count += 1
+        self.plan_months[plan_id] = set()
+        plant_date, harvest_date = parse_iso_date(plan.get('plant_date')), parse_iso_date(plan.get('harvest_date'))
+        base = {'plan_id': plan_id, 'crop': plan['crop_type'], 'field': plan['field'], 'plan': plan['name']}
+
+        if plant_date:
+            self._add_activity(plan_id, (plant_date.year, plant_date.month), {
+                **base, 'type': 'Planting', 'day': plant_date.day,
+                'activity': f"Plant {plan['crop_type']} in {plan['field']}"
+            })
+        if harvest_date:
+            self._add_activity(plan_id, (harvest_date.year, harvest_date.month), {
+                **base, 'type': 'Harvesting', 'day': harvest_date.day,
+                'activity': f"Harvest {plan['crop_type']} from {plan['field']}"
+            })
+        if plant_date and harvest_date and harvest_date > plant_date:
+            for key in _months_between(plant_date, harvest_date):
+                self._add_activity(plan_id, key, {
+                    **base, 'type': 'Growing', 'day': None,
+                    'activity': f"{plan['crop_type']} growing in {plan['field']}"
+                })
+
+            self.plan_spans[plan_id] = {**base, 'start': plant_date, 'end': harvest_date, 'status': plan['status']}
+            for year in range(plant_date.year, harvest_date.year + 1):
+                self.year_plans.setdefault(year, set()).add(plan_id)
+
+    def remove_plan(self, plan_id: Any):
+        if plan_id not in self.plan_months:
+            return
+        self.count -= 1
+        for key in self.plan_months.pop(plan_id):
+            remaining = [a for a in self.buckets[key] if a['plan_id'] != plan_id]
+            if remaining:
+                self.buckets[key] = remaining
+            else:
+                del self.buckets[key]
+        span = self.plan_spans.pop(plan_id, None)
+        if span:
+            for year in range(span['start'].year, span['end'].year + 1):
+                self.year_plans[year].discard(plan_id)
+
+    def activities(self, year: int, month: int) -> List[Dict[str, Any]]:
+        """Activities in a month: planting and harvest by day, then crops growing through it"""
+        return sorted(self.buckets.get((year, month), []),
+                      key=lambda a: (ACTIVITY_ORDER[a['type']], a['day'] or 0))
+
+    def years(self) -> List[int]:
+        return sorted({year for year, _ in self.buckets} | {y for y, plans in self.year_plans.items() if plans})
+
+    def season_spans(self, year: int) -> List[Dict[str, Any]]:
+        """Plant-to-harvest spans of every plan active during a year, by start date"""
+        return sorted((self.plan_spans[plan_id] for plan_id in self.year_plans.get(year, ())),
+                      key=lambda span: span['start'])
+
+def get_calendar_index() -> CalendarIndex:
+    """Calendar index for the session's farm plans, rebuilt when the plans changed"""
+    return get_session_index('farm_plans', '_calendar_index', CalendarIndex)
+
+def _update_plans(index: CalendarIndex, removed: List[Dict[str, Any]], added: List[Dict[str, Any]]):
+    for record in removed:
+        index.remove_plan(record['id'])
+    for record in added:
+        index.add_plan(record)
+
+def record_inserted(data_type: str, record: Dict[str, Any]):
+    if data_type == 'farm_plans':
+        update_session_index(data_type, '_calendar_index', lambda index: _update_plans(index, [], [record]))
+
+def record_updated(data_type: str, old_record: Dict[str, Any], new_record: Dict[str, Any]):
+    if data_type == 'farm_plans':
+        update_session_index(data_type, '_calendar_index', lambda index: _update_plans(index, [old_record], [new_record]))
+
+def records_deleted(data_type: str, records: List[Dict[str, Any]]):
+    if data_type == 'farm_plans':
+        update_session_index(data_type, '_calendar_index', lambda index: _update_plans(index, records, []))
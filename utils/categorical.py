@@ -0,0 +1,145 @@
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+from utils.schema import (
+    CROP_TYPES, PRICE_UNITS, EXPENSE_CATEGORIES, PAYMENT_METHODS, OPERATION_TYPES, PLAN_STATUSES,
+    REVENUE_PLAN_STATUSES, TASK_PRIORITIES, TASK_STATUSES, EQUIPMENT_TYPES, EQUIPMENT_CONDITIONS
+)
+
+class Dictionary:
+    """Append-only mapping between the values of categorical columns and small integer codes.
+
+    Seeded with a schema choice list, so every form value has a code from the
+    start; values outside the list (free-text imports, old data) are appended
+    the first time they are seen. Codes only live in memory.
+    """
+
+    def __init__(self, values: Sequence[Hashable] = ()):
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+        self.lock = threading.Lock()
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: Hashable) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = self.codes[value] = len(self.values)
+                    self.values.append(value)
+        return code
+
+    def code(self, value: Hashable) -> Optional[int]:
+        """Code of a value without adding it; None when the value was never seen"""
+        return self.codes.get(value)
+
+    def decode(self, code: int) -> Any:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+# Process-wide dictionaries; columns holding the same kind of value share one
+DICTIONARIES = {
+    'crop': Dictionary(CROP_TYPES),
+    'unit': Dictionary(PRICE_UNITS),
+    'expense_category': Dictionary(EXPENSE_CATEGORIES),
+    'payment_method': Dictionary(PAYMENT_METHODS),
+    'operation_type': Dictionary(OPERATION_TYPES),
+    'plan_status': Dictionary(PLAN_STATUSES),
+    'revenue_plan_status': Dictionary(REVENUE_PLAN_STATUSES),
+    'task_priority': Dictionary(TASK_PRIORITIES),
+    'task_status': Dictionary(TASK_STATUSES),
+    'equipment_type': Dictionary(EQUIPMENT_TYPES),
+    'equipment_condition': Dictionary(EQUIPMENT_CONDITIONS)
+}
+
+# Data type -> column -> dictionary encoding it
+ENCODED_COLUMNS = {
+    'expenses': {'category': 'expense_category', 'payment_method': 'payment_method'},
+    'operations': {'type': 'operation_type'},
+    'crop_prices': {'crop': 'crop', 'unit': 'unit'},
+    'farm_plans': {'crop_type': 'crop', 'status': 'plan_status'},
+    'revenue_plans': {'crop_type': 'crop', 'yield_unit': 'unit', 'status': 'revenue_plan_status'},
+    'profit_analysis': {'crop': 'crop'},
+    'tasks': {'priority': 'task_priority', 'status': 'task_status'},
+    'equipment': {'type': 'equipment_type', 'condition': 'equipment_condition'}
+}
+
+def is_encoded(data_type: str, column: str) -> bool:
+    return column in ENCODED_COLUMNS.get(data_type, {})
+
+def column_dictionary(data_type: str, column: str) -> Dictionary:
+    """Dictionary of a categorical column listed in ENCODED_COLUMNS.
+
+    Only schema-backed columns are encoded, so the process-wide dictionaries
+    grow only by the odd off-list value and never by free text.
+    """
+    if not is_encoded(data_type, column):
+        raise KeyError(f"{data_type}.{column} is not a categorical column")
+    return DICTIONARIES[ENCODED_COLUMNS[data_type][column]]
+
+# numpy is imported by the helpers below so the app can start without it
+
+def _compact_class(records: Sequence[Dict[str, Any]]):
+    """The record class when all records are compact records (utils.compact) of one class, else None"""
+    classes = {type(record) for record in records}
+    cls = classes.pop() if len(classes) == 1 else None
+    return cls if cls is not None and hasattr(cls, '_encoded') else None
+
+def column_codes(data_type: str, records: Sequence[Dict[str, Any]], column: str):
+    """Codes of a categorical column as an int array; compact records hand over their stored codes"""
+    import numpy as np
+
+    dictionary = column_dictionary(data_type, column)
+    cls = _compact_class(records)
+    if cls is not None and column in cls._encoded:
+        # Compact records of one class: read the stored codes straight from the slots
+        missing = dictionary.encode(None)
+        codes = (getattr(record, column, missing) for record in records)
+    else:
+        codes = (record.code(column) if column in getattr(record, '_encoded', ()) else dictionary.encode(record.get(column))
+                 for record in records)
+    return np.fromiter(codes, dtype=np.int32, count=len(records))
+
+def group_counts(data_type: str, records: Sequence[Dict[str, Any]], column: str) -> Dict[Any, int]:
+    """Number of records per value of a categorical column, in dictionary order"""
+    import numpy as np
+
+    if not records:
+        return {}
+    dictionary = column_dictionary(data_type, column)
+    counts = np.bincount(column_codes(data_type, records, column))
+    return {dictionary.decode(code): int(counts[code]) for code in np.flatnonzero(counts)}
+
+def group_sums(data_type: str, records: Sequence[Dict[str, Any]], column: str, value_column: str) -> Dict[Any, float]:
+    """Total of a numeric column per value of a categorical column, in dictionary order"""
+    import numpy as np
+
+    if not records:
+        return {}
+    dictionary = column_dictionary(data_type, column)
+    codes = column_codes(data_type, records, column)
+    cls = _compact_class(records)
+    if cls is not None and value_column in cls._columns and value_column not in cls._encoded:
+        values = (getattr(record, value_column, 0) for record in records)
+    else:
+        values = (record.get(value_column) for record in records)
+    amounts = np.fromiter((float(value or 0) for value in values), dtype=np.float64, count=len(records))
+    present = np.bincount(codes)
+    totals = np.bincount(codes, weights=amounts)
+    return {dictionary.decode(code): float(totals[code]) for code in np.flatnonzero(present)}
+
+def filter_by_codes(data_type: str, records: Sequence[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Records whose categorical columns equal the given values, compared as integer codes"""
+    import numpy as np
+
+    mask = np.ones(len(records), dtype=bool)
+    for column, value in filters.items():
+        code = column_dictionary(data_type, column).code(value)
+        if code is None:
+            # A value no record was ever encoded with matches nothing
+            return []
+        mask &= column_codes(data_type, records, column) == code
+    return [records[i] for i in np.flatnonzero(mask)]
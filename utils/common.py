@@ -1,7 +1,18 @@
+import functools
 import streamlit as st
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 from datetime import datetime, date
 
+# st.download_button reads its data into memory to serve it, so downloads from
+# the app are limited to this size
+MAX_DOWNLOAD_BYTES = 50 * 1024 * 1024
+
+# Season of each calendar month, January first
+SEASON_BY_MONTH = (
+    "Winter", "Winter", "Spring", "Spring", "Spring", "Summer",
+    "Summer", "Summer", "Fall", "Fall", "Fall", "Winter"
+)
+
 def validate_input(inputs: List[str], min_length: int = 1) -> bool:
     """Validate that all inputs are not empty and meet minimum length"""
     for input_value in inputs:
@@ -13,13 +24,27 @@ def format_currency(amount: float) -> str:
     """Format number as currency"""
     return f"${amount:,.2f}"
 
+@functools.lru_cache(maxsize=65536)
+def _parse_iso_date(text: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+def parse_iso_date(value: Any) -> Optional[date]:
+    """Date of an ISO date or datetime string, memoized; None when missing or invalid"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return _parse_iso_date(str(value)[:10])
+
 def format_date(date_str: str) -> str:
     """Format ISO date string for display"""
-    try:
-        date_obj = datetime.fromisoformat(date_str)
-        return date_obj.strftime("%m/%d/%Y")
-    except:
-        return date_str
+    date_obj = parse_iso_date(date_str)
+    return date_obj.strftime("%m/%d/%Y") if date_obj else date_str
 
 def calculate_days_between(start_date: str, end_date: str) -> int:
     """Calculate days between two ISO date strings"""
@@ -27,7 +52,7 @@ def calculate_days_between(start_date: str, end_date: str) -> int:
         start = datetime.fromisoformat(start_date)
         end = datetime.fromisoformat(end_date)
         return (end - start).days
-    except:
+    except (TypeError, ValueError):
         return 0
 
 def show_success_message(message: str):
@@ -49,12 +74,23 @@ def show_warning_message(message: str):
 def create_download_button(data: Any, filename: str, label: str = "Download Data"):
     """Create a download button for data"""
     import json
+    import tempfile
     
     if isinstance(data, (list, dict)):
-        json_data = json.dumps(data, indent=2, default=str)
+        # Encode piece by piece into a temporary file instead of one large string; the
+        # button still reads the file into memory, hence the size limit
+        json_file = tempfile.TemporaryFile(buffering=0)
+        with open(json_file.fileno(), 'w', encoding='utf-8', closefd=False) as writer:
+            for chunk in json.JSONEncoder(indent=2, default=str).iterencode(data):
+                writer.write(chunk)
+        if json_file.tell() > MAX_DOWNLOAD_BYTES:
+            json_file.close()
+            st.warning(f"⚠️ {filename} is too large to download from the app; use the export command line tool.")
+            return
+        json_file.seek(0)
         st.download_button(
             label=label,
-            data=json_data,
+            data=json_file,
             file_name=filename,
             mime="application/json"
         )
@@ -67,18 +103,17 @@ def create_download_button(data: Any, filename: str, label: str = "Download Data
         )
 
 def filter_data_by_date_range(data: List[Dict], date_field: str, start_date: date, end_date: date) -> List[Dict]:
-    """Filter data by date range"""
-    filtered_data = []
-    
-    for item in data:
-        try:
-            item_date = datetime.fromisoformat(item[date_field]).date()
-            if start_date <= item_date <= end_date:
-                filtered_data.append(item)
-        except (KeyError, ValueError):
-            continue
-    
-    return filtered_data
+    """Filter data by date range; records without a valid date are left out"""
+    if not data:
+        return []
+    # Imported here so the app can start without numpy
+    import numpy as np
+    from utils.dates import parse_iso_dates
+
+    dates = parse_iso_dates(item.get(date_field) for item in data)
+    # NaT compares False, so undated records drop out
+    mask = (dates >= np.datetime64(start_date, 'D')) & (dates <= np.datetime64(end_date, 'D'))
+    return [data[i] for i in np.flatnonzero(mask)]
 
 def calculate_percentage(part: float, total: float) -> float:
     """Calculate percentage safely"""
@@ -94,20 +129,8 @@ def safe_divide(numerator: float, denominator: float, default: float = 0) -> flo
 
 def get_season_from_date(date_str: str) -> str:
     """Get season from date string"""
-    try:
-        date_obj = datetime.fromisoformat(date_str)
-        month = date_obj.month
-        
-        if month in [12, 1, 2]:
-            return "Winter"
-        elif month in [3, 4, 5]:
-            return "Spring"
-        elif month in [6, 7, 8]:
-            return "Summer"
-        else:
-            return "Fall"
-    except:
-        return "Unknown"
+    date_obj = parse_iso_date(date_str)
+    return SEASON_BY_MONTH[date_obj.month - 1] if date_obj else "Unknown"
 
 def calculate_growth_rate(old_value: float, new_value: float) -> float:
     """Calculate growth rate percentage"""
@@ -0,0 +1,167 @@
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Tuple, Type
+from utils.categorical import ENCODED_COLUMNS, column_dictionary
+from utils.schema import DATASET_SCHEMAS
+
+# Columns of the hot datasets, in the order the forms write them
+COMPACT_FIELDS = {
+    'expenses': DATASET_SCHEMAS['expenses']['fields'],
+    'operations': DATASET_SCHEMAS['operations']['fields'],
+    'crop_prices': DATASET_SCHEMAS['crop_prices']['fields'],
+    'farm_plans': ['id', 'name', 'field', 'crop_type', 'plant_date', 'harvest_date', 'area_planned', 'status',
+                   'created_date']
+}
+# Text columns with few distinct values; every record points at one shared string.
+# Categorical columns (utils.categorical.ENCODED_COLUMNS) are stored as codes instead.
+SHARED_COLUMNS = {
+    'expenses': ['date', 'vendor'],
+    'operations': ['date', 'field'],
+    'crop_prices': ['price_date', 'market_source'],
+    'farm_plans': ['field', 'plant_date', 'harvest_date']
+}
+
+_MISSING = object()
+
+class CompactRecord(MutableMapping):
+    """Dict-compatible record with one slot per known column.
+
+    A plain dict carries a hash table per record; here the column names live
+    once on the class, and keys outside the layout go to an overflow dict that
+    is only created when needed. Unset slots behave like missing keys.
+    Categorical columns hold dictionary codes and are decoded on access.
+    """
+    __slots__ = ('_extra',)
+    _fields: Tuple[str, ...] = ()
+    _columns: frozenset = frozenset()
+    _shared: frozenset = frozenset()
+    _encoded: Dict[str, Any] = {}
+
+    def __init__(self, values: Any = ()):
+        self._extra = None
+        for key, value in (values.items() if isinstance(values, Mapping) else values):
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._columns:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return self._encoded[key].values[value] if key in self._encoded else value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._columns:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                return default
+            return self._encoded[key].values[value] if key in self._encoded else value
+        return self._extra.get(key, default) if self._extra is not None else default
+
+    def __contains__(self, key) -> bool:
+        if key in self._columns:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __setitem__(self, key, value):
+        if key in self._columns:
+            if key in self._encoded:
+                value = self._encoded[key].encode(value)
+            elif type(value) is str and key in self._shared:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self:
+            if key in self._columns:
+                delattr(self, key)
+            else:
+                del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._fields:
+            if getattr(self, name, _MISSING) is not _MISSING:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def code(self, column: str) -> int:
+        """Dictionary code of a categorical column (missing values are encoded as None)"""
+        value = getattr(self, column, _MISSING)
+        return self._encoded[column].encode(None) if value is _MISSING else value
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def copy(self) -> 'CompactRecord':
+        return type(self)(self)
+
+def _record_class(data_type: str) -> Type[CompactRecord]:
+    fields = tuple(COMPACT_FIELDS[data_type])
+    clashes = [name for name in fields if hasattr(CompactRecord, name)]
+    if clashes:
+        raise ValueError(f"Columns of {data_type} clash with record methods: {clashes}")
+    name = ''.join(part.title() for part in data_type.split('_')) + 'Record'
+    return type(name, (CompactRecord,), {
+        '__slots__': fields, '__module__': __name__, '__qualname__': name,
+        '_fields': fields, '_columns': frozenset(fields), '_shared': frozenset(SHARED_COLUMNS.get(data_type, ())),
+        '_encoded': {column: column_dictionary(data_type, column) for column in ENCODED_COLUMNS.get(data_type, {})
+                     if column in fields}
+    })
+
+RECORD_CLASSES: Dict[str, Type[CompactRecord]] = {data_type: _record_class(data_type) for data_type in COMPACT_FIELDS}
+# Module-level names so records pickle and copy like any other object
+for _cls in RECORD_CLASSES.values():
+    globals()[_cls.__name__] = _cls
+
+def compact_record(data_type: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """A record in its data type's compact form; other data types are returned unchanged"""
+    cls = RECORD_CLASSES.get(data_type)
+    if cls is None or type(record) is cls:
+        return record
+    return cls(record)
+
+def compact_records(data_type: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert a loaded dataset to compact records in place, so each dict is freed as it is replaced"""
+    cls = RECORD_CLASSES.get(data_type)
+    if cls is not None:
+        for i, record in enumerate(records):
+            if type(record) is not cls:
+                records[i] = cls(record)
+    return records
+
+def records_frame(records: List[Dict[str, Any]]):
+    """DataFrame of a dataset, reading compact records column by column instead of converting each to a dict"""
+    import pandas as pd
+
+    classes = {type(record) for record in records}
+    cls = classes.pop() if len(classes) == 1 else None
+    if cls is None or not issubclass(cls, CompactRecord) or any(record._extra for record in records):
+        return pd.DataFrame(records)
+
+    columns = {}
+    for name in cls._fields:
+        values = [getattr(record, name, _MISSING) for record in records]
+        missing = sum(1 for value in values if value is _MISSING)
+        if missing == len(values):
+            continue
+        if name in cls._encoded:
+            decoded = cls._encoded[name].values
+            values = [None if value is _MISSING else decoded[value] for value in values]
+        elif missing:
+            values = [None if value is _MISSING else value for value in values]
+        columns[name] = values
+    return pd.DataFrame(columns)
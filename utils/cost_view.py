@@ -0,0 +1,205 @@
+import hashlib
+import json
+import pandas as pd
+import streamlit as st
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from utils.common import parse_iso_date
+from utils.database import save_metadata, load_metadata
+from utils.occupancy import OccupancyIndex
+from utils.profitability import build_cost_index
+
+# Append-only sources folded into the view; plans and fields define how they are attributed
+SOURCES = ('operations', 'expenses')
+COST_COLUMNS = [
+    'plan', 'field', 'field_id', 'crop', 'year', 'area', 'planned_cost_per_acre',
+    'actual_cost', 'actual_cost_per_acre', 'variance_per_acre', 'planned_revenue_per_acre',
+    'actual_margin_per_acre'
+]
+
+def _field_key(name: Any) -> str:
+    """Normalize free-text field names so 'North 40 ' matches 'north 40'"""
+    return ' '.join(str(name or '').split()).casefold()
+
+def _signature(fields: List[Dict[str, Any]], farm_plans: List[Dict[str, Any]]) -> str:
+    """Hash of everything that decides how a cost is attributed"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[f.get('id'), f.get('name')] for f in fields], default=str).encode())
+    digest.update(json.dumps([[p.get('id'), p.get('field'), p.get('plant_date'), p.get('harvest_date'),
+                               p.get('area_planned')] for p in farm_plans], default=str).encode())
+    return digest.hexdigest()
+
+def _empty_state(signature: str) -> Dict[str, Any]:
+    return {
+        'signature': signature,
+        # Per source: [records folded in, id of the last one]
+        'watermarks': {source: [0, None] for source in SOURCES},
+        'plan_costs': {},
+        'field_costs': {},
+        'unmatched': {source: 0.0 for source in SOURCES},
+        # Operation field names that match no field, with their cost
+        'unknown_fields': {}
+    }
+
+class CostAttributor:
+    """Splits a cost across the crop plans it belongs to, weighted by area_planned"""
+
+    def __init__(self, fields: List[Dict[str, Any]], farm_plans: List[Dict[str, Any]]):
+        self.field_ids = {_field_key(f['name']): f['id'] for f in fields}
+        self.occupancy = OccupancyIndex(farm_plans)
+        self.plan_fields: Dict[str, List[str]] = {}
+        for name in self.occupancy.timelines:
+            self.plan_fields.setdefault(_field_key(name), []).append(name)
+        # Attributions depend only on (field, date), so each is worked out once per refresh
+        self._operation_on: Dict[Tuple[Any, str], Tuple[Any, List[Tuple[Any, float]]]] = {}
+        self._active_on: Dict[date, List[Tuple[Any, float]]] = {}
+
+    def _shares(self, plans: List[Dict[str, Any]]) -> List[Tuple[Any, float]]:
+        total = sum(float(p.get('area_planned') or 0) for p in plans)
+        if total <= 0:
+            return [(p['id'], 1.0 / len(plans)) for p in plans]
+        return [(p['id'], float(p.get('area_planned') or 0) / total) for p in plans]
+
+    def operation(self, record: Dict[str, Any]) -> Tuple[Any, List[Tuple[Any, float]]]:
+        """(field id, [(plan id, share)]) of an operation over the plans active on its field that day"""
+        lookup = (record.get('field'), str(record.get('date'))[:10])
+        if lookup not in self._operation_on:
+            key = _field_key(record.get('field'))
+            day = parse_iso_date(record.get('date'))
+            plans = [p for name in self.plan_fields.get(key, []) for p in self.occupancy.plans_on(name, day)] if day else []
+            self._operation_on[lookup] = (self.field_ids.get(key), self._shares(plans) if plans else [])
+        return self._operation_on[lookup]
+
+    def expense(self, record: Dict[str, Any]) -> List[Tuple[Any, float]]:
+        """[(plan id, share)] of a farm-wide expense over every plan active on its date"""
+        day = parse_iso_date(record.get('date'))
+        if day is None:
+            return []
+        if day not in self._active_on:
+            plans = [p for name in self.occupancy.timelines for p in self.occupancy.plans_on(name, day)]
+            self._active_on[day] = self._shares(plans) if plans else []
+        return self._active_on[day]
+
+def _fold(state: Dict[str, Any], attributor: CostAttributor, source: str, records: List[Dict[str, Any]]):
+    """Add a batch of operations or expenses to the view.
+
+    Amounts are first summed per attribution key (field and date for
+    operations, date for expenses), so a cost shared by many plans is split
+    once per key rather than once per record.
+    """
+    totals: Dict[Any, float] = {}
+    for record in records:
+        if source == 'operations':
+            key, amount = (record.get('field'), str(record.get('date'))[:10]), record.get('cost')
+        else:
+            key, amount = str(record.get('date'))[:10], record.get('amount')
+        totals[key] = totals.get(key, 0.0) + float(amount or 0)
+
+    plan_costs = state['plan_costs']
+    for key, amount in totals.items():
+        if source == 'operations':
+            field_id, shares = attributor.operation({'field': key[0], 'date': key[1]})
+            if field_id is not None:
+                state['field_costs'][str(field_id)] = state['field_costs'].get(str(field_id), 0.0) + amount
+            else:
+                name = str(key[0] or '')
+                state['unknown_fields'][name] = state['unknown_fields'].get(name, 0.0) + amount
+        else:
+            shares = attributor.expense({'date': key})
+
+        if not shares:
+            state['unmatched'][source] += amount
+        for plan_id, share in shares:
+            costs = plan_costs.get(str(plan_id))
+            if costs is None:
+                costs = plan_costs[str(plan_id)] = {name: 0.0 for name in SOURCES}
+            costs[source] += amount * share
+
+    seen = state['watermarks'][source][0]
+    state['watermarks'][source] = [seen + len(records), records[-1].get('id')]
+
+def refresh_view(state: Optional[Dict[str, Any]], fields: List[Dict[str, Any]],
+                 farm_plans: List[Dict[str, Any]], sources: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+    """Bring a materialized cost view up to date; returns (state, changed).
+
+    Only operations and expenses past each source's watermark are folded in.
+    The view is rebuilt from scratch when fields or plans change (that changes
+    attribution) or when a source no longer extends the records seen so far.
+    """
+    signature = _signature(fields, farm_plans)
+    if not state or state.get('signature') != signature:
+        state = _empty_state(signature)
+
+    for source in SOURCES:
+        records = sources.get(source, [])
+        seen, last_id = state['watermarks'][source]
+        if seen > len(records) or (seen and records[seen - 1].get('id') != last_id):
+            state = _empty_state(signature)
+            break
+
+    pending = {source: sources.get(source, [])[state['watermarks'][source][0]:] for source in SOURCES}
+    if not any(pending.values()):
+        return state, False
+
+    attributor = CostAttributor(fields, farm_plans)
+    for source, records in pending.items():
+        if records:
+            _fold(state, attributor, source, records)
+    return state, True
+
+def cost_table(state: Dict[str, Any], fields: List[Dict[str, Any]], farm_plans: List[Dict[str, Any]],
+               revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Planned vs. actual cost per acre for each crop plan"""
+    if not farm_plans:
+        return pd.DataFrame(columns=COST_COLUMNS)
+
+    field_ids = {_field_key(f['name']): f['id'] for f in fields}
+    rows = []
+    for plan in farm_plans:
+        costs = state['plan_costs'].get(str(plan['id']), {})
+        plant_date = parse_iso_date(plan.get('plant_date'))
+        rows.append({
+            'plan': plan['name'], 'field': plan['field'], 'field_id': field_ids.get(_field_key(plan['field'])),
+            'crop': plan['crop_type'], 'year': plant_date.year if plant_date else None,
+            'area': float(plan.get('area_planned') or 0),
+            'actual_cost': sum(costs.values())
+        })
+    table = pd.DataFrame(rows)
+
+    # Planned cost per acre: the crop's cost analysis for that year, else its latest one
+    latest_by_year, latest_by_crop = build_cost_index(profit_analysis)
+    by_year = latest_by_year.set_index(['crop', 'year'])['cost_per_acre']
+    by_crop = latest_by_crop.set_index('crop')['cost_per_acre']
+    table['planned_cost_per_acre'] = [
+        by_year.get((crop, year), by_crop.get(crop)) for crop, year in zip(table['crop'], table['year'])
+    ]
+
+    plans = pd.DataFrame(revenue_plans, columns=['crop_type', 'planning_year', 'planned_area', 'total_expected_revenue'])
+    revenue = plans.groupby(['crop_type', 'planning_year'])[['planned_area', 'total_expected_revenue']].sum()
+    revenue_per_acre = (revenue['total_expected_revenue'] / revenue['planned_area'].where(revenue['planned_area'] > 0))
+    table['planned_revenue_per_acre'] = [
+        revenue_per_acre.get((crop, year)) for crop, year in zip(table['crop'], table['year'])
+    ]
+
+    area = table['area'].where(table['area'] > 0)
+    table['actual_cost_per_acre'] = table['actual_cost'] / area
+    table['planned_cost_per_acre'] = pd.to_numeric(table['planned_cost_per_acre'])
+    table['planned_revenue_per_acre'] = pd.to_numeric(table['planned_revenue_per_acre'])
+    table['variance_per_acre'] = table['actual_cost_per_acre'] - table['planned_cost_per_acre']
+    table['actual_margin_per_acre'] = table['planned_revenue_per_acre'] - table['actual_cost_per_acre']
+    return table[COST_COLUMNS]
+
+def get_cost_view() -> Dict[str, Any]:
+    """Session's materialized cost view, loaded from disk and refreshed past its watermarks"""
+    state = st.session_state.get('_cost_view')
+    if state is None:
+        state = load_metadata('farm_plans', 'cost_view')
+
+    state, changed = refresh_view(
+        state, st.session_state.get('fields', []), st.session_state.get('farm_plans', []),
+        {source: st.session_state.get(source, []) for source in SOURCES}
+    )
+    if changed:
+        save_metadata('farm_plans', 'cost_view', state)
+    st.session_state['_cost_view'] = state
+    return state
@@ -0,0 +1,124 @@
+import streamlit as st
+from typing import Any, Dict, List
+from utils.database import save_metadata, load_metadata, get_data_version, data_file_fingerprint
+
+# Aggregates maintained for each data type: running sums of numeric fields
+# and per-value counts of categorical fields
+COUNTER_SPECS = {
+    'expenses': {'sums': ['amount'], 'group_counts': []},
+    'operations': {'sums': ['hours', 'cost'], 'group_counts': []},
+    'equipment': {'sums': ['purchase_cost'], 'group_counts': ['condition']},
+    'tasks': {'sums': [], 'group_counts': ['status']},
+    'fields': {'sums': ['size'], 'group_counts': []},
+    'farm_plans': {'sums': ['area_planned'], 'group_counts': []},
+    'revenue_plans': {'sums': ['total_expected_revenue', 'planned_area'], 'group_counts': []},
+    'profit_analysis': {
+        'sums': [
+            'total_cost', 'area', 'seed_cost', 'fertilizer_cost', 'pesticide_cost',
+            'fuel_cost', 'labor_cost', 'equipment_cost', 'other_cost'
+        ],
+        'group_counts': []
+    }
+}
+
+def _empty_counters(data_type: str) -> Dict[str, Any]:
+    spec = COUNTER_SPECS.get(data_type, {'sums': [], 'group_counts': []})
+    return {
+        'count': 0,
+        'sums': {field: 0.0 for field in spec['sums']},
+        'groups': {field: {} for field in spec['group_counts']}
+    }
+
+def _apply(counters: Dict[str, Any], record: Dict[str, Any], sign: int):
+    """Add (sign=1) or remove (sign=-1) one record's contribution"""
+    counters['count'] += sign
+    for field in counters['sums']:
+        try:
+            counters['sums'][field] += sign * float(record.get(field) or 0)
+        except (TypeError, ValueError):
+            continue
+    for field, groups in counters['groups'].items():
+        value = str(record.get(field))
+        groups[value] = groups.get(value, 0) + sign
+        if groups[value] <= 0:
+            del groups[value]
+
+def build_counters(data_type: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute counters from scratch with a single pass over the records"""
+    counters = _empty_counters(data_type)
+    for record in records:
+        _apply(counters, record, 1)
+    return counters
+
+def _save_counters(data_type: str, counters: Dict[str, Any]):
+    # Stamped with the dataset file they match, which tells a later process whether they are current
+    save_metadata(data_type, 'counters', {
+        'count': counters['count'], 'sums': counters['sums'], 'groups': counters['groups'],
+        'source': data_file_fingerprint(data_type)
+    })
+
+def get_counters(data_type: str) -> Dict[str, Any]:
+    """Return the running totals for a dataset loaded in session state.
+
+    Session counters are current while they carry the dataset's data
+    version, which every save bumps (including other sessions' edits that
+    keep the record count); persisted counters while the dataset file is
+    unchanged since they were written. Otherwise they are rebuilt.
+    """
+    session_key = f"{data_type}_counters"
+    records = st.session_state.get(data_type, [])
+    version = get_data_version(data_type)
+
+    counters = st.session_state.get(session_key)
+    if counters is None or counters.get('version') != version:
+        counters = load_metadata(data_type, 'counters')
+        if counters is not None and counters.get('source') != data_file_fingerprint(data_type):
+            counters = None
+
+    if counters is None or counters.get('count') != len(records):
+        counters = build_counters(data_type, records)
+        _save_counters(data_type, counters)
+
+    counters['version'] = version
+    st.session_state[session_key] = counters
+    return counters
+
+def _update_counters(data_type: str, removed: List[Dict[str, Any]], added: List[Dict[str, Any]]):
+    session_key = f"{data_type}_counters"
+    if data_type not in COUNTER_SPECS or session_key not in st.session_state:
+        # Not materialized yet; get_counters will build it on first use
+        return
+
+    counters = st.session_state[session_key]
+    version = get_data_version(data_type)
+    if counters.get('version') != version - 1:
+        # The save of this write bumped the version once; counters that missed an
+        # earlier write (another session's) or a failed save are rebuilt instead
+        del st.session_state[session_key]
+        return
+    for record in removed:
+        _apply(counters, record, -1)
+    for record in added:
+        _apply(counters, record, 1)
+    counters['version'] = version
+    _save_counters(data_type, counters)
+
+def record_inserted(data_type: str, record: Dict[str, Any]):
+    """Add a new record to its dataset's counters"""
+    _update_counters(data_type, [], [record])
+
+def record_updated(data_type: str, old_record: Dict[str, Any], new_record: Dict[str, Any]):
+    """Move a changed record's contribution from its old to its new values"""
+    _update_counters(data_type, [old_record], [new_record])
+
+def records_deleted(data_type: str, records: List[Dict[str, Any]]):
+    """Remove deleted records from their dataset's counters"""
+    _update_counters(data_type, records, [])
+
+def get_sum(data_type: str, field: str) -> float:
+    """Running total of a numeric field"""
+    return get_counters(data_type)['sums'].get(field, 0.0)
+
+def get_group_count(data_type: str, field: str, value: Any) -> int:
+    """Number of records whose field equals value"""
+    return get_counters(data_type)['groups'].get(field, {}).get(str(value), 0)
@@ -1,40 +1,230 @@
+import functools
 import json
 import os
-from typing import Any, List, Dict
+import re
+import tempfile
+import time
+from collections.abc import Mapping
+from contextvars import ContextVar
+from typing import Any, Callable, List, Dict, Iterable, Iterator, Optional, Tuple
+
+DATA_ROOT = "data"
+DEFAULT_FARM = "default"
+_FARM_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+# Farm whose data the current script run (or thread) reads and writes
+_active_farm: ContextVar[str] = ContextVar('active_farm', default=DEFAULT_FARM)
+
+def get_active_farm() -> str:
+    """Get the id of the farm the current context works on"""
+    return _active_farm.get()
+
+def set_active_farm(farm_id: str):
+    """Point data access in the current context at a farm; returns a token for reset_active_farm"""
+    get_farm_data_dir(farm_id)
+    return _active_farm.set(farm_id)
+
+def reset_active_farm(token):
+    _active_farm.reset(token)
+
+@functools.lru_cache(maxsize=None)
+def get_farm_data_dir(farm_id: str) -> str:
+    """Get (and create once) a farm's data directory.
+
+    The default farm keeps the original data/ directory so existing
+    installations need no migration; other farms live under data/farms/<id>/.
+    """
+    if farm_id != DEFAULT_FARM and not _FARM_ID.match(farm_id):
+        raise ValueError(f"Invalid farm id: {farm_id!r}")
+    data_dir = DATA_ROOT if farm_id == DEFAULT_FARM else os.path.join(DATA_ROOT, "farms", farm_id)
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+def list_farms() -> List[str]:
+    """Ids of all farms with a data directory, default farm first"""
+    farms_dir = os.path.join(DATA_ROOT, "farms")
+    farms = sorted(name for name in os.listdir(farms_dir) if _FARM_ID.match(name)) if os.path.isdir(farms_dir) else []
+    return [DEFAULT_FARM] + [farm for farm in farms if farm != DEFAULT_FARM]
 
 def get_data_file_path(data_type: str) -> str:
-    """Get the file path for a specific data type"""
-    data_dir = "data"
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-    return os.path.join(data_dir, f"{data_type}.json")
+    """Get the file path for a specific data type of the active farm"""
+    return os.path.join(get_farm_data_dir(get_active_farm()), f"{data_type}.json")
+
+# Bumped on every successful save so caches can tell when a dataset changed
+_data_versions: Dict[Tuple[str, str], int] = {}
+
+def get_data_version(data_type: str) -> int:
+    """Get the in-process version number of a data type of the active farm"""
+    return _data_versions.get((get_active_farm(), data_type), 0)
+
+def _bump_data_version(data_type: str):
+    key = (get_active_farm(), data_type)
+    _data_versions[key] = _data_versions.get(key, 0) + 1
+
+def note_external_change(data_type: str):
+    """Bump a data type's version after another process rewrote its file, so caches keyed on it rebuild"""
+    _bump_data_version(data_type)
+
+def data_file_fingerprint(data_type: str) -> Optional[List[int]]:
+    """Modification time and size of a dataset's file, or None when it does not exist.
+
+    Unlike data versions these survive restarts and see writes from other
+    processes, so data derived from a dataset and kept on disk records them
+    to tell whether it is stale.
+    """
+    try:
+        stat = os.stat(get_data_file_path(data_type))
+        return [stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        return None
+
+def json_default(value: Any) -> Any:
+    """Serialize dict-like records (see utils.compact) as objects and anything else as text"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+# Called as observer(operation, data_type, bytes, seconds) after every dataset read or write
+IO_OBSERVERS: List[Callable[[str, str, int, float], None]] = []
+
+def _notify_io(operation: str, data_type: str, size: int, started: float):
+    if IO_OBSERVERS:
+        seconds = time.perf_counter() - started
+        for observer in IO_OBSERVERS:
+            observer(operation, data_type, size, seconds)
 
 def save_data(data_type: str, data: List[Dict[str, Any]]) -> bool:
     """Save data to JSON file"""
     try:
+        started = time.perf_counter()
         file_path = get_data_file_path(data_type)
         with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+            json.dump(data, f, indent=2, default=json_default)
+            size = f.tell()
+        _bump_data_version(data_type)
+        _notify_io('save', data_type, size, started)
         return True
     except Exception as e:
         print(f"Error saving data for {data_type}: {str(e)}")
         return False
 
+def save_data_streaming(data_type: str, records: Iterable[Dict[str, Any]]) -> int:
+    """Write records to a data type's JSON file one at a time and return how many were written.
+
+    The file is written to a temporary path and swapped in atomically, so the
+    serialized payload is never held in memory and a failure leaves the
+    previous file intact.
+    """
+    started = time.perf_counter()
+    file_path = get_data_file_path(data_type)
+    temp_path = f"{file_path}.tmp"
+    count = 0
+    try:
+        with open(temp_path, 'w') as f:
+            f.write('[')
+            for record in records:
+                f.write(',\n  ' if count else '\n  ')
+                f.write(json.dumps(record, default=json_default))
+                count += 1
+            f.write('\n]' if count else ']')
+            size = f.tell()
+        os.replace(temp_path, file_path)
+        _bump_data_version(data_type)
+        _notify_io('save', data_type, size, started)
+        return count
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
 def load_data(data_type: str, default_value: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Load data from JSON file"""
     if default_value is None:
         default_value = []
     
     try:
+        started = time.perf_counter()
         file_path = get_data_file_path(data_type)
         if os.path.exists(file_path):
             with open(file_path, 'r') as f:
-                return json.load(f)
+                data = json.load(f)
+                size = os.fstat(f.fileno()).st_size
+            _notify_io('load', data_type, size, started)
+            return data
         return default_value
     except Exception as e:
         print(f"Error loading data for {data_type}: {str(e)}")
         return default_value
 
+def get_metadata_file_path(data_type: str, name: str) -> str:
+    """Get the file path for metadata stored alongside a data type (e.g. counters)"""
+    return get_data_file_path(f"{data_type}.{name}")
+
+def save_metadata(data_type: str, name: str, payload: Dict[str, Any]) -> bool:
+    """Save a metadata document next to its dataset.
+
+    Written to a temporary file and swapped in, so readers in other threads or
+    processes never see a partly written document.
+    """
+    temp_path = None
+    try:
+        file_path = get_metadata_file_path(data_type, name)
+        # A unique name per writer, as the app and the CLI may write the same document
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f, default=str)
+        os.replace(temp_path, file_path)
+        return True
+    except Exception as e:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        print(f"Error saving {name} for {data_type}: {str(e)}")
+        return False
+
+def load_metadata(data_type: str, name: str) -> Optional[Dict[str, Any]]:
+    """Load a metadata document, or None when it does not exist or cannot be read"""
+    try:
+        file_path = get_metadata_file_path(data_type, name)
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        return None
+    except Exception as e:
+        print(f"Error loading {name} for {data_type}: {str(e)}")
+        return None
+
+_ARRAY_SEPARATOR = re.compile(r'[\s,]*')
+
+def iter_data(data_type: str, buffer_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a data file one at a time without loading the whole array"""
+    file_path = get_data_file_path(data_type)
+    if not os.path.exists(file_path):
+        return
+
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r') as f:
+        buffer = f.read(buffer_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{file_path} does not contain a JSON array")
+        pos = 1
+
+        while True:
+            pos = _ARRAY_SEPARATOR.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                if pos == len(buffer):
+                    raise ValueError("need more data")
+                record, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                more = f.read(buffer_size)
+                if not more:
+                    raise ValueError(f"{file_path} ends in the middle of a record")
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield record
+
 def delete_data(data_type: str) -> bool:
     """Delete data file"""
     try:
@@ -52,19 +242,18 @@ def backup_data() -> bool:
         import shutil
         from datetime import datetime
         
-        data_dir = "data"
-        if not os.path.exists(data_dir):
+        if not os.path.exists(DATA_ROOT):
             return True
         
-        backup_dir = f"data_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        shutil.copytree(data_dir, backup_dir)
+        backup_dir = f"{DATA_ROOT}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        shutil.copytree(DATA_ROOT, backup_dir)
         return True
     except Exception as e:
         print(f"Error creating backup: {str(e)}")
         return False
 
 def get_data_summary() -> Dict[str, int]:
-    """Get summary of all stored data"""
+    """Get summary of all stored data of the active farm"""
     summary = {}
     data_types = [
         'farm_plans', 'fields', 'expenses', 'equipment', 'tasks', 'operations',
@@ -0,0 +1,18 @@
+import numpy as np
+from typing import Any, Dict, Iterable
+from utils.common import parse_iso_date
+
+# Batch version of the utils.common date parser over whole columns, kept apart
+# so the app can start without numpy
+
+def parse_iso_dates(values: Iterable[Any]) -> np.ndarray:
+    """datetime64[D] array of ISO date or datetime strings; missing or invalid values become NaT.
+
+    Columns repeat a few hundred distinct dates, so each distinct value is
+    parsed once and the results are gathered by index.
+    """
+    positions: Dict[str, int] = {}
+    indices = [positions.setdefault(str(value)[:10] if value is not None else '', len(positions))
+               for value in values]
+    parsed = np.array([parse_iso_date(text) for text in positions], dtype='datetime64[D]')
+    return parsed[np.array(indices, dtype=np.intp)]
@@ -0,0 +1,254 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import tempfile
+import streamlit as st
+from datetime import date
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+from utils.common import MAX_DOWNLOAD_BYTES
+from utils.database import iter_data, json_default, set_active_farm, DEFAULT_FARM
+from utils.categorical import ENCODED_COLUMNS
+from utils.schema import DATASET_SCHEMAS
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+DEFAULT_CHUNK_SIZE = 10000
+
+# Column used for date-range filtering of each data type
+DATE_FIELDS = {
+    'farm_plans': 'plant_date',
+    'fields': 'created_date',
+    'expenses': 'date',
+    'equipment': 'purchase_date',
+    'tasks': 'due_date',
+    'operations': 'date',
+    'revenue_plans': 'created_date',
+    'crop_prices': 'price_date',
+    'profit_analysis': 'created_date'
+}
+
+# Parquet column types per data type (the importable ones follow DATASET_SCHEMAS);
+# columns not listed are written as text
+_TEXT = 'string'
+EXPORT_COLUMN_TYPES: Dict[str, Dict[str, str]] = {
+    **{data_type: {
+        field: {float: 'float', int: 'int'}[schema['numeric'][field][2]] if field in schema['numeric'] else
+        'int' if field == 'id' else _TEXT
+        for field in schema['fields']
+    } for data_type, schema in DATASET_SCHEMAS.items()},
+    'farm_plans': {
+        'id': 'int', 'name': _TEXT, 'field': _TEXT, 'crop_type': _TEXT, 'plant_date': _TEXT, 'harvest_date': _TEXT,
+        'area_planned': 'float', 'status': _TEXT, 'created_date': _TEXT
+    },
+    'equipment': {
+        'id': 'int', 'name': _TEXT, 'type': _TEXT, 'purchase_date': _TEXT, 'purchase_cost': 'float',
+        'serial_number': _TEXT, 'manufacturer': _TEXT, 'condition': _TEXT, 'last_maintenance': _TEXT,
+        'total_hours': 'float', 'added_date': _TEXT
+    },
+    'tasks': {
+        'id': 'int', 'name': _TEXT, 'priority': _TEXT, 'status': _TEXT, 'due_date': _TEXT, 'assigned_to': _TEXT,
+        'description': _TEXT, 'created_date': _TEXT
+    },
+    'revenue_plans': {
+        'id': 'int', 'name': _TEXT, 'crop_type': _TEXT, 'planned_area': 'float', 'expected_yield_per_acre': 'float',
+        'yield_unit': _TEXT, 'expected_price': 'float', 'price_source': _TEXT, 'total_expected_yield': 'float',
+        'total_expected_revenue': 'float', 'planning_year': 'int', 'notes': _TEXT, 'status': _TEXT,
+        'created_date': _TEXT
+    },
+    'profit_analysis': {
+        'id': 'int', 'crop': _TEXT, 'area': 'float', 'seed_cost': 'float', 'fertilizer_cost': 'float',
+        'pesticide_cost': 'float', 'fuel_cost': 'float', 'labor_cost': 'float', 'equipment_cost': 'float',
+        'other_cost': 'float', 'total_cost': 'float', 'cost_per_acre': 'float', 'year': 'int', 'created_date': _TEXT
+    }
+}
+
+def iter_filtered(records: Iterable[Dict[str, Any]], date_field: Optional[str] = None,
+                  start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """Yield records whose date_field falls within [start_date, end_date] (inclusive).
+
+    ISO dates compare correctly as strings, so only the YYYY-MM-DD prefix is
+    compared and no dates are parsed.
+    """
+    start = start_date.isoformat() if start_date else None
+    end = end_date.isoformat() if end_date else None
+    for record in records:
+        if date_field and (start or end):
+            value = str(record.get(date_field) or '')[:10]
+            if not value or (start and value < start) or (end and value > end):
+                continue
+        yield record
+
+def iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _columns(data_type: str, first_chunk: List[Dict[str, Any]]) -> List[str]:
+    if data_type in DATASET_SCHEMAS:
+        return DATASET_SCHEMAS[data_type]['fields']
+    columns = {}
+    for record in first_chunk:
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+def write_csv(data_type: str, chunks: Iterable[List[Dict[str, Any]]], out: IO[bytes]) -> int:
+    """Write chunks of records as UTF-8 CSV; returns the number of rows written"""
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    writer = None
+    count = 0
+    for chunk in chunks:
+        if writer is None:
+            writer = csv.DictWriter(text, fieldnames=_columns(data_type, chunk), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerows(chunk)
+        count += len(chunk)
+    text.flush()
+    text.detach()
+    return count
+
+def write_ndjson(data_type: str, chunks: Iterable[List[Dict[str, Any]]], out: IO[bytes]) -> int:
+    """Write chunks of records as newline-delimited JSON; returns the number of rows written"""
+    count = 0
+    for chunk in chunks:
+        out.write(''.join(json.dumps(record, default=json_default) + '\n' for record in chunk).encode('utf-8'))
+        count += len(chunk)
+    return count
+
+def write_parquet(data_type: str, chunks: Iterable[List[Dict[str, Any]]], out: IO[bytes]) -> int:
+    """Write chunks of records as Parquet row groups; returns the number of rows written.
+
+    Columns get their declared types (EXPORT_COLUMN_TYPES) and every chunk is
+    cast to them, so a value that does not fit raises ValueError instead of
+    being truncated or changing type between row groups.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires the 'pyarrow' package")
+
+    arrow_types = {'int': pa.int64(), 'float': pa.float64(), _TEXT: pa.string()}
+    # Categorical text columns are written dictionary-encoded and read back as categoricals
+    encoded = ENCODED_COLUMNS.get(data_type, {})
+
+    def column(values: List[Any], kind: str, name: str):
+        if kind == _TEXT:
+            array = pa.array([None if v is None else str(v) for v in values], pa.string())
+            return array.dictionary_encode() if name in encoded else array
+        return pa.array([None if v == '' else v for v in values]).cast(arrow_types[kind])
+
+    writer = None
+    count = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                types = dict(EXPORT_COLUMN_TYPES.get(data_type, {}))
+                for record in chunk:
+                    for name in record:
+                        types.setdefault(name, _TEXT)
+                schema = pa.schema([
+                    pa.field(name, pa.dictionary(pa.int32(), pa.string()) if name in encoded and kind == _TEXT
+                             else arrow_types[kind])
+                    for name, kind in types.items()
+                ])
+                writer = pq.ParquetWriter(out, schema)
+            table = pa.Table.from_arrays(
+                [column([r.get(name) for r in chunk], kind, name) for name, kind in types.items()], schema=schema)
+            writer.write_table(table)
+            count += len(chunk)
+    except pa.ArrowException as e:
+        raise ValueError(f"Cannot write {data_type} as Parquet: {e}")
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+WRITERS = {'csv': write_csv, 'ndjson': write_ndjson, 'parquet': write_parquet}
+
+def export_dataset(data_type: str, out: IO[bytes], file_format: str = 'csv',
+                   start_date: Optional[date] = None, end_date: Optional[date] = None,
+                   records: Optional[Iterable[Dict[str, Any]]] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream a dataset, optionally filtered by date range, into a binary file object.
+
+    Records are serialized chunk by chunk, so the full serialized payload is
+    never held in memory. Without records, the data file itself is read
+    incrementally. Returns the number of records written.
+    """
+    if records is None:
+        records = iter_data(data_type)
+    filtered = iter_filtered(records, DATE_FIELDS.get(data_type), start_date, end_date)
+    return WRITERS[file_format](data_type, iter_chunks(filtered, chunk_size), out)
+
+def show_export():
+    """Streamlit panel that exports any dataset as CSV, NDJSON or Parquet"""
+    with st.expander("📤 Export Data"):
+        data_type = st.selectbox("Dataset", list(DATE_FIELDS), key="export_data_type",
+                                 format_func=lambda t: t.replace('_', ' ').title())
+        file_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format",
+                                   format_func=str.upper)
+        use_range = st.checkbox("Filter by date range", key="export_use_range")
+        start_date = end_date = None
+        if use_range:
+            start_date = st.date_input("From", key="export_start")
+            end_date = st.date_input("To", key="export_end")
+
+        if st.button("Prepare Export", key="export_prepare", use_container_width=True):
+            # Serialized to disk in chunks; st.download_button then reads the file into
+            # memory to serve it, so larger exports are pointed to the command line
+            export_file = tempfile.TemporaryFile(buffering=0)
+            out = io.BufferedWriter(export_file)
+            try:
+                count = export_dataset(data_type, out, file_format, start_date, end_date,
+                                       records=st.session_state.get(data_type))
+            except (ImportError, ValueError) as e:
+                st.error(f"❌ {e}")
+                return
+            out.flush()
+            out.detach()
+            mime, extension = EXPORT_FORMATS[file_format]
+            size = export_file.tell()
+            st.caption(f"{count:,} records")
+            if size > MAX_DOWNLOAD_BYTES:
+                export_file.close()
+                st.warning(
+                    f"⚠️ This export is {size / 2 ** 20:,.0f} MB, too large to download from the app. "
+                    f"Run `python -m utils.export {data_type} {data_type}.{extension}` on the server instead."
+                )
+                return
+            export_file.seek(0)
+            st.download_button("Download", data=export_file, file_name=f"{data_type}.{extension}",
+                               mime=mime, key="export_download", use_container_width=True)
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Export a farm dataset as CSV, NDJSON or Parquet")
+    parser.add_argument('data_type', choices=list(DATE_FIELDS))
+    parser.add_argument('path', help="Output file")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS),
+                        help="Output format (default: from the file extension)")
+    parser.add_argument('--start', type=date.fromisoformat, help="First date to include (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, help="Last date to include (YYYY-MM-DD)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--farm', default=DEFAULT_FARM, help="Farm to export from")
+    args = parser.parse_args(argv)
+
+    set_active_farm(args.farm)
+    file_format = args.format or args.path.rsplit('.', 1)[-1].lower()
+    if file_format not in EXPORT_FORMATS:
+        parser.error(f"Cannot infer format from {args.path}; use --format")
+
+    with open(args.path, 'wb') as out:
+        count = export_dataset(args.data_type, out, file_format, args.start, args.end,
+                               chunk_size=args.chunk_size)
+    print(f"Exported {count} {args.data_type} records to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import threading
+import time
+import streamlit as st
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from utils.compact import compact_records
+from utils.database import (
+    DEFAULT_FARM, get_active_farm, set_active_farm, get_farm_data_dir, list_farms,
+    load_data, save_data, get_data_version, data_file_fingerprint, note_external_change
+)
+from utils.report_jobs import cancel_report
+
+FARM_CACHE_SIZE = 256
+FARM_IDLE_SECONDS = 15 * 60
+
+# Session keys that survive switching farms; everything else belongs to the farm
+PRESERVED_SESSION_KEYS = {'current_app', 'perf_enabled'}
+
+class FarmStore:
+    """Datasets of one farm, each loaded from disk on first access.
+
+    The lists are shared by every session on the farm and never changed in
+    place: writers build a new list under the lock and swap it in with
+    replace, so a session still holding the previous list keeps a consistent
+    copy until its next run picks up the new one.
+
+    Each list is kept with the data version and file fingerprint it was read
+    at. Other processes (bulk-import CLI, other app workers) only change the
+    file, so the fingerprint is what reveals their writes.
+    """
+
+    def __init__(self, farm_id: str):
+        self.farm_id = farm_id
+        self.datasets: Dict[str, Tuple[int, Optional[List[int]], List[Dict[str, Any]]]] = {}
+        self.last_used = time.monotonic()
+        self.lock = threading.RLock()
+
+    def dataset(self, data_type: str) -> List[Dict[str, Any]]:
+        """A dataset shared by every session on this farm, reloaded if another writer saved it.
+
+        Hot datasets are held as compact records (see utils.compact).
+        """
+        with self.lock:
+            fingerprint = data_file_fingerprint(data_type)
+            cached = self.datasets.get(data_type)
+            if cached is not None and cached[1] != fingerprint:
+                # Rewritten by another process; caches keyed on the version must rebuild too
+                note_external_change(data_type)
+            version = get_data_version(data_type)
+            if cached is None or cached[0] != version:
+                cached = (version, fingerprint, compact_records(data_type, load_data(data_type, [])))
+                self.datasets[data_type] = cached
+            return cached[2]
+
+    def replace(self, data_type: str, records: List[Dict[str, Any]]) -> bool:
+        """Persist a new list for a dataset and share it; call with the lock held.
+
+        Refuses (returning False) when the file changed since the dataset was
+        read, so records another process wrote in the meantime are not lost.
+        """
+        cached = self.datasets.get(data_type)
+        if cached is not None and cached[1] != data_file_fingerprint(data_type):
+            print(f"Error saving data for {data_type}: the file was changed by another process")
+            return False
+        if not save_data(data_type, records):
+            return False
+        self.datasets[data_type] = (get_data_version(data_type), data_file_fingerprint(data_type), records)
+        return True
+
+class FarmCache:
+    """Process-wide cache of farm datasets with idle and LRU eviction.
+
+    Farms are ordered by last use, so idle farms are always at the front and
+    eviction stops at the first farm still in use.
+    """
+
+    def __init__(self, max_farms: int = FARM_CACHE_SIZE, idle_seconds: float = FARM_IDLE_SECONDS):
+        self.max_farms = max_farms
+        self.idle_seconds = idle_seconds
+        self.farms: "OrderedDict[str, FarmStore]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, farm_id: str) -> FarmStore:
+        with self.lock:
+            store = self.farms.get(farm_id)
+            if store is None:
+                store = self.farms[farm_id] = FarmStore(farm_id)
+            self.farms.move_to_end(farm_id)
+            store.last_used = time.monotonic()
+            self._evict()
+            return store
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        while self.farms:
+            farm_id, store = next(iter(self.farms.items()))
+            if len(self.farms) <= self.max_farms and store.last_used >= cutoff:
+                break
+            del self.farms[farm_id]
+
+    def evict(self, farm_id: str):
+        with self.lock:
+            self.farms.pop(farm_id, None)
+
+@st.cache_resource
+def get_farm_cache() -> FarmCache:
+    return FarmCache()
+
+def get_farm_store() -> FarmStore:
+    """Store of the active farm from the process-wide farm cache"""
+    return get_farm_cache().get(get_active_farm())
+
+def load_farm_dataset(data_type: str) -> List[Dict[str, Any]]:
+    """Dataset of the active farm from the process-wide farm cache"""
+    return get_farm_store().dataset(data_type)
+
+def activate_session_farm():
+    """Point this script run's data access at the session's farm"""
+    set_active_farm(st.session_state.get('farm_id', DEFAULT_FARM))
+
+def switch_farm(farm_id: str):
+    """Make another farm the session's farm, dropping the previous farm's session data"""
+    for name in list(st.session_state.get('_report_jobs', {})):
+        cancel_report(name)
+    for key in list(st.session_state.keys()):
+        if key not in PRESERVED_SESSION_KEYS:
+            del st.session_state[key]
+    st.session_state.farm_id = farm_id
+    set_active_farm(farm_id)
+
+def show_farm_selector():
+    """Sidebar farm picker with an option to start a new farm"""
+    current = st.session_state.get('farm_id', DEFAULT_FARM)
+    farms = list_farms()
+    if current not in farms:
+        farms.append(current)
+
+    selected = st.selectbox("🏡 Farm", farms, index=farms.index(current), key="farm_selector",
+                            format_func=lambda farm: "Default Farm" if farm == DEFAULT_FARM else farm)
+    if selected != current:
+        switch_farm(selected)
+        st.rerun()
+
+    with st.expander("➕ New Farm"):
+        new_farm = st.text_input("Farm ID", key="new_farm_id", help="Letters, digits, '-' and '_'")
+        if st.button("Create Farm", key="create_farm") and new_farm:
+            try:
+                get_farm_data_dir(new_farm)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
+            switch_farm(new_farm)
+            st.rerun()
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict, List, Optional
+from utils.dates import parse_iso_dates
+from utils.database import get_data_version
+from utils.schema import DATASET_SCHEMAS
+
+MODELS = ['exponential_smoothing', 'seasonal_naive', 'linear_trend']
+SMOOTHING_ALPHAS = np.linspace(0.1, 0.9, 9)
+SEASON_LENGTH = 12
+
+DEFAULT_UNIT = DATASET_SCHEMAS['crop_prices']['defaults']['unit']
+
+def monthly_price_matrix(crop_prices: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Average price per (crop, unit) and calendar month as a (series x months) table.
+
+    Prices in different units are separate series, never averaged together.
+    Months without a recorded price carry the previous month's price forward;
+    months before a series' first price are left empty.
+    """
+    prices = pd.DataFrame(crop_prices, columns=['crop', 'unit', 'price_date', 'price'])
+    prices['unit'] = prices['unit'].fillna(DEFAULT_UNIT)
+    prices['month'] = pd.DatetimeIndex(parse_iso_dates(prices['price_date'])).to_period('M')
+    table = prices.pivot_table(index=['crop', 'unit'], columns='month', values='price', aggfunc='mean')
+
+    all_months = pd.period_range(table.columns.min(), table.columns.max(), freq='M')
+    return table.reindex(columns=all_months).ffill(axis=1)
+
+def _masked_mae(errors: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    counts = mask.sum(axis=-1)
+    totals = np.where(mask, np.abs(errors), 0.0).sum(axis=-1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.inf)
+
+def fit_price_models(crop_prices: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Fit every model to every (crop, unit) monthly price history in one vectorized batch.
+
+    Each model is scored by in-sample one-step mean absolute error and the
+    best one is selected per series. Returns None when there are no prices.
+    """
+    if not crop_prices:
+        return None
+
+    table = monthly_price_matrix(crop_prices)
+    latest_dates = (pd.DataFrame(crop_prices, columns=['crop', 'unit', 'price_date'])
+                    .fillna({'unit': DEFAULT_UNIT})
+                    .groupby(['crop', 'unit'])['price_date'].max()
+                    .reindex(table.index))
+    observed = table.notna().to_numpy()
+    # Leading gaps take the first recorded price so they contribute no error
+    values = table.bfill(axis=1).to_numpy(dtype=float)
+    n_crops, n_months = values.shape
+
+    # Exponential smoothing for every (alpha, crop) pair at once
+    alphas = SMOOTHING_ALPHAS[:, None]
+    levels = np.broadcast_to(values[:, 0], (len(SMOOTHING_ALPHAS), n_crops)).copy()
+    ses_errors = np.zeros((len(SMOOTHING_ALPHAS), n_crops, n_months))
+    for t in range(1, n_months):
+        ses_errors[:, :, t] = values[:, t] - levels
+        levels = alphas * values[:, t] + (1 - alphas) * levels
+    step_mask = np.zeros_like(observed)
+    step_mask[:, 1:] = observed[:, 1:] & observed[:, :-1]
+    ses_mae_by_alpha = _masked_mae(ses_errors, np.broadcast_to(step_mask, ses_errors.shape))
+    best_alpha_idx = ses_mae_by_alpha.argmin(axis=0)
+    crop_idx = np.arange(n_crops)
+    ses_mae = ses_mae_by_alpha[best_alpha_idx, crop_idx]
+    ses_level = levels[best_alpha_idx, crop_idx]
+
+    # Seasonal naive: same month one season earlier
+    seasonal_mae = np.full(n_crops, np.inf)
+    if n_months > SEASON_LENGTH:
+        seasonal_errors = values[:, SEASON_LENGTH:] - values[:, :-SEASON_LENGTH]
+        seasonal_mask = observed[:, SEASON_LENGTH:] & observed[:, :-SEASON_LENGTH]
+        seasonal_mae = _masked_mae(seasonal_errors, seasonal_mask)
+        seasonal_mae[seasonal_mask.sum(axis=1) < 3] = np.inf
+
+    # Linear trend by masked least squares, solved for all crops together
+    t = np.arange(n_months, dtype=float)
+    weights = observed.astype(float)
+    counts = np.maximum(weights.sum(axis=1), 1)
+    t_mean = (weights * t).sum(axis=1) / counts
+    y_mean = (weights * values).sum(axis=1) / counts
+    t_dev = (t - t_mean[:, None]) * weights
+    denominator = (t_dev * (t - t_mean[:, None])).sum(axis=1)
+    slope = np.where(denominator > 0, (t_dev * (values - y_mean[:, None])).sum(axis=1) / np.where(denominator > 0, denominator, 1), 0.0)
+    intercept = y_mean - slope * t_mean
+    trend_mae = _masked_mae(values - (intercept[:, None] + slope[:, None] * t), observed)
+
+    scores = np.vstack([ses_mae, seasonal_mae, trend_mae])
+    best_model = scores.argmin(axis=0)
+
+    return {
+        'series': list(table.index),
+        'last_month': table.columns[-1],
+        'latest_price_date': list(latest_dates),
+        'values': values,
+        'model': [MODELS[i] for i in best_model],
+        'mae': scores[best_model, crop_idx],
+        'alpha': SMOOTHING_ALPHAS[best_alpha_idx],
+        'level': ses_level,
+        'slope': slope,
+        'intercept': intercept
+    }
+
+def forecast_prices(fitted: Dict[str, Any], horizons: np.ndarray) -> np.ndarray:
+    """Forecast every series at the given horizons (months after the last month), shape (series x horizons)"""
+    horizons = np.asarray(horizons, dtype=int)
+    values = fitted['values']
+    n_crops, n_months = values.shape
+    models = np.array(fitted['model'])[:, None]
+
+    ses = np.broadcast_to(fitted['level'][:, None], (n_crops, len(horizons)))
+    trend = fitted['intercept'][:, None] + fitted['slope'][:, None] * (n_months - 1 + horizons)[None, :]
+    seasons_back = np.ceil(horizons / SEASON_LENGTH).astype(int)
+    seasonal_idx = np.clip(n_months - 1 + horizons - SEASON_LENGTH * seasons_back, 0, n_months - 1)
+    seasonal = values[:, seasonal_idx]
+
+    forecasts = np.where(models == 'exponential_smoothing', ses,
+                         np.where(models == 'seasonal_naive', seasonal, trend))
+    return np.maximum(forecasts, 0.0)
+
+def forecast_units(fitted: Optional[Dict[str, Any]], crop: str) -> List[str]:
+    """Units a crop has price forecasts in"""
+    if fitted is None:
+        return []
+    return [unit for series_crop, unit in fitted['series'] if series_crop == crop]
+
+def forecast_for_year(fitted: Optional[Dict[str, Any]], crop: str, unit: str, year: int) -> Optional[float]:
+    """Average forecast price per unit for a crop over the not-yet-observed months of a year"""
+    if fitted is None or (crop, unit) not in fitted['series']:
+        return None
+
+    last_month = fitted['last_month']
+    last_ordinal = last_month.year * 12 + last_month.month
+    horizons = [year * 12 + month - last_ordinal for month in range(1, 13)]
+    horizons = [h for h in horizons if h >= 1]
+    if not horizons:
+        return None
+
+    forecasts = forecast_prices(fitted, np.array(horizons))
+    return float(forecasts[fitted['series'].index((crop, unit))].mean())
+
+def forecast_table(fitted: Dict[str, Any], months_ahead: int = 6) -> pd.DataFrame:
+    """Model, fit error and next months' forecast for every crop and price unit"""
+    horizons = np.arange(1, months_ahead + 1)
+    forecasts = forecast_prices(fitted, horizons)
+    month_labels = [str(fitted['last_month'] + int(h)) for h in horizons]
+
+    index = pd.MultiIndex.from_tuples(fitted['series'], names=['crop', 'unit'])
+    table = pd.DataFrame(forecasts, index=index, columns=month_labels)
+    table.insert(0, 'model', fitted['model'])
+    table.insert(1, 'mae', fitted['mae'])
+    return table
+
+def crop_forecast(fitted: Optional[Dict[str, Any]], crop: str, months_ahead: int = 12) -> Optional[Dict[str, Any]]:
+    """Selected model and monthly forecast prices of one crop in the unit of its latest price,
+    or None without a fitted model"""
+    rows = [i for i, (series_crop, _) in enumerate(fitted['series']) if series_crop == crop] if fitted else []
+    if not rows:
+        return None
+    row_idx = max(rows, key=lambda i: fitted['latest_price_date'][i])
+    unit = fitted['series'][row_idx][1]
+    row = forecast_table(fitted, months_ahead).loc[(crop, unit)]
+    return {'model': row['model'], 'unit': unit,
+            'prices': {month: float(price) for month, price in row.drop(['model', 'mae']).items()}}
+
+def get_price_models() -> Optional[Dict[str, Any]]:
+    """Fitted price models for the session's crop_prices, refit only when new prices arrive"""
+    crop_prices = st.session_state.get('crop_prices', [])
+    data_version = (get_data_version('crop_prices'), len(crop_prices))
+
+    cached = st.session_state.get('_price_models')
+    if cached is None or cached['data_version'] != data_version:
+        cached = {'data_version': data_version, 'fitted': fit_price_models(crop_prices)}
+        st.session_state['_price_models'] = cached
+    return cached['fitted']
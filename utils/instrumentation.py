@@ -0,0 +1,178 @@
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import time
+import streamlit as st
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.database import IO_OBSERVERS, get_active_farm
+
+# Set FARM_PERF=1 to record timings from the first run; FARM_PERF_LOG=<path> appends each run as a JSON line
+PERF_ENV = "FARM_PERF"
+PERF_LOG_ENV = "FARM_PERF_LOG"
+PROFILE_LINES = 40
+
+class RunStats:
+    """Section timings and data file I/O of one script run"""
+
+    def __init__(self, profile: bool = False):
+        self.started = time.perf_counter()
+        # In the order sections were entered, so nesting reads top to bottom
+        self.sections: List[Dict[str, Any]] = []
+        self.depth = 0
+        self.io: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.profiler = cProfile.Profile() if profile else None
+
+    def record_io(self, operation: str, data_type: str, size: int, seconds: float):
+        totals = self.io.setdefault((operation, data_type), {'calls': 0, 'bytes': 0, 'seconds': 0.0})
+        totals['calls'] += 1
+        totals['bytes'] += size
+        totals['seconds'] += seconds
+
+# Run being recorded in the current script thread, or None when instrumentation is off
+_current_run: ContextVar[Optional[RunStats]] = ContextVar('perf_run', default=None)
+
+def _record_io(operation: str, data_type: str, size: int, seconds: float):
+    run = _current_run.get()
+    if run is not None:
+        run.record_io(operation, data_type, size, seconds)
+
+IO_OBSERVERS.append(_record_io)
+
+@contextmanager
+def section(name: str):
+    """Time a block as a named section of the current run; a no-op when not recording"""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+
+    entry = {'section': name, 'depth': run.depth, 'seconds': 0.0}
+    run.sections.append(entry)
+    run.depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry['seconds'] = time.perf_counter() - started
+        run.depth -= 1
+
+def timed(fn: Callable = None, *, name: str = None):
+    """Decorator recording each call of a function as a section"""
+    if fn is None:
+        return lambda fn: timed(fn, name=name)
+    label = name or fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_run.get() is None:
+            return fn(*args, **kwargs)
+        with section(label):
+            return fn(*args, **kwargs)
+
+    wrapper.__timed__ = True
+    return wrapper
+
+def instrument_module(module):
+    """Wrap a module's show() and show_* functions so every view and section is timed.
+
+    Views look each other up through module globals when they run, so
+    replacing the module attributes also covers nested sections.
+    """
+    prefix = module.__name__.rsplit('.', 1)[-1]
+    for attr, value in list(vars(module).items()):
+        if not (attr == 'show' or attr.startswith('show_')):
+            continue
+        if inspect.isfunction(value) and value.__module__ == module.__name__ and not hasattr(value, '__timed__'):
+            setattr(module, attr, timed(value, name=f"{prefix}.{attr}"))
+    return module
+
+def is_enabled() -> bool:
+    return st.session_state.get('perf_enabled', os.environ.get(PERF_ENV) == '1')
+
+def start_run() -> Optional[RunStats]:
+    """Begin recording this script run if timings are on or a profile was requested"""
+    previous = _current_run.get()
+    if previous is not None and previous.profiler is not None:
+        # The previous run ended in st.rerun() before it could stop its profiler
+        previous.profiler.disable()
+
+    profile = st.session_state.pop('perf_profile_next', False)
+    run = RunStats(profile) if profile or is_enabled() else None
+    _current_run.set(run)
+    if run is not None and run.profiler is not None:
+        run.profiler.enable()
+    return run
+
+def finish_run(run: Optional[RunStats], view: str) -> Optional[Dict[str, Any]]:
+    """Stop recording and return the run's summary, logging it when FARM_PERF_LOG is set"""
+    if run is None:
+        return None
+    _current_run.set(None)
+    total = time.perf_counter() - run.started
+
+    if run.profiler is not None:
+        run.profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(run.profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        st.session_state['perf_profile'] = {
+            'view': view, 'at': datetime.now().isoformat(timespec='seconds'), 'report': output.getvalue()
+        }
+
+    summary = {
+        'at': datetime.now().isoformat(timespec='seconds'),
+        'farm': get_active_farm(),
+        'view': view,
+        'total': total,
+        'sections': run.sections,
+        'io': [{'operation': operation, 'data_type': data_type, **totals}
+               for (operation, data_type), totals in run.io.items()]
+    }
+    log_path = os.environ.get(PERF_LOG_ENV)
+    if log_path:
+        try:
+            with open(log_path, 'a') as f:
+                f.write(json.dumps(summary) + '\n')
+        except OSError as e:
+            print(f"Error writing performance log: {str(e)}")
+    return summary
+
+def show_performance_panel(summary: Optional[Dict[str, Any]]):
+    """Sidebar panel with this rerun's section timings, data I/O and on-demand profiles"""
+    if 'perf_enabled' not in st.session_state:
+        st.session_state.perf_enabled = os.environ.get(PERF_ENV) == '1'
+
+    with st.expander("📈 Performance"):
+        st.checkbox("Record timings", key="perf_enabled", help="Time each view and section on every rerun")
+
+        if summary:
+            st.write(f"**This rerun:** {summary['total'] * 1000:.0f} ms")
+            if summary['sections']:
+                st.dataframe([{
+                    'Section': '· ' * entry['depth'] + entry['section'],
+                    'ms': round(entry['seconds'] * 1000, 1)
+                } for entry in summary['sections']], hide_index=True, use_container_width=True)
+            if summary['io']:
+                st.dataframe([{
+                    'I/O': f"{entry['operation']} {entry['data_type']}", 'Calls': entry['calls'],
+                    'KB': round(entry['bytes'] / 1024, 1), 'ms': round(entry['seconds'] * 1000, 1)
+                } for entry in summary['io']], hide_index=True, use_container_width=True)
+            else:
+                st.caption("No data files read or written.")
+
+        if st.button("🔬 Profile Next Rerun", key="perf_profile_button", use_container_width=True):
+            st.session_state.perf_profile_next = True
+            st.rerun()
+
+        profile = st.session_state.get('perf_profile')
+        if profile:
+            st.caption(f"Profile of {profile['view'].replace('_', ' ').title()} at {profile['at']}")
+            st.code(profile['report'], language=None)
+            st.download_button("Download Profile", profile['report'], file_name="profile.txt",
+                               key="perf_profile_download")
@@ -0,0 +1,31 @@
+import streamlit as st
+from typing import Callable, Dict, List, Tuple
+from utils.farms import load_farm_dataset
+from utils.instrumentation import timed
+
+@timed
+def ensure_session_data(data_types: List[str]):
+    """Point session state at the active farm's current datasets.
+
+    Datasets load on first use; afterwards this only picks up the list that
+    replaced the session's copy when another session wrote.
+    """
+    for data_type in data_types:
+        st.session_state[data_type] = load_farm_dataset(data_type)
+
+def show_active_view(app_key: str, views: Dict[str, Tuple[Callable[[], None], List[str]]]):
+    """Render a view selector and run only the selected view.
+
+    Unlike st.tabs, which executes every tab body on each rerun, only the
+    selected view's function runs and only the datasets it lists are loaded.
+    """
+    selected_view = st.radio(
+        "View", list(views.keys()),
+        horizontal=True,
+        key=f"{app_key}_view",
+        label_visibility="collapsed"
+    )
+
+    render_view, data_types = views[selected_view]
+    ensure_session_data(data_types)
+    render_view()
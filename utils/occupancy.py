@@ -0,0 +1,284 @@
+import bisect
+import streamlit as st
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from utils.common import parse_iso_date
+from utils.session_index import get_session_index, update_session_index
+
+# In-place inserts can unbalance the interval tree; it is rebuilt once the
+# changes since the last build outnumber its windows (and this minimum)
+REBUILD_MIN_CHANGES = 32
+
+def _start(interval: Tuple[date, date, Any]) -> date:
+    return interval[0]
+
+def _end(interval: Tuple[date, date, Any]) -> date:
+    return interval[1]
+
+class _IntervalNode:
+    """Centered interval tree node over (start, end, plan_id) windows.
+
+    Windows containing the center stay in the node, sorted by start and by
+    end; windows wholly before or after it go to the left or right subtree.
+    """
+
+    def __init__(self, intervals: List[Tuple[date, date, Any]]):
+        # A median start always lies inside its own window, so every node keeps at least one
+        starts = sorted(start for start, _, _ in intervals)
+        self.center = starts[len(starts) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            side = self._side(interval)
+            (left if side == 'left' else right if side == 'right' else here).append(interval)
+        self.by_start = sorted(here, key=_start)
+        self.by_end = sorted(here, key=_end)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+    def _side(self, interval: Tuple[date, date, Any]) -> Optional[str]:
+        if interval[1] <= self.center:
+            return 'left'
+        if interval[0] > self.center:
+            return 'right'
+        return None
+
+    def insert(self, interval: Tuple[date, date, Any]):
+        node = self
+        while True:
+            side = node._side(interval)
+            if side is None:
+                bisect.insort(node.by_start, interval, key=_start)
+                bisect.insort(node.by_end, interval, key=_end)
+                return
+            child = getattr(node, side)
+            if child is None:
+                setattr(node, side, _IntervalNode([interval]))
+                return
+            node = child
+
+    def delete(self, interval: Tuple[date, date, Any]):
+        # Emptied nodes stay in place until the next rebuild
+        node = self
+        while node:
+            side = node._side(interval)
+            if side is None:
+                node.by_start.remove(interval)
+                node.by_end.remove(interval)
+                return
+            node = getattr(node, side)
+
+    def stab(self, day: date, found: List[Any]):
+        node = self
+        while node:
+            if day < node.center:
+                for start, end, plan_id in node.by_start:
+                    if start > day:
+                        break
+                    found.append(plan_id)
+                node = node.left
+            else:
+                for start, end, plan_id in reversed(node.by_end):
+                    if end <= day:
+                        break
+                    found.append(plan_id)
+                node = node.right
+
+    def overlap(self, start: date, end: date, found: List[Any]):
+        """Ids of windows overlapping [start, end)"""
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            if end <= node.center:
+                # Windows here run past the center, so only their start can miss the range
+                for s, _, plan_id in node.by_start:
+                    if s >= end:
+                        break
+                    found.append(plan_id)
+                if node.left:
+                    pending.append(node.left)
+            elif start > node.center:
+                for _, e, plan_id in reversed(node.by_end):
+                    if e <= start:
+                        break
+                    found.append(plan_id)
+                if node.right:
+                    pending.append(node.right)
+            else:
+                # The range contains the center, which every window here contains too
+                found.extend(plan_id for _, _, plan_id in node.by_start)
+                pending.extend(child for child in (node.left, node.right) if child)
+
+class FieldTimeline:
+    """Crop plans on one field as half-open [plant_date, harvest_date) windows.
+
+    A centered interval tree answers "what is planted on this date" and
+    "which plans overlap this window" in O(log n) plus the size of the
+    answer. Adding or removing a plan updates the tree in place in O(log n)
+    plus the size of the node it lands in; a full rebuild (O(n log n)) runs
+    only after as many changes as the tree has windows, so its amortized
+    cost per change is O(log n). Peak area over a window sweeps just the
+    windows overlapping it.
+    """
+
+    def __init__(self):
+        self.windows: Dict[Any, Tuple[date, date, float]] = {}
+        self._tree: Optional[_IntervalNode] = None
+        self._changes = 0
+
+    def add(self, plan_id: Any, start: date, end: date, area: float):
+        self.remove(plan_id)
+        self.windows[plan_id] = (start, end, area)
+        if self._tree is None:
+            self._tree = _IntervalNode([(start, end, plan_id)])
+        else:
+            self._tree.insert((start, end, plan_id))
+        self._changed()
+
+    def remove(self, plan_id: Any):
+        window = self.windows.pop(plan_id, None)
+        if window is not None:
+            self._tree.delete((window[0], window[1], plan_id))
+            self._changed()
+
+    def _changed(self):
+        self._changes += 1
+        if self._changes > max(len(self.windows), REBUILD_MIN_CHANGES):
+            intervals = [(start, end, plan_id) for plan_id, (start, end, _) in self.windows.items()]
+            self._tree = _IntervalNode(intervals) if intervals else None
+            self._changes = 0
+
+    def plans_on(self, day: date) -> List[Any]:
+        """Ids of plans occupying the field on a day"""
+        found = []
+        if self._tree:
+            self._tree.stab(day, found)
+        return found
+
+    def overlapping(self, start: date, end: date) -> List[Any]:
+        """Ids of plans occupying the field at any time within [start, end)"""
+        found = []
+        if self._tree and start < end:
+            self._tree.overlap(start, end, found)
+        return found
+
+    def peak_area(self, start: date, end: date) -> float:
+        """Largest planted area at any time within [start, end)"""
+        deltas = []
+        for plan_id in self.overlapping(start, end):
+            s, e, area = self.windows[plan_id]
+            deltas += [(max(s, start), area), (min(e, end), -area)]
+        # Windows are half-open, so one ending on a day is gone before another starts on it
+        deltas.sort()
+        peak = running = 0.0
+        for _, delta in deltas:
+            running += delta
+            peak = max(peak, running)
+        return peak
+
+    def over_allocations(self, capacity: float) -> List[Tuple[date, date, float]]:
+        """(start, end, peak planted area) for each continuous period above capacity.
+
+        Sweeps every window of the field, O(n log n); used for the conflict report.
+        """
+        deltas: Dict[date, float] = {}
+        for start, end, area in self.windows.values():
+            deltas[start] = deltas.get(start, 0.0) + area
+            deltas[end] = deltas.get(end, 0.0) - area
+        points = sorted(deltas)
+        segments, level = [], 0.0
+        for i, point in enumerate(points[:-1]):
+            level += deltas[point]
+            if level > capacity + 1e-9:
+                if segments and segments[-1][1] == point:
+                    segments[-1] = (segments[-1][0], points[i + 1], max(segments[-1][2], level))
+                else:
+                    segments.append((point, points[i + 1], level))
+        return segments
+
+class OccupancyIndex:
+    """Per-field timelines of crop plans, weighted by area_planned"""
+
+    def __init__(self, farm_plans: List[Dict[str, Any]] = None):
+        self.timelines: Dict[str, FieldTimeline] = {}
+        self.plans: Dict[Any, Dict[str, Any]] = {}
+        self.count = 0
+        for plan in farm_plans or []:
+            self.add_plan(plan)
+
+    def add_plan(self, plan: Dict[str, Any]):
+        if plan['id'] in self.plans:
+            self.remove_plan(plan['id'])
+        self.count += 1
+        self.plans[plan['id']] = plan
+        start, end = parse_iso_date(plan.get('plant_date')), parse_iso_date(plan.get('harvest_date'))
+        if start and end and end > start:
+            self.timelines.setdefault(plan['field'], FieldTimeline()).add(
+                plan['id'], start, end, float(plan.get('area_planned') or 0))
+
+    def remove_plan(self, plan_id: Any):
+        plan = self.plans.pop(plan_id, None)
+        if plan is None:
+            return
+        self.count -= 1
+        if plan['field'] in self.timelines:
+            self.timelines[plan['field']].remove(plan_id)
+
+    def plans_on(self, field: str, day: date) -> List[Dict[str, Any]]:
+        """Crop plans occupying a field on a day"""
+        timeline = self.timelines.get(field)
+        return [self.plans[plan_id] for plan_id in timeline.plans_on(day)] if timeline else []
+
+    def peak_area(self, field: str, start: date, end: date) -> float:
+        timeline = self.timelines.get(field)
+        return timeline.peak_area(start, end) if timeline else 0.0
+
+    def check_plan(self, plan: Dict[str, Any], field_size: float) -> Dict[str, Any]:
+        """Overlapping plans and peak planted area if plan were added to its field"""
+        start, end = parse_iso_date(plan.get('plant_date')), parse_iso_date(plan.get('harvest_date'))
+        if not (start and end and end > start):
+            return {'overlapping': [], 'peak_area': 0.0, 'over_allocated': False}
+
+        timeline = self.timelines.get(plan['field'])
+        overlapping = []
+        if timeline:
+            overlapping = [self.plans[plan_id] for plan_id in timeline.overlapping(start, end)
+                           if plan_id != plan.get('id')]
+        peak = self.peak_area(plan['field'], start, end) + float(plan.get('area_planned') or 0)
+        return {'overlapping': overlapping, 'peak_area': peak, 'over_allocated': peak > field_size + 1e-9}
+
+    def over_allocated_fields(self, fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Every window in which a field has more acres planted than it holds"""
+        conflicts = []
+        for field in fields:
+            timeline = self.timelines.get(field['name'])
+            if not timeline:
+                continue
+            for start, end, area in timeline.over_allocations(float(field['size'])):
+                conflicts.append({
+                    'field': field['name'], 'from': start.isoformat(), 'until': end.isoformat(),
+                    'planted_area': area, 'field_size': field['size'],
+                    'plans': ', '.join(p['name'] for p in self.plans_on(field['name'], start))
+                })
+        return conflicts
+
+def get_occupancy_index() -> OccupancyIndex:
+    """Occupancy index for the session's farm plans, rebuilt when the plans changed"""
+    return get_session_index('farm_plans', '_occupancy_index', OccupancyIndex)
+
+def _update_plans(index: OccupancyIndex, removed: List[Dict[str, Any]], added: List[Dict[str, Any]]):
+    for record in removed:
+        index.remove_plan(record['id'])
+    for record in added:
+        index.add_plan(record)
+
+def record_inserted(data_type: str, record: Dict[str, Any]):
+    if data_type == 'farm_plans':
+        update_session_index(data_type, '_occupancy_index', lambda index: _update_plans(index, [], [record]))
+
+def record_updated(data_type: str, old_record: Dict[str, Any], new_record: Dict[str, Any]):
+    if data_type == 'farm_plans':
+        update_session_index(data_type, '_occupancy_index', lambda index: _update_plans(index, [old_record], [new_record]))
+
+def records_deleted(data_type: str, records: List[Dict[str, Any]]):
+    if data_type == 'farm_plans':
+        update_session_index(data_type, '_occupancy_index', lambda index: _update_plans(index, records, []))
@@ -0,0 +1,80 @@
+import math
+import streamlit as st
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from utils.categorical import is_encoded, filter_by_codes
+
+DEFAULT_PAGE_SIZES = [10, 25, 50, 100]
+
+def filter_records(records: Sequence[Dict], filters: Dict[str, Any] = None,
+                   search: str = "", search_fields: Sequence[str] = (),
+                   data_type: Optional[str] = None) -> List[Dict]:
+    """Filter records by exact field values and a case-insensitive text search.
+
+    With data_type, filters on its categorical columns compare integer codes
+    (utils.categorical) before the remaining filters run record by record.
+    """
+    active_filters = {field: value for field, value in (filters or {}).items() if value not in (None, "All")}
+    needle = search.strip().lower()
+
+    coded = {field: value for field, value in active_filters.items() if data_type and is_encoded(data_type, field)}
+    if coded:
+        records = filter_by_codes(data_type, records, coded)
+        active_filters = {field: value for field, value in active_filters.items() if field not in coded}
+
+    filtered = []
+    for record in records:
+        if any(record.get(field) != value for field, value in active_filters.items()):
+            continue
+        if needle and not any(needle in str(record.get(field, "")).lower() for field in search_fields):
+            continue
+        filtered.append(record)
+
+    return filtered
+
+def paginate(records: Sequence[Dict], page: int, page_size: int) -> Tuple[List[Dict], int]:
+    """Return the records on a 1-based page together with the total page count"""
+    total_pages = max(1, math.ceil(len(records) / page_size))
+    page = min(max(1, page), total_pages)
+    start = (page - 1) * page_size
+    return list(records[start:start + page_size]), total_pages
+
+def show_paginated_list(records: Sequence[Dict], key: str, filter_options: Dict[str, List[str]] = None,
+                        search_fields: Sequence[str] = (), page_sizes: List[int] = None,
+                        data_type: Optional[str] = None) -> List[Dict]:
+    """Render search, filter and paging controls and return only the records on the current page"""
+    filter_options = filter_options or {}
+    page_sizes = page_sizes or DEFAULT_PAGE_SIZES
+
+    control_cols = st.columns(len(filter_options) + 2)
+
+    with control_cols[0]:
+        search = st.text_input("Search", key=f"{key}_search") if search_fields else ""
+
+    filters = {}
+    for col, (field, options) in zip(control_cols[1:], filter_options.items()):
+        with col:
+            filters[field] = st.selectbox(field.replace('_', ' ').title(), ["All"] + list(options),
+                                          key=f"{key}_filter_{field}")
+
+    with control_cols[-1]:
+        page_size = st.selectbox("Per Page", page_sizes, key=f"{key}_page_size")
+
+    filtered = filter_records(records, filters, search, search_fields, data_type)
+    total_pages = max(1, math.ceil(len(filtered) / page_size))
+
+    # Clamp a stale page number before the widget is created (filters may have shrunk the list)
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+
+    page = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key=page_key)
+    page_records, _ = paginate(filtered, int(page), page_size)
+
+    if filtered:
+        start = (int(page) - 1) * page_size + 1
+        st.caption(f"Showing {start}-{start + len(page_records) - 1} of {len(filtered)} "
+                   f"(page {int(page)} of {total_pages})")
+    else:
+        st.caption("No records match the current filters.")
+
+    return page_records
@@ -0,0 +1,167 @@
+import math
+import bisect
+import streamlit as st
+from typing import Any, Dict, List, Optional
+from utils.session_index import get_session_index, update_session_index
+
+DEFAULT_WINDOW = 5
+
+class PriceSeries:
+    """Prices for one crop kept sorted by price_date with incrementally maintained statistics.
+
+    Appending a price dated on or after the latest one updates the running
+    min/max/mean, the moving-average window and the volatility of
+    period-over-period returns in O(1). An out-of-order insert re-sorts into
+    place and recomputes this crop's statistics.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.dates: List[str] = []
+        self.records: List[Dict[str, Any]] = []
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.total = 0.0
+        self.min_price = math.inf
+        self.max_price = -math.inf
+        self.window_sum = 0.0
+        # Welford accumulators over period-over-period returns
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+
+    def _accumulate(self, index: int):
+        """Fold the price at index (the newest so far) into the running statistics"""
+        price = float(self.records[index]['price'])
+        self.total += price
+        self.min_price = min(self.min_price, price)
+        self.max_price = max(self.max_price, price)
+
+        self.window_sum += price
+        if index >= self.window:
+            self.window_sum -= float(self.records[index - self.window]['price'])
+
+        if index > 0:
+            previous = float(self.records[index - 1]['price'])
+            if previous > 0:
+                change = price / previous - 1
+                self.return_count += 1
+                delta = change - self.return_mean
+                self.return_mean += delta / self.return_count
+                self.return_m2 += delta * (change - self.return_mean)
+
+    def add(self, record: Dict[str, Any]):
+        """Insert a price record, keeping the series sorted by date"""
+        price_date = record['price_date']
+        if not self.dates or price_date >= self.dates[-1]:
+            self.dates.append(price_date)
+            self.records.append(record)
+            self._accumulate(len(self.records) - 1)
+            return
+
+        position = bisect.bisect_right(self.dates, price_date)
+        self.dates.insert(position, price_date)
+        self.records.insert(position, record)
+        self._reset_stats()
+        for index in range(len(self.records)):
+            self._accumulate(index)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self.records[-1] if self.records else None
+
+    @property
+    def previous(self) -> Optional[Dict[str, Any]]:
+        return self.records[-2] if len(self.records) > 1 else None
+
+    @property
+    def average(self) -> float:
+        return self.total / len(self.records) if self.records else 0.0
+
+    @property
+    def moving_average(self) -> float:
+        return self.window_sum / min(self.window, len(self.records)) if self.records else 0.0
+
+    @property
+    def volatility(self) -> float:
+        """Standard deviation of period-over-period returns, in percent"""
+        if self.return_count < 2:
+            return 0.0
+        return math.sqrt(self.return_m2 / (self.return_count - 1)) * 100
+
+    @property
+    def change(self) -> float:
+        if self.previous is None:
+            return 0.0
+        return float(self.latest['price']) - float(self.previous['price'])
+
+    @property
+    def change_percent(self) -> float:
+        if self.previous is None or float(self.previous['price']) <= 0:
+            return 0.0
+        return self.change / float(self.previous['price']) * 100
+
+    def summary(self) -> Dict[str, Any]:
+        """Dated prices and statistics of the series as plain values, e.g. for report snapshots"""
+        return {
+            'prices': [[record['price_date'], float(record['price'])] for record in self.records],
+            'latest_price': float(self.latest['price']) if self.records else 0.0,
+            'max_price': self.max_price if self.records else 0.0,
+            'min_price': self.min_price if self.records else 0.0,
+            'average': self.average,
+            'window': self.window,
+            'moving_average': self.moving_average,
+            'volatility': self.volatility,
+            'has_previous': self.previous is not None,
+            'change': self.change,
+            'change_percent': self.change_percent
+        }
+
+class PriceStore:
+    """Per-crop price series built from the crop_prices dataset"""
+
+    def __init__(self, crop_prices: List[Dict[str, Any]] = None, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.series: Dict[str, PriceSeries] = {}
+        self.count = 0
+        for record in sorted(crop_prices or [], key=lambda p: p['price_date']):
+            self.add(record)
+
+    def add(self, record: Dict[str, Any]):
+        crop = record['crop']
+        if crop not in self.series:
+            self.series[crop] = PriceSeries(self.window)
+        self.series[crop].add(record)
+        self.count += 1
+
+    def crops(self) -> List[str]:
+        return sorted(self.series)
+
+    def get(self, crop: str) -> Optional[PriceSeries]:
+        return self.series.get(crop)
+
+    def latest_prices(self) -> Dict[str, Dict[str, Any]]:
+        """Latest price record for every crop"""
+        return {crop: series.latest for crop, series in self.series.items()}
+
+def get_price_store() -> PriceStore:
+    """Price store for the session's crop_prices, rebuilt when the prices changed"""
+    return get_session_index('crop_prices', '_price_store', PriceStore)
+
+def record_inserted(data_type: str, record: Dict[str, Any]):
+    """Add a newly written crop price to the session's price store"""
+    if data_type == 'crop_prices':
+        update_session_index(data_type, '_price_store', lambda store: store.add(record))
+
+def record_updated(data_type: str, old_record: Dict[str, Any], new_record: Dict[str, Any]):
+    if data_type == 'crop_prices':
+        # Edits can move a record between crops or dates; rebuild on next access
+        st.session_state.pop('_price_store', None)
+
+def records_deleted(data_type: str, records: List[Dict[str, Any]]):
+    if data_type == 'crop_prices':
+        st.session_state.pop('_price_store', None)
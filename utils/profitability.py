@@ -0,0 +1,61 @@
+import pandas as pd
+from typing import Any, Dict, List, Tuple
+
+PROFITABILITY_COLUMNS = [
+    'plan_name', 'crop', 'area', 'planning_year', 'cost_year', 'revenue_per_acre',
+    'cost_per_acre', 'profit_per_acre', 'profit_margin', 'total_profit'
+]
+
+def build_cost_index(profit_analysis: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Index the most recent cost analysis per (crop, year) and per crop.
+
+    Each cost analysis is visited once; the latest record by created_date wins.
+    """
+    costs = pd.DataFrame(profit_analysis, columns=['crop', 'year', 'cost_per_acre', 'created_date'])
+    costs = costs.sort_values('created_date', kind='stable')
+
+    latest_by_year = costs.drop_duplicates(['crop', 'year'], keep='last')
+    latest_by_crop = costs.drop_duplicates('crop', keep='last')
+    return latest_by_year, latest_by_crop
+
+def compute_profitability(revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]],
+                          match_year: bool = False) -> pd.DataFrame:
+    """Join revenue plans to their latest cost analysis and compute per-acre profitability.
+
+    Plans are hash-joined to the cost index in one pass. With match_year, a plan
+    only matches costs recorded for its planning year; otherwise it uses the
+    crop's most recent cost analysis from any year. Plans without a matching
+    cost analysis are left out. Rows are sorted by profit per acre, best first.
+    """
+    if not revenue_plans or not profit_analysis:
+        return pd.DataFrame(columns=PROFITABILITY_COLUMNS)
+
+    plans = pd.DataFrame(revenue_plans, columns=[
+        'name', 'crop_type', 'planned_area', 'total_expected_revenue', 'planning_year'
+    ])
+    latest_by_year, latest_by_crop = build_cost_index(profit_analysis)
+
+    if match_year:
+        joined = plans.merge(latest_by_year, how='inner',
+                             left_on=['crop_type', 'planning_year'], right_on=['crop', 'year'])
+    else:
+        joined = plans.merge(latest_by_crop, how='inner', left_on='crop_type', right_on='crop')
+
+    area = joined['planned_area'].astype(float)
+    revenue_per_acre = (joined['total_expected_revenue'] / area.where(area > 0)).fillna(0.0)
+    cost_per_acre = joined['cost_per_acre'].astype(float)
+    profit_per_acre = revenue_per_acre - cost_per_acre
+
+    result = pd.DataFrame({
+        'plan_name': joined['name'],
+        'crop': joined['crop_type'],
+        'area': area,
+        'planning_year': joined['planning_year'],
+        'cost_year': joined['year'],
+        'revenue_per_acre': revenue_per_acre,
+        'cost_per_acre': cost_per_acre,
+        'profit_per_acre': profit_per_acre,
+        'profit_margin': (profit_per_acre / revenue_per_acre.where(revenue_per_acre > 0) * 100).fillna(0.0),
+        'total_profit': profit_per_acre * area
+    })
+    return result.sort_values('profit_per_acre', ascending=False, kind='stable').reset_index(drop=True)
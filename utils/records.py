@@ -0,0 +1,68 @@
+import streamlit as st
+from typing import Any, Callable, Dict, List
+from utils.compact import compact_record
+from utils.farms import get_farm_store
+from utils import counters, price_series, calendar_index, occupancy, task_scheduler, rollups
+
+# Modules keeping derived data (aggregates, indexes) in sync with each write.
+# Each exposes record_inserted, record_updated and records_deleted and ignores
+# data types it does not track.
+MAINTAINERS = [counters, price_series, calendar_index, occupancy, task_scheduler, rollups]
+
+# Datasets are shared by every session on a farm (utils.farms.FarmStore), so
+# writes start from the store's latest list, never change it in place, and
+# run under the store's lock so concurrent sessions don't lose each other's
+# records. A write the store refuses or fails to save leaves the session and
+# derived data untouched.
+
+def add_record(data_type: str, record: Dict[str, Any]) -> bool:
+    """Append a record to the farm's dataset, persist it and update derived data"""
+    record = compact_record(data_type, record)
+    store = get_farm_store()
+    with store.lock:
+        records = store.dataset(data_type) + [record]
+        if not store.replace(data_type, records):
+            return False
+        st.session_state[data_type] = records
+        for maintainer in MAINTAINERS:
+            maintainer.record_inserted(data_type, record)
+    return True
+
+def update_record(data_type: str, record: Dict[str, Any], changes: Dict[str, Any]) -> bool:
+    """Replace a record of the farm's dataset with a changed copy, persist it and update derived data"""
+    store = get_farm_store()
+    with store.lock:
+        current = store.dataset(data_type)
+        position = next((i for i, r in enumerate(current) if r is record), None)
+        if position is None:
+            # The dataset was reloaded since the record was read; find it by id
+            position = next((i for i, r in enumerate(current) if r.get('id') == record.get('id')), None)
+        if position is None:
+            # Deleted by another session in the meantime
+            return False
+        old_record = current[position]
+        # Built from the stored row, so fields another session changed since it was read are kept
+        new_record = compact_record(data_type, {**old_record, **changes})
+        records = current[:position] + [new_record] + current[position + 1:]
+        if not store.replace(data_type, records):
+            return False
+        st.session_state[data_type] = records
+        for maintainer in MAINTAINERS:
+            maintainer.record_updated(data_type, old_record, new_record)
+    return True
+
+def remove_records(data_type: str, predicate: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+    """Remove all records matching predicate from the farm's dataset and return them"""
+    store = get_farm_store()
+    with store.lock:
+        kept, removed = [], []
+        for record in store.dataset(data_type):
+            (removed if predicate(record) else kept).append(record)
+
+        if removed:
+            if not store.replace(data_type, kept):
+                return []
+            st.session_state[data_type] = kept
+            for maintainer in MAINTAINERS:
+                maintainer.records_deleted(data_type, removed)
+    return removed
@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from utils.database import get_active_farm, set_active_farm, reset_active_farm, get_data_version, load_data
+
+# Set FARM_REPORT_WORKERS=<n> to size the worker pool; 0 computes reports on the script thread
+REPORT_WORKERS_ENV = "FARM_REPORT_WORKERS"
+MAX_REPORT_WORKERS = 4
+RESULT_CACHE_SIZE = 128
+WORKER_DATASETS = 16
+POLL_SECONDS = 0.5
+
+class ReportTask(NamedTuple):
+    """One part of a background report: fn(*datasets, *args) over datasets of the active farm.
+
+    fn must be a module-level function so it can be sent to a worker process.
+    """
+    fn: Callable[..., Any]
+    inputs: Tuple[str, ...]
+    args: Tuple[Any, ...] = ()
+
+# Datasets read by this worker process: (farm, data type) -> (version, records)
+_worker_datasets: Dict[Tuple[str, str], Tuple[Any, List[Dict[str, Any]]]] = {}
+
+def _run_task(farm_id: str, task: ReportTask, versions: Dict[str, Any]) -> Any:
+    """Compute one task in a worker process.
+
+    The active farm is a context variable of the submitting script thread and
+    does not cross into the worker, so it is passed in and set for the task.
+    """
+    token = set_active_farm(farm_id)
+    try:
+        datasets = []
+        for data_type in task.inputs:
+            cached = _worker_datasets.get((farm_id, data_type))
+            if cached is None or cached[0] != versions[data_type]:
+                if len(_worker_datasets) >= WORKER_DATASETS:
+                    _worker_datasets.clear()
+                cached = (versions[data_type], load_data(data_type, []))
+                _worker_datasets[(farm_id, data_type)] = cached
+            datasets.append(cached[1])
+        return task.fn(*datasets, *task.args)
+    finally:
+        reset_active_farm(token)
+
+def _mp_context():
+    # Forking the server would copy its threads' locks; fork from a clean server process instead
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+_MISSING = object()
+
+class ReportPool:
+    """Worker processes for heavy reports and the results of their tasks by input version"""
+
+    def __init__(self, workers: int, cache_size: int = RESULT_CACHE_SIZE):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.results: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def cached(self, key: Tuple) -> Any:
+        with self.lock:
+            if key not in self.results:
+                return _MISSING
+            self.results.move_to_end(key)
+            return self.results[key]
+
+    def store(self, key: Tuple, result: Any):
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+
+    def submit(self, key: Tuple, farm_id: str, task: ReportTask, versions: Dict[str, Any]) -> Future:
+        """Start a task; its result is cached when it finishes, even if nobody waits for it any more"""
+        if self.workers == 0:
+            future = Future()
+            try:
+                future.set_result(_run_task(farm_id, task, versions))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            try:
+                future = self._executor().submit(_run_task, farm_id, task, versions)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start over with a fresh pool
+                self._reset()
+                future = self._executor().submit(_run_task, farm_id, task, versions)
+
+        def store_result(done: Future):
+            if not done.cancelled() and done.exception() is None:
+                self.store(key, done.result())
+
+        future.add_done_callback(store_result)
+        return future
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a module-level function in a worker (inline without workers) and wait for its result"""
+        if self.workers == 0:
+            return fn(*args)
+        try:
+            future = self._executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset()
+            future = self._executor().submit(fn, *args)
+        return future.result()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(self.workers, mp_context=_mp_context())
+            return self.executor
+
+    def _reset(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+@st.cache_resource
+def get_report_pool() -> ReportPool:
+    workers = os.environ.get(REPORT_WORKERS_ENV)
+    return ReportPool(int(workers) if workers else min(MAX_REPORT_WORKERS, os.cpu_count() or 1))
+
+def _input_version(data_type: str) -> Tuple[int, int]:
+    return (get_data_version(data_type), len(st.session_state.get(data_type, [])))
+
+def _task_key(farm_id: str, task: ReportTask) -> Tuple:
+    versions = tuple((data_type, _input_version(data_type)) for data_type in task.inputs)
+    return (farm_id, task.fn.__module__, task.fn.__qualname__, task.args, versions)
+
+def report_results(name: str, tasks: List[ReportTask], label: str) -> Optional[List[Any]]:
+    """Results of a report's tasks, computing the ones not cached for the current data in the worker pool.
+
+    Returns None while tasks are still running, after rendering a progress
+    bar that reruns the page when they are done.
+    """
+    pool = get_report_pool()
+    farm_id = get_active_farm()
+    keys = [_task_key(farm_id, task) for task in tasks]
+    jobs = st.session_state.setdefault('_report_jobs', {})
+
+    job = jobs.get(name)
+    if job is not None and job['keys'] != keys:
+        # The data changed since the job started; its results would be stale
+        cancel_report(name)
+        job = None
+
+    results = [pool.cached(key) for key in keys]
+    if all(result is not _MISSING for result in results):
+        jobs.pop(name, None)
+        return results
+
+    if job is None:
+        job = jobs[name] = {'label': label, 'keys': keys, 'futures': {}, 'cancelled': False}
+    job['requested'] = True
+
+    if job['cancelled']:
+        st.info(f"{label} was cancelled.")
+        if st.button("Run Again", key=f"report_rerun_{name}"):
+            del jobs[name]
+            st.rerun()
+        return None
+
+    for key, task, result in zip(keys, tasks, results):
+        if result is not _MISSING:
+            continue
+        future = job['futures'].get(key)
+        if future is not None and future.done() and future.exception() is not None:
+            print(f"Error computing {label}: {str(future.exception())}")
+            st.error(f"❌ Error computing {label}: {future.exception()}")
+            del jobs[name]
+            return None
+        if future is None or future.done():
+            # Not started yet, or finished but already evicted from the result cache
+            job['futures'][key] = pool.submit(key, farm_id, task, {
+                data_type: _input_version(data_type) for data_type in task.inputs
+            })
+
+    # Tasks computed on the script thread are done already
+    results = [pool.cached(key) for key in keys]
+    if all(result is not _MISSING for result in results):
+        del jobs[name]
+        return results
+
+    _show_report_progress(name)
+    return None
+
+@st.fragment(run_every=POLL_SECONDS)
+def _show_report_progress(name: str):
+    """Progress of a running report, polled without rerunning the page until it is done"""
+    job = st.session_state.get('_report_jobs', {}).get(name)
+    if job is None or job['cancelled']:
+        return
+
+    futures = [job['futures'][key] for key in job['keys'] if key in job['futures']]
+    done = len(job['keys']) - len(futures) + sum(1 for future in futures if future.done())
+    if done == len(job['keys']):
+        st.rerun()
+
+    running = sum(1 for future in futures if future.running())
+    st.progress(done / len(job['keys']),
+                text=f"{job['label']}: {done} of {len(job['keys'])} parts done" + (f", {running} running" if running else ""))
+    if st.button("Cancel", key=f"report_cancel_{name}"):
+        cancel_report(name)
+        st.rerun()
+
+def cancel_report(name: str):
+    """Cancel a report's queued tasks; tasks already running finish and only fill the result cache"""
+    job = st.session_state.get('_report_jobs', {}).get(name)
+    if job is not None:
+        for future in job['futures'].values():
+            future.cancel()
+        job['cancelled'] = True
+
+def cancel_abandoned_reports():
+    """Cancel the reports this run's page no longer shows, i.e. the user navigated away from them"""
+    jobs = st.session_state.get('_report_jobs', {})
+    for name in list(jobs):
+        if not jobs[name].pop('requested', False):
+            cancel_report(name)
+            del jobs[name]
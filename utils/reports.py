@@ -0,0 +1,116 @@
+import heapq
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from utils.rollups import RollupCube
+from utils.schema import COST_CATEGORIES
+
+# Columns of the detail tables of the revenue summary and cost analysis reports
+REVENUE_SUMMARY_COLUMNS = [
+    'name', 'crop_type', 'planned_area', 'expected_yield_per_acre', 'expected_price', 'total_expected_revenue'
+]
+COST_REPORT_COLUMNS = ['crop', 'area', 'total_cost', 'cost_per_acre']
+
+# Report computations shared by the views and the benchmark suite; they take
+# plain record lists and never touch Streamlit. Totals are read from a rollup
+# cube (see utils.rollups): the views pass the session's cube maintained on
+# write, otherwise one is built from the records.
+
+def monthly_expenses(expenses: List[Dict[str, Any]], rollup: Optional[RollupCube] = None) -> pd.DataFrame:
+    """Expense totals per YYYY-MM month, oldest first"""
+    if rollup is None:
+        rollup = RollupCube('expenses', expenses)
+    totals = rollup.rollup(['year', 'month'])
+    return pd.DataFrame(sorted((f"{year}-{month:02d}", total['amount'])
+                               for (year, month), total in totals.items() if year is not None),
+                        columns=['Month', 'Amount'])
+
+def operations_by_type(operations: List[Dict[str, Any]], rollup: Optional[RollupCube] = None) -> pd.DataFrame:
+    """Number of operations of each type"""
+    if rollup is None:
+        rollup = RollupCube('operations', operations)
+    counts = rollup.rollup(['type'])
+    return pd.DataFrame([(op_type, int(total['count'])) for (op_type,), total in counts.items()],
+                        columns=['Operation Type', 'Count'])
+
+def expense_breakdown(rollup: RollupCube, year: int, month: int, dimension: str) -> pd.DataFrame:
+    """Drill-down of one month's expenses by category or vendor, largest first"""
+    totals = rollup.rollup([dimension], where={'year': year, 'month': month})
+    rows = sorted(((value, total['amount'], int(total['count'])) for (value,), total in totals.items()),
+                  key=lambda row: row[1], reverse=True)
+    return pd.DataFrame(rows, columns=[dimension.title(), 'Amount', 'Expenses'])
+
+def operation_breakdown(rollup: RollupCube, op_type: str) -> pd.DataFrame:
+    """Drill-down of one operation type by field with hours, workers and cost"""
+    totals = rollup.rollup(['field'], where={'type': op_type})
+    return pd.DataFrame([
+        (field, int(total['count']), total['hours'], int(total['workers']), total['cost'])
+        for (field,), total in sorted(totals.items(), key=lambda item: str(item[0][0]))
+    ], columns=['Field', 'Operations', 'Hours', 'Workers', 'Cost'])
+
+def recent_activity(operations: List[Dict[str, Any]], expenses: List[Dict[str, Any]],
+                    per_source: int = 3, limit: int = 10) -> List[Dict[str, Any]]:
+    """Latest operations and expenses, newest first"""
+    activities = [{
+        'date': op['date'], 'type': 'Operation', 'description': f"{op['type']} - {op['description']}"
+    } for op in heapq.nlargest(per_source, operations, key=lambda op: op['date'])]
+    activities += [{
+        'date': exp['date'], 'type': 'Expense', 'description': f"{exp['category']} - ${exp['amount']:.2f}"
+    } for exp in heapq.nlargest(per_source, expenses, key=lambda exp: exp['date'])]
+    activities.sort(key=lambda activity: activity['date'], reverse=True)
+    return activities[:limit]
+
+def revenue_summary(revenue_plans: List[Dict[str, Any]], year: int,
+                    rollup: Optional[RollupCube] = None) -> Dict[str, Any]:
+    """Total revenue and area of one planning year's revenue plans"""
+    if rollup is None:
+        rollup = RollupCube('revenue_plans', revenue_plans)
+    totals = rollup.rollup([], where={'year': year}).get((), {})
+    return {
+        'plans': [plan for plan in revenue_plans if plan['planning_year'] == year],
+        'total_revenue': totals.get('revenue', 0.0),
+        'total_area': totals.get('area', 0.0)
+    }
+
+def cost_report(profit_analysis: List[Dict[str, Any]], year: int,
+                rollup: Optional[RollupCube] = None) -> Dict[str, Any]:
+    """Totals, average cost per acre and cost by category for one year's cost analyses"""
+    if rollup is None:
+        rollup = RollupCube('profit_analysis', profit_analysis)
+    by_category = rollup.rollup(['category'], where={'year': year})
+    totals = by_category.get(('total_cost',), {})
+    total_cost, total_area = totals.get('cost', 0.0), totals.get('area', 0.0)
+    return {
+        'analyses': [analysis for analysis in profit_analysis if analysis['year'] == year],
+        'total_cost': total_cost,
+        'avg_cost_per_acre': total_cost / total_area if total_area > 0 else 0,
+        'category_totals': {
+            category.replace('_cost', '').title(): by_category.get((category,), {}).get('cost', 0.0)
+            for category in COST_CATEGORIES
+        }
+    }
+
+def cost_by_crop(rollup: RollupCube, year: int) -> pd.DataFrame:
+    """Drill-down of one year's costs: crops by cost category, with total and cost per acre"""
+    cells = rollup.rollup(['crop', 'category'], where={'year': year})
+    rows: Dict[Any, Dict[str, float]] = {}
+    for (crop, category), total in cells.items():
+        row = rows.setdefault(crop, {})
+        if category == 'total_cost':
+            row['Total'] = total['cost']
+            row['Cost per Acre'] = total['cost'] / total['area'] if total['area'] > 0 else 0.0
+        else:
+            row[category.replace('_cost', '').title()] = total['cost']
+    columns = [category.replace('_cost', '').title() for category in COST_CATEGORIES] + ['Total', 'Cost per Acre']
+    return pd.DataFrame.from_dict(rows, orient='index', columns=columns).sort_index()
+
+def profitability_totals(profitability: pd.DataFrame) -> Dict[str, float]:
+    """Farm-wide revenue, cost, profit and margin from compute_profitability rows"""
+    total_revenue = float((profitability['revenue_per_acre'] * profitability['area']).sum())
+    total_costs = float((profitability['cost_per_acre'] * profitability['area']).sum())
+    total_profit = float(profitability['total_profit'].sum())
+    return {
+        'total_revenue': total_revenue,
+        'total_costs': total_costs,
+        'total_profit': total_profit,
+        'margin': (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+    }
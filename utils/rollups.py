@@ -0,0 +1,215 @@
+import time
+import streamlit as st
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from utils.common import parse_iso_date
+from utils.database import save_metadata, load_metadata, get_data_version, data_file_fingerprint
+from utils.schema import COST_CATEGORIES
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _year_month(value: Any) -> Tuple[Any, Any]:
+    day = parse_iso_date(value)
+    return (day.year, day.month) if day else (None, None)
+
+def _expense_cells(record: Dict[str, Any]):
+    yield (*_year_month(record.get('date')), record.get('category'), record.get('vendor') or ''), (
+        _number(record.get('amount')),)
+
+def _operation_cells(record: Dict[str, Any]):
+    yield (*_year_month(record.get('date')), record.get('type'), record.get('field')), (
+        _number(record.get('hours')), _number(record.get('workers')), _number(record.get('cost')))
+
+def _cost_cells(record: Dict[str, Any]):
+    # One cell per cost category, plus the record's own total; each carries the analysed area
+    area = _number(record.get('area'))
+    for category in COST_CATEGORIES + ['total_cost']:
+        yield (record.get('year'), record.get('crop'), category), (_number(record.get(category)), area)
+
+def _revenue_cells(record: Dict[str, Any]):
+    yield (record.get('planning_year'), record.get('crop_type')), (
+        _number(record.get('total_expected_revenue')), _number(record.get('planned_area')))
+
+# Cube layout per data type: dimensions of a cell key, summed measures and the
+# cells a record contributes to. Every cell also counts its records.
+# A cube is rewritten to disk at most this often while records change; one a
+# few writes behind its dataset file is simply rebuilt by the next process
+ROLLUP_PERSIST_SECONDS = 30.0
+
+ROLLUP_SPECS: Dict[str, Dict[str, Any]] = {
+    'expenses': {
+        'dimensions': ['year', 'month', 'category', 'vendor'],
+        'measures': ['amount'],
+        'cells': _expense_cells
+    },
+    'operations': {
+        'dimensions': ['year', 'month', 'type', 'field'],
+        'measures': ['hours', 'workers', 'cost'],
+        'cells': _operation_cells
+    },
+    'profit_analysis': {
+        'dimensions': ['year', 'crop', 'category'],
+        'measures': ['cost', 'area'],
+        'cells': _cost_cells
+    },
+    'revenue_plans': {
+        'dimensions': ['year', 'crop'],
+        'measures': ['revenue', 'area'],
+        'cells': _revenue_cells
+    }
+}
+
+class RollupCube:
+    """Per-bucket totals of a dataset, updated record by record.
+
+    Reports aggregate the cells instead of the records, so they cost
+    O(buckets); filtering cells on some dimensions gives drill-down.
+    """
+
+    def __init__(self, data_type: str, records: Iterable[Dict[str, Any]] = ()):
+        spec = ROLLUP_SPECS[data_type]
+        self.data_type = data_type
+        self.dimensions: List[str] = spec['dimensions']
+        self.measures: List[str] = spec['measures']
+        self._cells_of: Callable = spec['cells']
+        self.count = 0
+        # cell key -> [record count, *measure totals]
+        self.cells: Dict[Tuple, List[float]] = {}
+        # Data version the cube reflects and when it was last written to disk
+        self.version: Optional[int] = None
+        self.persisted_at: Optional[float] = None
+        for record in records:
+            self.apply(record, 1)
+
+    def apply(self, record: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) one record's contribution"""
+        self.count += sign
+        for key, values in self._cells_of(record):
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = [0] + [0.0] * len(values)
+            cell[0] += sign
+            for i, value in enumerate(values, 1):
+                cell[i] += sign * value
+            if cell[0] <= 0:
+                del self.cells[key]
+
+    def rollup(self, by: Sequence[str], where: Dict[str, Any] = None) -> Dict[Tuple, Dict[str, float]]:
+        """Totals per combination of the `by` dimensions over the cells matching `where`"""
+        positions = [self.dimensions.index(name) for name in by]
+        filters = [(self.dimensions.index(name), value) for name, value in (where or {}).items()]
+        totals: Dict[Tuple, List[float]] = {}
+        for key, cell in self.cells.items():
+            if any(key[i] != value for i, value in filters):
+                continue
+            group = tuple(key[i] for i in positions)
+            total = totals.get(group)
+            if total is None:
+                totals[group] = list(cell)
+            else:
+                for i, value in enumerate(cell):
+                    total[i] += value
+        names = ['count'] + self.measures
+        return {group: dict(zip(names, total)) for group, total in totals.items()}
+
+    def values(self, dimension: str, where: Dict[str, Any] = None) -> List[Any]:
+        """Distinct values of a dimension, sorted, with missing values left out"""
+        return sorted(group[0] for group in self.rollup([dimension], where) if group[0] is not None)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'count': self.count, 'cells': [list(key) + cell for key, cell in self.cells.items()]}
+
+    @classmethod
+    def from_state(cls, data_type: str, state: Dict[str, Any]) -> 'RollupCube':
+        cube = cls(data_type)
+        width = len(cube.dimensions)
+        cube.count = state['count']
+        cube.cells = {tuple(row[:width]): row[width:] for row in state['cells']}
+        return cube
+
+def rollup_state(records: List[Dict[str, Any]], data_type: str) -> Dict[str, Any]:
+    """State of a cube built from scratch, for building cubes in report workers"""
+    return RollupCube(data_type, records).to_state()
+
+def _persist_rollup(data_type: str, cube: RollupCube):
+    # Stamped with the dataset file it matches, which tells a later process whether it is current
+    save_metadata(data_type, 'rollup', {**cube.to_state(), 'source': data_file_fingerprint(data_type)})
+    cube.persisted_at = time.monotonic()
+
+def stored_rollup(data_type: str) -> Optional[RollupCube]:
+    """The session's or persisted cube of a dataset, or None when it must be rebuilt.
+
+    The session's cube is current while it carries the dataset's data
+    version, which every save bumps (including other sessions' edits that
+    keep the record count); the persisted one while the dataset file is
+    unchanged since it was written.
+    """
+    session_key = f"_{data_type}_rollup"
+    records = st.session_state.get(data_type, [])
+    version = get_data_version(data_type)
+
+    cube = st.session_state.get(session_key)
+    if cube is None or cube.version != version:
+        cube = None
+        state = load_metadata(data_type, 'rollup')
+        if state is not None and state.get('source') == data_file_fingerprint(data_type):
+            try:
+                cube = RollupCube.from_state(data_type, state)
+            except (KeyError, TypeError, ValueError):
+                cube = None
+
+    if cube is None or cube.count != len(records):
+        return None
+    cube.version = version
+    st.session_state[session_key] = cube
+    return cube
+
+def install_rollup(data_type: str, cube: RollupCube) -> RollupCube:
+    """Make a cube of the current data the session's rollup of its dataset and persist it"""
+    cube.version = get_data_version(data_type)
+    st.session_state[f"_{data_type}_rollup"] = cube
+    _persist_rollup(data_type, cube)
+    return cube
+
+def get_rollup(data_type: str) -> RollupCube:
+    """Rollup cube for a dataset loaded in session state, rebuilt only when it is out of date"""
+    cube = stored_rollup(data_type)
+    if cube is None:
+        cube = install_rollup(data_type, RollupCube(data_type, st.session_state.get(data_type, [])))
+    return cube
+
+def _update_rollup(data_type: str, removed: List[Dict[str, Any]], added: List[Dict[str, Any]]):
+    session_key = f"_{data_type}_rollup"
+    if data_type not in ROLLUP_SPECS or session_key not in st.session_state:
+        # Not materialized yet; get_rollup will build it on first use
+        return
+
+    cube = st.session_state[session_key]
+    version = get_data_version(data_type)
+    if cube.version != version - 1:
+        # The save of this write bumped the version once; a cube that missed an
+        # earlier write (another session's) or a failed save is rebuilt instead
+        del st.session_state[session_key]
+        return
+    for record in removed:
+        cube.apply(record, -1)
+    for record in added:
+        cube.apply(record, 1)
+    cube.version = version
+    if cube.persisted_at is None or time.monotonic() - cube.persisted_at >= ROLLUP_PERSIST_SECONDS:
+        _persist_rollup(data_type, cube)
+
+def record_inserted(data_type: str, record: Dict[str, Any]):
+    """Add a new record to its dataset's rollup"""
+    _update_rollup(data_type, [], [record])
+
+def record_updated(data_type: str, old_record: Dict[str, Any], new_record: Dict[str, Any]):
+    """Move a changed record from its old buckets to its new ones"""
+    _update_rollup(data_type, [old_record], [new_record])
+
+def records_deleted(data_type: str, records: List[Dict[str, Any]]):
+    """Remove deleted records from their dataset's rollup"""
+    _update_rollup(data_type, records, [])
@@ -0,0 +1,83 @@
+from typing import Any, Dict
+
+# Choice lists shared by forms, imports and exports
+CROP_TYPES = [
+    "Corn", "Wheat", "Soybeans", "Rice", "Barley", "Oats", "Cotton",
+    "Potatoes", "Tomatoes", "Carrots", "Onions", "Lettuce", "Apples", "Strawberries"
+]
+PRICE_UNITS = ["bushels", "tons", "pounds", "boxes", "bags"]
+EXPENSE_CATEGORIES = [
+    "Seeds", "Fertilizers", "Pesticides", "Equipment", "Fuel",
+    "Labor", "Utilities", "Maintenance", "Insurance", "Other"
+]
+PAYMENT_METHODS = ["Cash", "Check", "Credit Card", "Bank Transfer"]
+OPERATION_TYPES = [
+    "Planting", "Harvesting", "Irrigation", "Fertilizing",
+    "Pest Control", "Soil Preparation", "Equipment Maintenance", "Other"
+]
+SOIL_TYPES = ["Clay", "Sandy", "Loam", "Silty", "Rocky"]
+PLAN_STATUSES = ["Planned", "Planted", "Growing", "Harvested"]
+REVENUE_PLAN_STATUSES = ["Planned", "In Progress", "Completed", "Cancelled"]
+TASK_PRIORITIES = ["High", "Medium", "Low"]
+TASK_STATUSES = ["Pending", "In Progress", "Completed"]
+EQUIPMENT_TYPES = [
+    "Tractor", "Harvester", "Planter", "Cultivator",
+    "Sprayer", "Irrigation System", "Hand Tools", "Other"
+]
+EQUIPMENT_CONDITIONS = ["Excellent", "Good", "Fair", "Poor"]
+# Cost columns of a crop cost analysis (profit_analysis)
+COST_CATEGORIES = [
+    'seed_cost', 'fertilizer_cost', 'pesticide_cost', 'fuel_cost', 'labor_cost', 'equipment_cost', 'other_cost'
+]
+
+# Record layout per data type:
+#   fields     - column order for tabular exports
+#   required   - text columns that must be non-empty
+#   numeric    - column -> (min, max, type); None means unbounded
+#   dates      - ISO date columns
+#   choices    - column -> allowed values (matched case-insensitively)
+#   defaults   - values for optional columns left empty
+#   date_field - column used for date-range filtering
+#   timestamp  - column stamped with the time the record was written
+DATASET_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    'expenses': {
+        'fields': ['id', 'date', 'category', 'description', 'amount', 'vendor', 'payment_method', 'recorded_date'],
+        'required': ['description'],
+        'numeric': {'amount': (0.01, None, float)},
+        'dates': ['date'],
+        'choices': {'category': EXPENSE_CATEGORIES, 'payment_method': PAYMENT_METHODS},
+        'defaults': {'vendor': '', 'payment_method': 'Cash'},
+        'date_field': 'date',
+        'timestamp': 'recorded_date'
+    },
+    'operations': {
+        'fields': ['id', 'date', 'type', 'field', 'description', 'hours', 'workers', 'cost', 'recorded_date'],
+        'required': ['field', 'description'],
+        'numeric': {'hours': (0, None, float), 'workers': (1, None, int), 'cost': (0, None, float)},
+        'dates': ['date'],
+        'choices': {'type': OPERATION_TYPES},
+        'defaults': {'hours': 0.0, 'workers': 1, 'cost': 0.0},
+        'date_field': 'date',
+        'timestamp': 'recorded_date'
+    },
+    'crop_prices': {
+        'fields': ['id', 'crop', 'price_date', 'price', 'unit', 'market_source', 'notes', 'recorded_date'],
+        'required': [],
+        'numeric': {'price': (0.01, None, float)},
+        'dates': ['price_date'],
+        'choices': {'crop': CROP_TYPES, 'unit': PRICE_UNITS},
+        'defaults': {'unit': 'bushels', 'market_source': '', 'notes': ''},
+        'date_field': 'price_date',
+        'timestamp': 'recorded_date'
+    },
+    'fields': {
+        'fields': ['id', 'name', 'size', 'soil_type', 'irrigation', 'notes', 'created_date'],
+        'required': ['name'],
+        'numeric': {'size': (0.1, None, float)},
+        'dates': [],
+        'choices': {'soil_type': SOIL_TYPES, 'irrigation': ["Yes", "No"]},
+        'defaults': {'soil_type': 'Loam', 'irrigation': 'No', 'notes': ''},
+        'date_field': 'created_date',
+        'timestamp': 'created_date'
+    }
+}
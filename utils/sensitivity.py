@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Dict, List
+from utils.profitability import build_cost_index
+
+# Evaluated grids keyed by a hash of their inputs, most recently used last. The
+# cache is shared by every session of the process: it is only touched under
+# the lock and holds read-only arrays, since callers get the cached array itself.
+_grid_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_grid_cache_lock = threading.Lock()
+GRID_CACHE_SIZE = 32
+
+def crop_baselines(revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Aggregate revenue plans per crop into area, yield per acre, price and latest cost per acre.
+
+    Only crops that have both revenue plans and a cost analysis are included.
+    """
+    plans = pd.DataFrame(revenue_plans, columns=[
+        'crop_type', 'planned_area', 'total_expected_yield', 'total_expected_revenue'
+    ])
+    by_crop = plans.groupby('crop_type').sum()
+
+    _, latest_by_crop = build_cost_index(profit_analysis)
+    by_crop = by_crop.join(latest_by_crop.set_index('crop')['cost_per_acre'], how='inner')
+
+    area = by_crop['planned_area'].astype(float)
+    total_yield = by_crop['total_expected_yield'].astype(float)
+    return pd.DataFrame({
+        'area': area,
+        'yield_per_acre': (total_yield / area.where(area > 0)).fillna(0.0),
+        'price': (by_crop['total_expected_revenue'] / total_yield.where(total_yield > 0)).fillna(0.0),
+        'cost_per_acre': by_crop['cost_per_acre'].astype(float)
+    }).rename_axis('crop')
+
+def _grid_key(*arrays: np.ndarray) -> str:
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def evaluate_grid(baselines: pd.DataFrame, price_multipliers: np.ndarray, yield_multipliers: np.ndarray,
+                  cost_multipliers: np.ndarray) -> np.ndarray:
+    """Total profit for every crop at every (price, yield, cost) multiplier combination.
+
+    Returns an array shaped (crops, prices, yields, costs) computed by
+    broadcasting. Results are cached by a hash of the inputs, so re-rendering
+    with the same baselines and ranges is a dictionary lookup; the returned
+    array is read-only.
+    """
+    area = baselines['area'].to_numpy(dtype=float)
+    yield_per_acre = baselines['yield_per_acre'].to_numpy(dtype=float)
+    price = baselines['price'].to_numpy(dtype=float)
+    cost_per_acre = baselines['cost_per_acre'].to_numpy(dtype=float)
+    price_multipliers, yield_multipliers, cost_multipliers = (
+        np.asarray(m, dtype=float) for m in (price_multipliers, yield_multipliers, cost_multipliers)
+    )
+
+    key = _grid_key(area, yield_per_acre, price, cost_per_acre,
+                    price_multipliers, yield_multipliers, cost_multipliers)
+    with _grid_cache_lock:
+        cached = _grid_cache.get(key)
+        if cached is not None:
+            _grid_cache.move_to_end(key)
+            return cached
+
+    base_revenue = (area * yield_per_acre * price)[:, None, None, None]
+    base_cost = (area * cost_per_acre)[:, None, None, None]
+    revenue = base_revenue * price_multipliers[None, :, None, None] * yield_multipliers[None, None, :, None]
+    profit = revenue - base_cost * cost_multipliers[None, None, None, :]
+    profit.setflags(write=False)
+
+    with _grid_cache_lock:
+        _grid_cache[key] = profit
+        if len(_grid_cache) > GRID_CACHE_SIZE:
+            _grid_cache.popitem(last=False)
+    return profit
+
+def break_even_by_plan(revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Break-even price and yield per acre for each plan against its crop's latest cost per acre"""
+    plans = pd.DataFrame(revenue_plans, columns=[
+        'name', 'crop_type', 'expected_yield_per_acre', 'expected_price'
+    ])
+    _, latest_by_crop = build_cost_index(profit_analysis)
+    plans = plans.merge(latest_by_crop[['crop', 'cost_per_acre']], how='inner',
+                        left_on='crop_type', right_on='crop')
+
+    expected_yield = plans['expected_yield_per_acre'].astype(float)
+    expected_price = plans['expected_price'].astype(float)
+    break_even_price = plans['cost_per_acre'] / expected_yield.where(expected_yield > 0)
+    break_even_yield = plans['cost_per_acre'] / expected_price.where(expected_price > 0)
+
+    return pd.DataFrame({
+        'plan': plans['name'],
+        'crop': plans['crop_type'],
+        'cost_per_acre': plans['cost_per_acre'],
+        'expected_price': expected_price,
+        'break_even_price': break_even_price,
+        'price_cushion_pct': (1 - break_even_price / expected_price.where(expected_price > 0)) * 100,
+        'expected_yield_per_acre': expected_yield,
+        'break_even_yield': break_even_yield,
+        'yield_cushion_pct': (1 - break_even_yield / expected_yield.where(expected_yield > 0)) * 100
+    })
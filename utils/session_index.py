@@ -0,0 +1,38 @@
+import streamlit as st
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.database import get_data_version, data_file_fingerprint
+
+# Session indexes over a farm dataset (task scheduler, calendar, occupancy,
+# price store) are stored as ((data version, file fingerprint), index). The
+# data version is bumped by every save in this process, including another
+# session's edit that keeps the record count; the fingerprint changes when
+# another process rewrites the file.
+
+def _dataset_state(data_type: str) -> Tuple[int, Optional[List[int]]]:
+    return (get_data_version(data_type), data_file_fingerprint(data_type))
+
+def get_session_index(data_type: str, session_key: str, build: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+    """Index of a session dataset, rebuilt with build(records) when the dataset changed since it was built"""
+    state = _dataset_state(data_type)
+    cached = st.session_state.get(session_key)
+    if cached is None or cached[0] != state:
+        cached = (state, build(st.session_state.get(data_type, [])))
+        st.session_state[session_key] = cached
+    return cached[1]
+
+def update_session_index(data_type: str, session_key: str, apply: Callable[[Any], None]):
+    """Apply this session's write to its index in place with apply(index).
+
+    The save of the write bumped the data version once; an index that was
+    not current just before it (it missed another session's write, or the
+    save failed) is dropped and rebuilt on next use instead.
+    """
+    cached = st.session_state.get(session_key)
+    if cached is None:
+        return
+    version = get_data_version(data_type)
+    if cached[0][0] != version - 1:
+        del st.session_state[session_key]
+        return
+    apply(cached[1])
+    st.session_state[session_key] = (_dataset_state(data_type), cached[1])
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from utils.profitability import build_cost_index
+
+PERCENTILES = [5, 50, 95]
+
+# Upper bound on scenario x plan cells held in memory at once
+MAX_CHUNK_CELLS = 4_000_000
+
+def price_volatility_by_crop(crop_prices: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Coefficient of variation of the recorded prices for each crop (crops with 2+ prices)"""
+    if not crop_prices:
+        return {}
+
+    prices = pd.DataFrame(crop_prices, columns=['crop', 'price'])
+    stats = prices.groupby('crop')['price'].agg(['mean', 'std', 'count'])
+    stats = stats[(stats['count'] > 1) & (stats['mean'] > 0)]
+    return (stats['std'] / stats['mean']).to_dict()
+
+def _lognormal_params(mean: np.ndarray, cv: np.ndarray):
+    """Log-space mu and sigma for a lognormal with the given mean and coefficient of variation"""
+    sigma = np.sqrt(np.log1p(np.square(cv)))
+    mu = np.log(np.where(mean > 0, mean, 1.0)) - np.square(sigma) / 2
+    return mu, sigma
+
+def simulate_plans(area: np.ndarray, mean_yield: np.ndarray, yield_cv: np.ndarray,
+                   mean_price: np.ndarray, price_cv: np.ndarray, cost_per_acre: np.ndarray,
+                   n_scenarios: int = 20000, correlation: float = 0.0,
+                   seed: Optional[int] = None) -> Dict[str, Any]:
+    """Simulate revenue and profit for many plans at once.
+
+    Yield per acre and price are lognormal with the given means and
+    coefficients of variation, optionally correlated through correlation.
+    Costs are deterministic. All plans are simulated together as a
+    (scenarios x plans) array, processed in plan chunks to bound memory.
+    Returns per-plan and whole-farm P5/P50/P95 revenue and profit and the
+    probability of a loss.
+    """
+    area, mean_yield, mean_price, cost_per_acre = (
+        np.asarray(a, dtype=float) for a in (area, mean_yield, mean_price, cost_per_acre)
+    )
+    n_plans = len(area)
+    yield_mu, yield_sigma = _lognormal_params(mean_yield, np.broadcast_to(yield_cv, n_plans))
+    price_mu, price_sigma = _lognormal_params(mean_price, np.broadcast_to(price_cv, n_plans))
+    total_cost = area * cost_per_acre
+
+    rng = np.random.default_rng(seed)
+    farm_revenue = np.zeros(n_scenarios)
+    plan_revenue_pct = np.zeros((len(PERCENTILES), n_plans))
+    plan_profit_pct = np.zeros((len(PERCENTILES), n_plans))
+    plan_loss_prob = np.zeros(n_plans)
+
+    chunk = max(1, MAX_CHUNK_CELLS // max(n_scenarios, 1))
+    for start in range(0, n_plans, chunk):
+        cols = slice(start, min(start + chunk, n_plans))
+        width = cols.stop - cols.start
+
+        z_yield = rng.standard_normal((n_scenarios, width), dtype=np.float32)
+        z_price = rng.standard_normal((n_scenarios, width), dtype=np.float32)
+        if correlation:
+            z_price = correlation * z_yield + np.sqrt(1 - correlation ** 2) * z_price
+
+        # yield * price is lognormal too, so a single exp gives revenue per acre
+        log_revenue = (yield_mu[cols] + price_mu[cols]) + yield_sigma[cols] * z_yield + price_sigma[cols] * z_price
+        produces = (mean_yield[cols] > 0) & (mean_price[cols] > 0)
+        revenue = np.exp(log_revenue) * (area[cols] * produces)
+
+        farm_revenue += revenue.sum(axis=1)
+        plan_revenue_pct[:, cols] = np.percentile(revenue, PERCENTILES, axis=0)
+        # Costs are fixed, so profit percentiles are revenue percentiles shifted by cost
+        plan_profit_pct[:, cols] = plan_revenue_pct[:, cols] - total_cost[cols]
+        plan_loss_prob[cols] = (revenue < total_cost[cols]).mean(axis=0)
+
+    farm_profit = farm_revenue - total_cost.sum()
+    farm_revenue_pct = np.percentile(farm_revenue, PERCENTILES)
+    farm_profit_pct = np.percentile(farm_profit, PERCENTILES)
+
+    return {
+        'plans': {
+            **{f'revenue_p{p}': plan_revenue_pct[i] for i, p in enumerate(PERCENTILES)},
+            **{f'profit_p{p}': plan_profit_pct[i] for i, p in enumerate(PERCENTILES)},
+            'loss_probability': plan_loss_prob
+        },
+        'farm': {
+            **{f'revenue_p{p}': float(farm_revenue_pct[i]) for i, p in enumerate(PERCENTILES)},
+            **{f'profit_p{p}': float(farm_profit_pct[i]) for i, p in enumerate(PERCENTILES)},
+            'loss_probability': float((farm_profit < 0).mean())
+        }
+    }
+
+def simulate_revenue_plans(revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]],
+                           crop_prices: List[Dict[str, Any]] = None, yield_cv: float = 0.15,
+                           price_cv: float = 0.20, use_price_history: bool = False,
+                           n_scenarios: int = 20000, correlation: float = 0.0,
+                           seed: Optional[int] = None) -> Dict[str, Any]:
+    """Run the Monte Carlo simulation for a list of revenue plans.
+
+    Each plan's costs come from its crop's latest cost analysis (zero when
+    none exists). With use_price_history, a crop's price spread is taken from
+    the variation of its recorded prices instead of price_cv.
+    """
+    plans = pd.DataFrame(revenue_plans, columns=[
+        'name', 'crop_type', 'planned_area', 'expected_yield_per_acre', 'expected_price'
+    ])
+
+    _, latest_by_crop = build_cost_index(profit_analysis or [])
+    cost_lookup = latest_by_crop.set_index('crop')['cost_per_acre']
+    plans['cost_per_acre'] = plans['crop_type'].map(cost_lookup)
+    plans['has_cost_data'] = plans['cost_per_acre'].notna()
+    plans['cost_per_acre'] = plans['cost_per_acre'].fillna(0.0)
+
+    plans['price_cv'] = price_cv
+    if use_price_history:
+        volatility = price_volatility_by_crop(crop_prices or [])
+        plans['price_cv'] = plans['crop_type'].map(volatility).fillna(price_cv)
+
+    result = simulate_plans(
+        plans['planned_area'].to_numpy(),
+        plans['expected_yield_per_acre'].to_numpy(), yield_cv,
+        plans['expected_price'].to_numpy(), plans['price_cv'].to_numpy(),
+        plans['cost_per_acre'].to_numpy(),
+        n_scenarios=n_scenarios, correlation=correlation, seed=seed
+    )
+
+    plan_results = pd.DataFrame({
+        'plan': plans['name'],
+        'crop': plans['crop_type'],
+        'has_cost_data': plans['has_cost_data'],
+        **result['plans']
+    })
+    return {'plans': plan_results, 'farm': result['farm']}
@@ -0,0 +1,183 @@
+import argparse
+import math
+import os
+import threading
+import time
+import streamlit as st
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from utils.database import (
+    DEFAULT_FARM, IO_OBSERVERS, get_active_farm, set_active_farm, reset_active_farm, data_file_fingerprint,
+    list_farms, load_data, save_metadata, load_metadata
+)
+from utils.report_jobs import ReportPool, get_report_pool
+
+# Set FARM_SNAPSHOT_INTERVAL=<seconds> for the timer refresh; 0 refreshes only after data changes
+SNAPSHOT_INTERVAL_ENV = "FARM_SNAPSHOT_INTERVAL"
+DEFAULT_SNAPSHOT_INTERVAL = 15 * 60
+# Writes within this many seconds of a change are folded into one refresh
+REFRESH_DELAY = 2.0
+SNAPSHOT_INPUTS = ['revenue_plans', 'profit_analysis', 'crop_prices']
+# Stored next to the datasets as financial_reports.snapshot.json
+SNAPSHOT_FILE = ('financial_reports', 'snapshot')
+
+def input_fingerprint() -> Dict[str, Optional[List[int]]]:
+    """File fingerprints of the active farm's report inputs, which tell whether a snapshot is stale"""
+    return {data_type: data_file_fingerprint(data_type) for data_type in SNAPSHOT_INPUTS}
+
+def build_snapshot(revenue_plans: List[Dict[str, Any]], profit_analysis: List[Dict[str, Any]],
+                   crop_prices: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Every financial report, per year and per crop, as plain JSON-ready values"""
+    # Imported here so the app can start without pandas
+    from utils.forecasting import crop_forecast, fit_price_models
+    from utils.price_series import PriceStore
+    from utils.profitability import compute_profitability
+    from utils.reports import (
+        REVENUE_SUMMARY_COLUMNS, COST_REPORT_COLUMNS, revenue_summary, cost_report, cost_by_crop
+    )
+    from utils.rollups import RollupCube
+
+    revenue_rollup = RollupCube('revenue_plans', revenue_plans)
+    revenue_years = revenue_rollup.values('year')
+    revenue_by_year = {}
+    for year in revenue_years:
+        summary = revenue_summary(revenue_plans, year, revenue_rollup)
+        summary['plans'] = [{column: plan.get(column) for column in REVENUE_SUMMARY_COLUMNS}
+                            for plan in summary['plans']]
+        revenue_by_year[str(year)] = summary
+
+    cost_rollup = RollupCube('profit_analysis', profit_analysis)
+    cost_years = cost_rollup.values('year')
+    cost_by_year = {}
+    for year in cost_years:
+        report = cost_report(profit_analysis, year, cost_rollup)
+        report['analyses'] = [{column: analysis.get(column) for column in COST_REPORT_COLUMNS}
+                              for analysis in report['analyses']]
+        report['by_crop'] = cost_by_crop(cost_rollup, year).to_dict('split')
+        cost_by_year[str(year)] = report
+
+    price_store = PriceStore(crop_prices)
+    price_models = fit_price_models(crop_prices)
+
+    return {
+        'revenue_summary': {'years': revenue_years, 'by_year': revenue_by_year},
+        'cost_report': {'years': cost_years, 'by_year': cost_by_year},
+        'profitability': {
+            'latest_cost': compute_profitability(revenue_plans, profit_analysis).to_dict('records'),
+            'match_year': compute_profitability(revenue_plans, profit_analysis, match_year=True).to_dict('records')
+        },
+        'price_trends': {
+            crop: {**price_store.get(crop).summary(), 'forecast': crop_forecast(price_models, crop)}
+            for crop in price_store.crops()
+        }
+    }
+
+def refresh_snapshot(farm_id: str, force: bool = False) -> bool:
+    """Recompute a farm's report snapshot unless it is current; True when a new one was written.
+
+    Runs in a report worker, so the farm is passed in rather than taken from
+    the caller's context.
+    """
+    token = set_active_farm(farm_id)
+    try:
+        # Taken before reading, so a write during the build leaves the snapshot stale
+        fingerprint = input_fingerprint()
+        if not force:
+            current = load_metadata(*SNAPSHOT_FILE)
+            if current is not None and current.get('inputs') == fingerprint:
+                return False
+
+        datasets = {data_type: load_data(data_type, []) for data_type in SNAPSHOT_INPUTS}
+        snapshot = build_snapshot(datasets['revenue_plans'], datasets['profit_analysis'], datasets['crop_prices'])
+        snapshot['computed_at'] = datetime.now().isoformat(timespec='seconds')
+        snapshot['inputs'] = fingerprint
+        return save_metadata(*SNAPSHOT_FILE, snapshot)
+    finally:
+        reset_active_farm(token)
+
+class SnapshotScheduler:
+    """Background thread refreshing farms' report snapshots shortly after data changes and on a timer.
+
+    The reports are computed in the report worker pool; the thread only
+    decides when.
+    """
+
+    def __init__(self, pool: ReportPool, interval: float, delay: float = REFRESH_DELAY):
+        self.pool = pool
+        self.interval = interval
+        self.delay = delay
+        # Farm -> monotonic time its refresh is due
+        self.due: Dict[str, float] = {}
+        self.next_sweep = time.monotonic() + interval if interval > 0 else math.inf
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="report-snapshots", daemon=True)
+        self.thread.start()
+
+    def schedule(self, farm_id: str):
+        """Refresh a farm's snapshot soon; further writes before then share the refresh"""
+        with self.condition:
+            self.due.setdefault(farm_id, time.monotonic() + self.delay)
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                now = time.monotonic()
+                ready = [farm_id for farm_id, due in self.due.items() if due <= now]
+                if not ready and now < self.next_sweep:
+                    wake = min([*self.due.values(), self.next_sweep])
+                    self.condition.wait(None if wake == math.inf else wake - now)
+                    continue
+                for farm_id in ready:
+                    del self.due[farm_id]
+                if now >= self.next_sweep:
+                    # Farms whose snapshot is current are skipped cheaply by refresh_snapshot
+                    ready += [farm_id for farm_id in list_farms() if farm_id not in ready]
+                    self.next_sweep = now + self.interval
+
+            for farm_id in ready:
+                try:
+                    self.pool.call(refresh_snapshot, farm_id)
+                except Exception as e:
+                    print(f"Error refreshing report snapshot for {farm_id}: {str(e)}")
+
+@st.cache_resource
+def get_snapshot_scheduler() -> SnapshotScheduler:
+    interval = os.environ.get(SNAPSHOT_INTERVAL_ENV)
+    return SnapshotScheduler(get_report_pool(), float(interval) if interval else DEFAULT_SNAPSHOT_INTERVAL)
+
+def _data_saved(operation: str, data_type: str, size: int, seconds: float):
+    if operation == 'save' and data_type in SNAPSHOT_INPUTS:
+        get_snapshot_scheduler().schedule(get_active_farm())
+
+# Every dataset write, including bulk imports, goes through save_data or save_data_streaming
+IO_OBSERVERS.append(_data_saved)
+
+def get_report_snapshot() -> Optional[Dict[str, Any]]:
+    """The active farm's report snapshot while it is current; None when stale, after scheduling a refresh"""
+    fingerprint = input_fingerprint()
+    snapshot = st.session_state.get('_report_snapshot')
+    if snapshot is None or snapshot['inputs'] != fingerprint:
+        snapshot = load_metadata(*SNAPSHOT_FILE)
+        if snapshot is None or snapshot.get('inputs') != fingerprint:
+            st.session_state.pop('_report_snapshot', None)
+            get_snapshot_scheduler().schedule(get_active_farm())
+            return None
+        st.session_state['_report_snapshot'] = snapshot
+    return snapshot
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Precompute the financial report snapshots of farms")
+    parser.add_argument('--farm', default=DEFAULT_FARM, help="Farm to refresh")
+    parser.add_argument('--all-farms', action='store_true', help="Refresh every farm")
+    parser.add_argument('--force', action='store_true', help="Recompute even when a snapshot is current")
+    args = parser.parse_args(argv)
+
+    for farm_id in (list_farms() if args.all_farms else [args.farm]):
+        started = time.perf_counter()
+        refreshed = refresh_snapshot(farm_id, args.force)
+        status = f"refreshed in {time.perf_counter() - started:.2f}s" if refreshed else "up to date"
+        print(f"{farm_id}: {status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import heapq
+import itertools
+import streamlit as st
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from utils.session_index import get_session_index, update_session_index
+
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+OPEN_STATUSES = ('Pending', 'In Progress')
+
+def _due(task: Dict[str, Any]) -> str:
+    # ISO dates order correctly as strings; tasks without one sort last
+    return str(task.get('due_date') or '9999-12-31')[:10]
+
+def _rank(task: Dict[str, Any]) -> int:
+    return PRIORITY_RANK.get(task.get('priority'), len(PRIORITY_RANK))
+
+class TaskScheduler:
+    """Tasks in heaps by status and by assignee with lazy deletion.
+
+    Status and assignee heaps order tasks by (priority, due date); a separate
+    heap of open tasks orders them by due date for overdue lookups. A status
+    change pushes fresh entries and bumps the task's version instead of
+    searching the heaps, so stale entries are skipped when read and dropped
+    when the heaps are compacted.
+    """
+
+    def __init__(self, tasks: List[Dict[str, Any]] = None):
+        self.tasks: Dict[Any, Dict[str, Any]] = {}
+        self.versions: Dict[Any, int] = {}
+        self.by_status: Dict[str, List[Tuple]] = {}
+        self.by_assignee: Dict[str, List[Tuple]] = {}
+        self.open_by_due: List[Tuple] = []
+        self.entries = 0
+        self.count = 0
+        for task in tasks or []:
+            self.add_task(task)
+
+    def _push(self, task: Dict[str, Any]):
+        task_id, version = task['id'], self.versions[task['id']]
+        by_priority = (_rank(task), _due(task), task_id, version)
+        heapq.heappush(self.by_status.setdefault(task['status'], []), by_priority)
+        self.entries += 1
+        if task['status'] in OPEN_STATUSES:
+            heapq.heappush(self.open_by_due, (_due(task), _rank(task), task_id, version))
+            heapq.heappush(self.by_assignee.setdefault(task.get('assigned_to') or '', []), by_priority)
+            self.entries += 2
+
+    def add_task(self, task: Dict[str, Any]):
+        if task['id'] in self.tasks:
+            self.remove_task(task['id'])
+        self.count += 1
+        self.tasks[task['id']] = task
+        self.versions[task['id']] = self.versions.get(task['id'], 0) + 1
+        self._push(task)
+
+    def update_task(self, task: Dict[str, Any]):
+        if task['id'] not in self.tasks:
+            self.add_task(task)
+            return
+        self.tasks[task['id']] = task
+        self.versions[task['id']] += 1
+        self._push(task)
+        self._maybe_compact()
+
+    def remove_task(self, task_id: Any):
+        if self.tasks.pop(task_id, None) is None:
+            return
+        self.count -= 1
+        self.versions[task_id] += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Rebuild the heaps once stale entries outnumber live ones"""
+        if self.entries > 4 * max(self.count, 16):
+            self.by_status, self.by_assignee, self.open_by_due = {}, {}, []
+            self.entries = 0
+            for task in self.tasks.values():
+                self._push(task)
+
+    def _live(self, entry: Tuple) -> bool:
+        return self.versions.get(entry[2]) == entry[3] and entry[2] in self.tasks
+
+    def _ordered(self, heap: List[Tuple], stop: Optional[Callable[[Tuple], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """Live tasks of a heap in order, without popping: O(log n) per task yielded"""
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            if stop and stop(entry):
+                return
+            if self._live(entry):
+                yield self.tasks[entry[2]]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def _merged(self, heaps: List[List[Tuple]]) -> Iterator[Dict[str, Any]]:
+        streams = [self._ordered(heap) for heap in heaps]
+        return heapq.merge(*streams, key=lambda t: (_rank(t), _due(t), t['id']))
+
+    def ordered(self, statuses: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Tasks with any of the statuses (default: all) by priority then due date"""
+        statuses = self.by_status if statuses is None else statuses
+        return self._merged([self.by_status.get(status, []) for status in statuses])
+
+    def next_up(self, limit: int = 5, assignee: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Open tasks by priority then due date, optionally for one assignee"""
+        if assignee is not None:
+            tasks = self._merged([self.by_assignee.get(assignee, [])])
+        else:
+            tasks = self.ordered(list(OPEN_STATUSES))
+        return list(itertools.islice(tasks, limit))
+
+    def overdue(self, today: Optional[date] = None, assignee: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Open tasks due before today, most overdue first"""
+        cutoff = (today or date.today()).isoformat()
+        tasks = self._ordered(self.open_by_due, stop=lambda entry: entry[0] >= cutoff)
+        return [t for t in tasks if assignee is None or (t.get('assigned_to') or '') == assignee]
+
+    def assignees(self) -> List[str]:
+        return sorted(name for name, heap in self.by_assignee.items()
+                      if name and any(self._live(entry) for entry in heap))
+
+def get_task_scheduler() -> TaskScheduler:
+    """Task scheduler for the session's tasks, rebuilt when the tasks changed"""
+    return get_session_index('tasks', '_task_scheduler', TaskScheduler)
+
+def _remove_tasks(scheduler: TaskScheduler, records: List[Dict[str, Any]]):
+    for record in records:
+        scheduler.remove_task(record['id'])
+
+def record_inserted(data_type: str, record: Dict[str, Any]):
+    if data_type == 'tasks':
+        update_session_index(data_type, '_task_scheduler', lambda scheduler: scheduler.add_task(record))
+
+def record_updated(data_type: str, old_record: Dict[str, Any], new_record: Dict[str, Any]):
+    if data_type == 'tasks':
+        update_session_index(data_type, '_task_scheduler', lambda scheduler: scheduler.update_task(new_record))
+
+def records_deleted(data_type: str, records: List[Dict[str, Any]]):
+    if data_type == 'tasks':
+        update_session_index(data_type, '_task_scheduler', lambda scheduler: _remove_tasks(scheduler, records))